@@ -5,19 +5,10 @@ from pathlib import Path
 # Add the parent directory to the Python path to import from src
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.graph import AgentState, create_research_graph
+from src.graph import AgentState, get_research_graph, new_thread_config, release_research_thread
+from src.pdf_render import render_pdf
 import json
 from typing import Optional
-from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
-import markdown2
-import re
-from datetime import datetime
 import uuid
 
 # ============================================================================
@@ -355,255 +346,6 @@ header {visibility: hidden;}
 st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 
-# ============================================================================
-# PDF GENERATION FUNCTIONS
-# ============================================================================
-
-def generate_pdf_from_markdown(markdown_text: str, company_name: str) -> BytesIO:
-    """
-    Generate a professional PDF from markdown text with dark theme styling.
-    
-    Args:
-        markdown_text: The markdown content to convert
-        company_name: Name of the company for the filename
-        
-    Returns:
-        BytesIO object containing the PDF
-    """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, 
-        pagesize=letter, 
-        topMargin=0.75*inch, 
-        bottomMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        rightMargin=0.75*inch
-    )
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    
-    # Custom styles matching the dark theme
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=26,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=10,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.HexColor('#666666'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica'
-    )
-    
-    heading1_style = ParagraphStyle(
-        'CustomHeading1',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#1a2451'),
-        spaceAfter=12,
-        spaceBefore=20,
-        fontName='Helvetica-Bold',
-        borderPadding=10,
-        leftIndent=0
-    )
-    
-    heading2_style = ParagraphStyle(
-        'CustomHeading2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#4C72FF'),
-        spaceAfter=10,
-        spaceBefore=15,
-        fontName='Helvetica-Bold'
-    )
-    
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['BodyText'],
-        fontSize=10,
-        textColor=colors.HexColor('#2d3748'),
-        spaceAfter=10,
-        alignment=TA_LEFT,
-        leading=14
-    )
-    
-    bullet_style = ParagraphStyle(
-        'CustomBullet',
-        parent=styles['BodyText'],
-        fontSize=10,
-        textColor=colors.HexColor('#374151'),
-        spaceAfter=6,
-        leftIndent=30,
-        bulletIndent=15,
-        leading=14
-    )
-    
-    source_link_style = ParagraphStyle(
-        'SourceLink',
-        parent=styles['BodyText'],
-        fontSize=9,
-        textColor=colors.HexColor('#4C72FF'),
-        spaceAfter=8,
-        leftIndent=20,
-        leading=12
-    )
-    
-    # Story (content container)
-    story = []
-    
-    # Add header with company branding
-    story.append(Paragraph("Account Plan Report", title_style))
-    story.append(Paragraph(f"{company_name} | Generated on {datetime.now().strftime('%B %d, %Y')}", subtitle_style))
-    story.append(Spacer(1, 0.2*inch))
-    
-    def clean_text_for_pdf(text):
-        """Clean and properly format text for PDF, handling bold markers."""
-        # Replace **text** with proper <b>text</b> tags
-        parts = text.split('**')
-        result = []
-        for i, part in enumerate(parts):
-            if i % 2 == 1:  # Odd indices are between ** markers (bold)
-                result.append(f'<b>{part}</b>')
-            else:
-                result.append(part)
-        
-        final_text = ''.join(result)
-        
-        # Escape problematic characters but preserve our HTML tags
-        final_text = final_text.replace('&', '&amp;')
-        final_text = final_text.replace('<', '&lt;').replace('>', '&gt;')
-        final_text = final_text.replace('&lt;b&gt;', '<b>').replace('&lt;/b&gt;', '</b>')
-        final_text = final_text.replace('&lt;br&gt;', '<br/>')
-        final_text = final_text.replace('&lt;br/&gt;', '<br/>')
-        
-        return final_text
-    
-    # Parse markdown and convert to PDF elements
-    lines = markdown_text.split('\n')
-    
-    i = 0
-    in_table = False
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        if not line:
-            if not in_table:
-                story.append(Spacer(1, 0.1*inch))
-            i += 1
-            continue
-        
-        # Handle headers
-        if line.startswith('# ') and not line.startswith('## '):
-            text = line[2:].strip()
-            # Add separator line before major sections
-            story.append(Spacer(1, 0.15*inch))
-            story.append(Paragraph(text, heading1_style))
-            
-        elif line.startswith('## '):
-            text = line[3:].strip()
-            story.append(Paragraph(text, heading2_style))
-            
-        elif line.startswith('### '):
-            text = line[4:].strip()
-            story.append(Paragraph(text, heading2_style))
-        
-        # Handle horizontal rules
-        elif line.startswith('---'):
-            story.append(Spacer(1, 0.2*inch))
-            
-        # Handle bullet points
-        elif line.startswith('* ') or line.startswith('- '):
-            text = line[2:].strip()
-            clean_text = clean_text_for_pdf(text)
-            story.append(Paragraph(f"• {clean_text}", bullet_style))
-        
-        # Handle numbered lists (including source links)
-        elif re.match(r'^\d+\.\s', line):
-            text = re.sub(r'^\d+\.\s', '', line).strip()
-            
-            # Check if it's a markdown link [text](url)
-            link_match = re.match(r'\[(.*?)\]\((.*?)\)', text)
-            if link_match:
-                link_text = link_match.group(1)
-                link_url = link_match.group(2)
-                formatted_text = f'<b>{link_text}</b><br/><font size="8" color="#666666">{link_url}</font>'
-                story.append(Paragraph(formatted_text, source_link_style))
-            else:
-                clean_text = clean_text_for_pdf(text)
-                story.append(Paragraph(clean_text, bullet_style))
-        
-        # Handle tables
-        elif '|' in line and not line.startswith('|:'):
-            in_table = True
-            table_data = []
-            
-            while i < len(lines) and '|' in lines[i]:
-                row_text = [cell.strip() for cell in lines[i].split('|') if cell.strip()]
-                if row_text and not lines[i].startswith('|:'):
-                    # Wrap each cell in a Paragraph for proper text wrapping
-                    row_paragraphs = []
-                    for idx, cell in enumerate(row_text):
-                        if idx == 0:  # First column (Category) - use bold
-                            row_paragraphs.append(Paragraph(f"<b>{cell}</b>", body_style))
-                        else:  # Second column (Summary) - regular text with wrapping
-                            clean_cell = clean_text_for_pdf(cell)
-                            row_paragraphs.append(Paragraph(clean_cell, body_style))
-                    table_data.append(row_paragraphs)
-                i += 1
-            
-            if table_data and len(table_data) > 1:  # Need at least header + 1 row
-                # Create table with proper column widths for letter size (8.5" wide)
-                # Account for margins: 8.5" - 1.5" (left+right margins) = 7" usable width
-                col_widths = [1.5*inch, 5*inch]  # Category: 1.5", Summary: 5"
-                
-                table = Table(table_data, hAlign='LEFT', colWidths=col_widths)
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a2451')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 11),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('TOPPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cbd5e0')),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('TOPPADDING', (0, 1), (-1, -1), 10),
-                    ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-                ]))
-                story.append(table)
-                story.append(Spacer(1, 0.2*inch))
-            
-            in_table = False
-            continue
-        
-        # Regular paragraph
-        else:
-            clean_text = clean_text_for_pdf(line)
-            story.append(Paragraph(clean_text, body_style))
-        
-        i += 1
-    
-    # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
-
 # ============================================================================
 # SESSION STATE INITIALIZATION
 # ============================================================================
@@ -659,15 +401,19 @@ def run_agent_cycle(company_name: str) -> None:
             "human_resolution": ""
         }
         
-        # Create graph
-        graph = create_research_graph()
+        # Reuse the shared compiled graph
+        graph = get_research_graph()
         
-        # Create a thread config for checkpointing
-        config = {"configurable": {"thread_id": "stratify_session_1"}}
+        # Create a unique thread config for checkpointing
+        config = new_thread_config("stratify")
         
         # Run the agent - this will execute until it hits the interrupt or completes
         result_state = graph.invoke(initial_state, config)
         
+        # Conflicts are resolved by calling the writer directly, so the
+        # checkpoints are no longer needed once the result is in session state
+        release_research_thread(config)
+        
         # Store the complete agent state
         st.session_state.agent_state = result_state
         st.session_state.execution_log = result_state.get("messages", [])
@@ -960,14 +706,15 @@ def render_final_report():
         with col2:
             # Generate and Download PDF
             try:
-                pdf_buffer = generate_pdf_from_markdown(
+                pdf_bytes = render_pdf(
                     st.session_state.final_report,
-                    st.session_state.agent_state['company_name']
+                    st.session_state.agent_state['company_name'],
+                    theme="streamlit"
                 )
                 
                 st.download_button(
                     label="📄 Download PDF",
-                    data=pdf_buffer,
+                    data=pdf_bytes,
                     file_name=f"account_plan_{st.session_state.agent_state['company_name'].replace(' ', '_')}.pdf",
                     mime="application/pdf",
                     use_container_width=True
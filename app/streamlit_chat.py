@@ -5,17 +5,10 @@ from pathlib import Path
 # Add the parent directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.graph import AgentState, create_research_graph
+from src.graph import AgentState, get_research_graph, release_research_thread
+from src.pdf_render import render_pdf
 from datetime import datetime
 import uuid
-from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
-import re
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -148,208 +141,6 @@ if 'chat_history' not in st.session_state:
 if 'current_chat_id' not in st.session_state:
     st.session_state.current_chat_id = None
 
-# ============================================================================
-# PDF GENERATION
-# ============================================================================
-
-def generate_pdf_from_markdown(markdown_text: str, company_name: str) -> BytesIO:
-    """Generate a professional PDF from markdown text."""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, 
-        pagesize=letter, 
-        topMargin=0.75*inch, 
-        bottomMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        rightMargin=0.75*inch
-    )
-    
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=26,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=10,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.HexColor('#666666'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica'
-    )
-    
-    heading1_style = ParagraphStyle(
-        'CustomHeading1',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#1a2451'),
-        spaceAfter=12,
-        spaceBefore=20,
-        fontName='Helvetica-Bold'
-    )
-    
-    heading2_style = ParagraphStyle(
-        'CustomHeading2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#10a37f'),
-        spaceAfter=10,
-        spaceBefore=15,
-        fontName='Helvetica-Bold'
-    )
-    
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['BodyText'],
-        fontSize=10,
-        textColor=colors.HexColor('#2d3748'),
-        spaceAfter=10,
-        alignment=TA_LEFT,
-        leading=14
-    )
-    
-    bullet_style = ParagraphStyle(
-        'CustomBullet',
-        parent=styles['BodyText'],
-        fontSize=10,
-        textColor=colors.HexColor('#374151'),
-        spaceAfter=6,
-        leftIndent=30,
-        bulletIndent=15,
-        leading=14
-    )
-    
-    story = []
-    
-    story.append(Paragraph("Account Plan Report", title_style))
-    story.append(Paragraph(f"{company_name} | Generated on {datetime.now().strftime('%B %d, %Y')}", subtitle_style))
-    story.append(Spacer(1, 0.2*inch))
-    
-    def clean_text(text):
-        """Clean text by converting markdown bold to HTML bold and removing problematic HTML"""
-        # First, handle markdown bold (**text**)
-        parts = text.split('**')
-        result = []
-        for i, part in enumerate(parts):
-            if i % 2 == 1:  # Odd indices are bold
-                result.append(f'<b>{part}</b>')
-            else:
-                result.append(part)
-        
-        cleaned = ''.join(result)
-        
-        # Remove any remaining HTML tags except <b> and </b>
-        cleaned = re.sub(r'<(?!/?b\b)[^>]+>', '', cleaned)
-        
-        # Escape special XML characters
-        cleaned = cleaned.replace('&', '&amp;')
-        cleaned = cleaned.replace('<', '&lt;').replace('>', '&gt;')
-        # Restore <b> tags
-        cleaned = cleaned.replace('&lt;b&gt;', '<b>').replace('&lt;/b&gt;', '</b>')
-        
-        return cleaned
-    
-    lines = markdown_text.split('\n')
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        if not line:
-            story.append(Spacer(1, 0.1*inch))
-            i += 1
-            continue
-            
-        # Handle tables
-        if '|' in line and not line.startswith('|:'):
-            table_data = []
-            
-            while i < len(lines) and '|' in lines[i]:
-                row_text = [cell.strip() for cell in lines[i].split('|') if cell.strip()]
-                if row_text and not lines[i].startswith('|:'):
-                    # Wrap each cell in a Paragraph for proper text wrapping
-                    row_paragraphs = []
-                    for idx, cell in enumerate(row_text):
-                        # Clean the cell text - remove HTML tags and handle bold
-                        cell_clean = clean_text(cell)
-                        # Replace <br> with newlines
-                        cell_clean = cell_clean.replace('<br>', '\n').replace('<br/>', '\n')
-                        
-                        if idx == 0:  # First column (Category) - use bold
-                            row_paragraphs.append(Paragraph(f"<b>{cell_clean}</b>", body_style))
-                        else:  # Second column (Summary) - regular text with wrapping
-                            row_paragraphs.append(Paragraph(cell_clean, body_style))
-                    table_data.append(row_paragraphs)
-                i += 1
-            
-            if table_data and len(table_data) > 1:  # Need at least header + 1 row
-                # Create table with proper column widths
-                col_widths = [1.5*inch, 5*inch]
-                
-                table = Table(table_data, hAlign='LEFT', colWidths=col_widths)
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a2451')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 11),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('TOPPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cbd5e0')),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('TOPPADDING', (0, 1), (-1, -1), 10),
-                    ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-                ]))
-                story.append(table)
-                story.append(Spacer(1, 0.2*inch))
-            
-            continue
-            
-        if line.startswith('# ') and not line.startswith('## '):
-            text = line[2:].strip()
-            story.append(Spacer(1, 0.15*inch))
-            story.append(Paragraph(text, heading1_style))
-        elif line.startswith('## '):
-            text = line[3:].strip()
-            story.append(Paragraph(text, heading2_style))
-        elif line.startswith('* ') or line.startswith('- '):
-            text = line[2:].strip()
-            clean = clean_text(text)
-            story.append(Paragraph(f"• {clean}", bullet_style))
-        elif re.match(r'^\d+\.\s', line):
-            text = re.sub(r'^\d+\.\s', '', line).strip()
-            link_match = re.match(r'\[(.*?)\]\((.*?)\)', text)
-            if link_match:
-                link_text = link_match.group(1)
-                link_url = link_match.group(2)
-                formatted = f'<b>{link_text}</b><br/><font size="8" color="#666666">{link_url}</font>'
-                story.append(Paragraph(formatted, bullet_style))
-            else:
-                clean = clean_text(text)
-                story.append(Paragraph(clean, bullet_style))
-        else:
-            clean = clean_text(line)
-            story.append(Paragraph(clean, body_style))
-        
-        i += 1
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -413,11 +204,15 @@ def process_research(company_name):
                 "human_resolution": ""
             }
             
-            graph = create_research_graph()
+            graph = get_research_graph()
             config = {"configurable": {"thread_id": str(uuid.uuid4())}}
             
             result = graph.invoke(initial_state, config)
             
+            # Conflicts are resolved by calling the writer directly, so the
+            # checkpoints are no longer needed once the result is in session state
+            release_research_thread(config)
+            
             st.session_state.agent_state = result
             
             # Check for conflict
@@ -620,14 +415,15 @@ if st.session_state.last_report and not st.session_state.awaiting_resolution:
     
     with col2:
         try:
-            pdf_buffer = generate_pdf_from_markdown(
+            pdf_bytes = render_pdf(
                 st.session_state.last_report,
-                st.session_state.last_company
+                st.session_state.last_company,
+                theme="chat"
             )
             
             st.download_button(
                 label="📄 Download PDF",
-                data=pdf_buffer,
+                data=pdf_bytes,
                 file_name=f"account_plan_{st.session_state.last_company.replace(' ', '_')}.pdf",
                 mime="application/pdf",
                 use_container_width=True,
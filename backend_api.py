@@ -1,22 +1,343 @@
-from flask import Flask, request, jsonify, send_file, Response, stream_with_context
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context, g
 from flask_cors import CORS
-from src.graph import AgentState, create_research_graph
+from src.graph import AgentState, get_research_graph, get_paused_thread_config, new_thread_config, release_research_thread
+from src.session_store import SessionRegistry
+from src.job_queue import JobQueue, QueueFullError
+from src.company_names import CompanyNameExtractor
+from src.report_cache import get_report_cache, is_cacheable_report
+from src.research_diff import incremental_state
+from src.batch import BATCH_MAX_COMPANIES, BATCH_MAX_PARALLEL, parse_companies, run_batch
+from src.search_cache import get_search_cache
+from src.pdf_cache import get_pdf_cache, pdf_key
+from src.pdf_render import PDF_STYLE_VERSION, render_pdf
+from src.pdf_export import PDF_EXPORT_MAX_REPORTS, render_bundle, stream_bytes, stream_zip
+from src.instrumentation import invoke_llm
+from src.report_editor import UnknownSectionError, edit_report
+from src.telemetry import ACTIVE_SESSIONS, observe_request, register_cache, render_metrics
 from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
-from reportlab.lib import colors
-import re
 import json
+import os
+import re
 import time
 
 app = Flask(__name__)
 CORS(app)
 
-# Store active sessions
-active_sessions = {}
+# Sessions started by this process, keyed by thread_id (the checkpoint store is
+# the source of truth, so paused sessions can be resumed from any worker).
+# Evicted sessions have their checkpoints released.
+active_sessions = SessionRegistry(on_evict=release_research_thread)
+
+# Optional shared secret for /api/admin/* endpoints (sent as X-Admin-Token)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Seconds to pause after each progress event so the UI can show it
+PROGRESS_EVENT_DELAY = float(os.getenv("PROGRESS_EVENT_DELAY", "0.5"))
+
+COMPANY_EXTRACTION_PROMPT = """You are a company name extractor. 
+Extract ONLY the company name from the user's input. Return just the company name, nothing else.
+
+Examples:
+- "I want to research about a company called AstraZeneca" -> "AstraZeneca"
+- "Can you analyze Tesla for me?" -> "Tesla"
+- "Research Microsoft" -> "Microsoft"
+- "Tell me about Apple Inc" -> "Apple"
+- "accenture" -> "Accenture"
+
+Return ONLY the company name."""
+
+
+def llm_extract_company_name(user_input):
+    """Extract the actual company name from natural language input using the LLM."""
+    from src.graph import get_llm, REVIEWER_TEMPERATURE
+    from langchain_core.messages import SystemMessage, HumanMessage
+    
+    llm = get_llm(temperature=REVIEWER_TEMPERATURE)
+    response = invoke_llm(llm, [SystemMessage(content=COMPANY_EXTRACTION_PROMPT), HumanMessage(content=user_input)])
+    return response.content.strip()
+
+
+# Plain names and short requests are resolved locally; only real sentences reach Gemini
+company_name_extractor = CompanyNameExtractor(llm_extract_company_name)
+
+
+# ============================================================================
+# PROMETHEUS METRICS
+# ============================================================================
+
+def _cache_stats(cache):
+    return (cache.hits, cache.misses) if cache is not None else None
+
+
+def _extractor_stats():
+    counts = company_name_extractor.tier_counts
+    hits = counts.get("cache", 0)
+    return hits, sum(counts.values()) - hits
+
+
+ACTIVE_SESSIONS.set_function(lambda: len(active_sessions))
+register_cache("search", lambda: _cache_stats(get_search_cache()))
+register_cache("report", lambda: _cache_stats(get_report_cache()))
+register_cache("company_name", _extractor_stats)
+register_cache("pdf", lambda: _cache_stats(get_pdf_cache()))
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    # Streamed responses are timed until their last byte has been sent
+    started = g.get('request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        method, status = request.method, response.status_code
+        response.call_on_close(lambda: observe_request(route, method, status, time.perf_counter() - started))
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Expose request, graph, external-call, session and cache metrics for Prometheus."""
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
+
+def extract_company_name(user_input):
+    """
+    Resolve user input to a company name.
+    
+    Returns:
+        (company_name, tier) where tier is cache, alias, heuristic, regex or llm
+    """
+    return company_name_extractor.extract(user_input)
+
+
+def initial_research_state(company_name):
+    """Build a fresh AgentState for a research run."""
+    return {
+        "messages": [],
+        "company_name": company_name,
+        "research_data": [],
+        "conflicting_info": False,
+        "clarification_question": "",
+        "conflicting_data": "",
+        "final_report": "",
+        "human_resolution": ""
+    }
+
+
+def sse_event(payload):
+    """Format a payload as a Server-Sent Events data frame."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def report_delta_event(message_chunk, metadata):
+    """
+    Turn a token chunk from stream_mode="messages" into a report_delta event.
+    
+    Only chunks produced inside the writer node are forwarded; reviewer output
+    and empty chunks return None.
+    """
+    if metadata.get("langgraph_node") != "writer":
+        return None
+    
+    content = message_chunk.content
+    if isinstance(content, list):
+        content = "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    if not content:
+        return None
+    
+    return {'type': 'report_delta', 'delta': content}
+
+
+def metrics_events(state, seen):
+    """
+    Yield a metrics event for each node whose metrics are new or changed.
+    
+    `seen` maps node name to the metrics already sent and is updated in place.
+    """
+    for node, node_metrics in (state.get('metrics') or {}).items():
+        if seen.get(node) != node_metrics:
+            seen[node] = node_metrics
+            yield {'type': 'metrics', 'node': node, 'metrics': node_metrics}
+
+
+def cached_report_event(company_name):
+    """Return a complete event for a fresh cached account plan, or None."""
+    cache = get_report_cache()
+    if cache is None:
+        return None
+    
+    entry = cache.get(company_name)
+    if entry is None:
+        return None
+    
+    print(f"💾 Serving cached account plan for {company_name} ({entry['age_seconds']}s old)")
+    return {'type': 'complete', 'report': entry['report'], 'cached': True, 'generated_at': entry['generated_at']}
+
+
+def store_report(result_state):
+    """Save a finished account plan and the research it was built from."""
+    cache = get_report_cache()
+    report = result_state.get('final_report', '')
+    research_data = result_state.get('research_data', [])
+    if cache is None or not is_cacheable_report(report, research_data):
+        return
+    
+    try:
+        cache.put(result_state['company_name'], report, research_data)
+    except Exception as e:
+        print(f"Report cache write failed: {e}")
+
+
+# Progress message sent when each research node finishes (reviewer depends on the outcome)
+NODE_PROGRESS = {
+    'researcher': '✅ Research data collected - analyzing for conflicts...',
+    'reviewer_conflict': '⚠️ Conflict detected - pausing for review...',
+    'reviewer': '📝 Generating comprehensive account plan...',
+}
+
+
+def start_research_run(company_name, incremental=False):
+    """
+    Prepare a research graph run and register it in active_sessions.
+    
+    Shared by the Flask and ASGI /api/research endpoints.
+    
+    Args:
+        company_name: Canonical company name
+        incremental: Refresh the stored account plan instead of writing a new one
+    
+    Returns:
+        (graph, config, initial_state)
+    """
+    initial_state = initial_research_state(company_name)
+    if incremental:
+        initial_state.update(incremental_state(company_name))
+    
+    # Reuse the shared compiled graph; runs are isolated by thread_id
+    graph = get_research_graph()
+    config = new_thread_config(f"session_{company_name}")
+    active_sessions.add(config["configurable"]["thread_id"], company_name, config)
+    return graph, config, initial_state
+
+
+def stream_chunk_events(mode, chunk, seen_metrics):
+    """
+    Turn one item of a stream_mode=["updates", "messages"] graph stream into
+    report_delta, metrics and progress event payloads.
+    """
+    if mode == "messages":
+        delta = report_delta_event(*chunk)
+        if delta:
+            yield delta
+        return
+    
+    for node, node_state in chunk.items():
+        # Interrupt markers are not node updates
+        if not isinstance(node_state, dict):
+            continue
+        yield from metrics_events(node_state, seen_metrics)
+        if node == 'reviewer' and node_state.get('conflicting_info'):
+            node = 'reviewer_conflict'
+        if node in NODE_PROGRESS:
+            yield {'type': 'progress', 'message': NODE_PROGRESS[node]}
+
+
+def finish_research_run(config, snapshot):
+    """
+    Settle a research run whose graph stream ended.
+    
+    A run paused at the human_review interrupt stays in active_sessions for
+    /api/resolve-conflict; a finished one is released and its report stored.
+    
+    Args:
+        config: Thread config from start_research_run
+        snapshot: Graph state snapshot (graph.get_state) after the stream
+    
+    Returns:
+        A conflict or complete event payload
+    """
+    thread_id = config["configurable"]["thread_id"]
+    result_state = snapshot.values
+    
+    # A pending next node means the graph stopped at the human_review interrupt
+    if snapshot.next and result_state.get("conflicting_info"):
+        active_sessions.update(thread_id, status="awaiting_resolution", state=result_state)
+        return {
+            'type': 'conflict',
+            'conflict_question': result_state.get('clarification_question', ''),
+            'conflicting_data': result_state.get('conflicting_data', ''),
+            'session_id': thread_id
+        }
+    
+    # No conflict - the thread will not be resumed
+    abandon_research_run(config)
+    store_report(result_state)
+    
+    event = {'type': 'complete', 'report': result_state.get('final_report', '')}
+    if result_state.get('refresh'):
+        event['refresh'] = result_state['refresh']
+    return event
+
+
+def abandon_research_run(config):
+    """Drop a run's session and checkpoints (finished, failed or client gone)."""
+    active_sessions.pop(config["configurable"]["thread_id"], None)
+    release_research_thread(config)
+
+
+def research_events(company_name, extraction_tier=None, force_refresh=False, incremental=False):
+    """
+    Run the research graph for a company and yield SSE event payloads.
+    
+    Yields progress and report_delta events while the graph runs, then a final
+    conflict, complete or error event. A fresh cached account plan is returned
+    as an immediate complete event unless force_refresh is set. With
+    incremental, the stored plan (of any age) is only rewritten where its
+    research changed, and the complete event says how in "refresh".
+    """
+    config = None
+    settled = False
+    try:
+        if not force_refresh:
+            cached = cached_report_event(company_name)
+            if cached:
+                yield cached
+                return
+        
+        # Send initial status
+        yield {'type': 'progress', 'message': f'🔍 Starting research for {company_name}...', 'extraction_tier': extraction_tier}
+        
+        graph, config, initial_state = start_research_run(company_name, incremental)
+        
+        yield {'type': 'progress', 'message': '📊 Gathering company data from multiple sources...'}
+        
+        seen_metrics = {}
+        for mode, chunk in graph.stream(initial_state, config, stream_mode=["updates", "messages"]):
+            yield from stream_chunk_events(mode, chunk, seen_metrics)
+        
+        event = finish_research_run(config, graph.get_state(config))
+        settled = True
+        yield event
+    
+    except Exception as e:
+        import traceback
+        print("Error in research_events():")
+        print(traceback.format_exc())
+        yield {'type': 'error', 'message': str(e)}
+    
+    finally:
+        # Failed run, or the consumer went away (client disconnect or job cancellation)
+        if config is not None and not settled:
+            abandon_research_run(config)
+
 
 @app.route('/api/research', methods=['POST'])
 def research_company():
@@ -27,98 +348,23 @@ def research_company():
         if not user_input:
             return jsonify({'error': 'Company name is required'}), 400
         
-        # Extract actual company name from natural language input using LLM
-        from src.graph import get_llm
-        from langchain_core.messages import SystemMessage, HumanMessage
-        
         print(f"📥 User input: {user_input}")
         
-        extraction_prompt = SystemMessage(content="""You are a company name extractor. 
-Extract ONLY the company name from the user's input. Return just the company name, nothing else.
-
-Examples:
-- "I want to research about a company called AstraZeneca" -> "AstraZeneca"
-- "Can you analyze Tesla for me?" -> "Tesla"
-- "Research Microsoft" -> "Microsoft"
-- "Tell me about Apple Inc" -> "Apple"
-- "accenture" -> "Accenture"
-
-Return ONLY the company name.""")
+        company_name, tier = extract_company_name(user_input)
         
-        llm = get_llm()
-        response = llm.invoke([extraction_prompt, HumanMessage(content=user_input)])
-        company_name = response.content.strip()
+        print(f"✅ Extracted company name: {company_name} (tier: {tier})")
         
-        print(f"✅ Extracted company name: {company_name}")
+        force_refresh = bool(data.get('force_refresh', False))
+        incremental = bool(data.get('incremental', False))
         
         def generate():
             """Generator function for streaming progress updates"""
-            try:
-                # Send initial status
-                yield f"data: {json.dumps({'type': 'progress', 'message': f'🔍 Starting research for {company_name}...'})}\n\n"
-                time.sleep(0.5)
-                
-                # Initialize state
-                initial_state = {
-                    "messages": [],
-                    "company_name": company_name,
-                    "research_data": [],
-                    "conflicting_info": False,
-                    "clarification_question": "",
-                    "conflicting_data": "",
-                    "final_report": "",
-                    "human_resolution": ""
-                }
-                
-                # Create graph and run
-                graph = create_research_graph()
-                thread_id = f"session_{company_name}_{id(graph)}"
-                config = {"configurable": {"thread_id": thread_id}}
-                
-                # Store in active sessions
-                active_sessions[company_name] = {
-                    "graph": graph,
-                    "thread_id": thread_id,
-                    "config": config
-                }
-                
-                yield f"data: {json.dumps({'type': 'progress', 'message': '📊 Gathering company data from multiple sources...'})}\n\n"
-                time.sleep(0.5)
-                
-                # Run the graph with progress tracking
-                result_state = None
-                last_node = None
-                
-                for state in graph.stream(initial_state, config, stream_mode="values"):
-                    result_state = state
-                    
-                    # Detect which node we're in based on state changes
-                    if state.get('research_data') and not last_node:
-                        last_node = 'researcher'
-                        yield f"data: {json.dumps({'type': 'progress', 'message': '✅ Research data collected - analyzing for conflicts...'})}\n\n"
-                        time.sleep(0.5)
-                    elif state.get('conflicting_info') and last_node == 'researcher':
-                        last_node = 'reviewer'
-                        yield f"data: {json.dumps({'type': 'progress', 'message': '⚠️ Conflict detected - pausing for review...'})}\n\n"
-                        time.sleep(0.5)
-                    elif state.get('final_report') and not state.get('conflicting_info'):
-                        last_node = 'writer'
-                        yield f"data: {json.dumps({'type': 'progress', 'message': '📝 Generating comprehensive account plan...'})}\n\n"
-                        time.sleep(0.5)
-                
-                # Check if we hit an interrupt (conflict detected)
-                if result_state.get("conflicting_info"):
-                    yield f"data: {json.dumps({'type': 'conflict', 'conflict_question': result_state.get('clarification_question', ''), 'conflicting_data': result_state.get('conflicting_data', ''), 'session_id': company_name})}\n\n"
-                else:
-                    # No conflict - return the report
-                    report = result_state.get('final_report', '')
-                    yield f"data: {json.dumps({'type': 'complete', 'report': report})}\n\n"
-                
-            except Exception as e:
-                import traceback
-                print("Error in generate():")
-                print(traceback.format_exc())
-                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            for event in research_events(company_name, extraction_tier=tier, force_refresh=force_refresh,
+                                         incremental=incremental):
+                yield sse_event(event)
+                # Pace progress updates so each one is visible in the UI
+                if event['type'] == 'progress' and PROGRESS_EVENT_DELAY > 0:
+                    time.sleep(PROGRESS_EVENT_DELAY)
         
         return Response(stream_with_context(generate()), mimetype='text/event-stream')
         
@@ -150,13 +396,17 @@ def resolve_conflict():
         if not session_id:
             return jsonify({'error': 'Session ID is required'}), 400
             
-        if session_id not in active_sessions:
+        # Release sessions that sat idle past their TTL before looking this one up
+        active_sessions.evict_idle()
+        
+        # Paused runs live in the shared checkpoint store, so any worker can resume them
+        config = get_paused_thread_config(session_id)
+        if config is None:
             return jsonify({'error': f'Session not found. Active sessions: {list(active_sessions.keys())}'}), 400
         
-        company_name = session_id
-        session = active_sessions[company_name]
-        graph = session['graph']
-        config = session['config']
+        active_sessions.update(session_id, status="resuming")
+        
+        graph = get_research_graph()
         
         # Update state with human resolution
         if resolution == 'proceed':
@@ -166,7 +416,8 @@ def resolve_conflict():
             }
         elif resolution == 'stop':
             # Clean up session
-            del active_sessions[company_name]
+            active_sessions.pop(session_id, None)
+            release_research_thread(config)
             return jsonify({
                 'status': 'stopped',
                 'message': 'Research stopped by user',
@@ -187,6 +438,60 @@ def resolve_conflict():
         # Update the graph state at the current checkpoint
         graph.update_state(config, updated_state, as_node="human_review")
         
+        def finish(result_state):
+            report = result_state.get('final_report', '') if result_state else ''
+            if result_state:
+                store_report(result_state)
+            print(f"\n{'='*60}")
+            print(f"✅ GRAPH EXECUTION COMPLETED")
+            print(f"📄 Report length: {len(report)} characters")
+            if report:
+                print(f"📄 Report preview: {report[:150]}...")
+            else:
+                print(f"⚠️ WARNING: No report generated!")
+            print(f"{'='*60}\n")
+            
+            # Clean up session
+            active_sessions.pop(session_id, None)
+            release_research_thread(config)
+            
+            result = {
+                'status': 'completed',
+                'message': 'Research completed with human resolution',
+                'report': report,
+                'metrics': result_state.get('metrics', {}) if result_state else {}
+            }
+            if result_state and result_state.get('refresh'):
+                result['refresh'] = result_state['refresh']
+            return result
+        
+        # Streaming clients receive report_delta frames followed by a complete frame
+        if data.get('stream'):
+            def generate():
+                try:
+                    result_state = None
+                    # Metrics of the nodes that ran before the pause were already sent
+                    seen_metrics = dict(graph.get_state(config).values.get('metrics') or {})
+                    for mode, chunk in graph.stream(None, config, stream_mode=["values", "messages"]):
+                        if mode == "messages":
+                            delta = report_delta_event(*chunk)
+                            if delta:
+                                yield sse_event(delta)
+                            continue
+                        result_state = chunk
+                        for event in metrics_events(chunk, seen_metrics):
+                            yield sse_event(event)
+                    
+                    yield sse_event({'type': 'complete', **finish(result_state)})
+                
+                except Exception as e:
+                    import traceback
+                    print("Error in resolve_conflict generate():")
+                    print(traceback.format_exc())
+                    yield sse_event({'type': 'error', 'message': str(e)})
+            
+            return Response(stream_with_context(generate()), mimetype='text/event-stream')
+        
         # Resume execution from the updated state
         result_state = None
         for state in graph.stream(None, config, stream_mode="values"):
@@ -196,24 +501,7 @@ def resolve_conflict():
                 print(f"✅ Report generated in stream!")
                 break
         
-        report = result_state.get('final_report', '')
-        print(f"\n{'='*60}")
-        print(f"✅ GRAPH EXECUTION COMPLETED")
-        print(f"📄 Report length: {len(report)} characters")
-        if report:
-            print(f"📄 Report preview: {report[:150]}...")
-        else:
-            print(f"⚠️ WARNING: No report generated!")
-        print(f"{'='*60}\n")
-        
-        # Clean up session
-        del active_sessions[company_name]
-        
-        return jsonify({
-            'status': 'completed',
-            'message': 'Research completed with human resolution',
-            'report': report
-        })
+        return jsonify(finish(result_state))
         
     except Exception as e:
         import traceback
@@ -221,6 +509,24 @@ def resolve_conflict():
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
+def pdf_response(pdf, etag, company_name):
+    """
+    Send a rendered PDF tagged with its content hash.
+    
+    Content-Location points at the GET /api/pdf/<etag> URL, which serves the
+    same bytes from the PDF cache and supports conditional requests.
+    """
+    response = send_file(
+        BytesIO(pdf),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'{company_name}_account_plan.pdf'
+    )
+    response.set_etag(etag)
+    response.headers['Content-Location'] = f'/api/pdf/{etag}'
+    return response
+
+
 @app.route('/api/download-pdf', methods=['POST'])
 def download_pdf():
     try:
@@ -230,280 +536,123 @@ def download_pdf():
         
         print(f"📄 PDF generation request for: {company_name}")
         
-        # Create PDF in memory
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=letter,
-            rightMargin=60, 
-            leftMargin=60,
-            topMargin=60, 
-            bottomMargin=40,
-            title=f"{company_name} Account Plan"
-        )
+        # Identical markdown always renders to the same PDF, so its hash is the ETag
+        etag = pdf_key(content, company_name, PDF_STYLE_VERSION)
         
-        # Container for PDF elements
-        elements = []
-        
-        # Define professional styles
-        styles = getSampleStyleSheet()
-        
-        # Title style (company name)
-        title_style = ParagraphStyle(
-            'CompanyTitle',
-            parent=styles['Heading1'],
-            fontSize=26,
-            textColor=colors.HexColor('#ff4444'),
-            spaceAfter=6,
-            spaceBefore=0,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
+        pdf_cache = get_pdf_cache()
+        if pdf_cache is not None:
+            cached = pdf_cache.get(etag)
+            if cached is not None:
+                print(f"⚡ Serving cached PDF: {len(cached)} bytes")
+                return pdf_response(cached, etag, company_name)
         
-        # Subtitle style
-        subtitle_style = ParagraphStyle(
-            'Subtitle',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor('#666666'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica'
-        )
+        pdf = render_pdf(content, company_name)
         
-        # Section heading style (## headers)
-        section_style = ParagraphStyle(
-            'SectionHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=10,
-            spaceBefore=16,
-            fontName='Helvetica-Bold',
-            borderColor=colors.HexColor('#ff4444'),
-            borderWidth=0,
-            borderPadding=0,
-            leftIndent=0
-        )
+        print(f"✅ PDF generated successfully: {len(pdf)} bytes")
         
-        # Subsection style (### headers)
-        subsection_style = ParagraphStyle(
-            'SubsectionHeading',
-            parent=styles['Heading3'],
-            fontSize=13,
-            textColor=colors.HexColor('#444444'),
-            spaceAfter=8,
-            spaceBefore=12,
-            fontName='Helvetica-Bold'
-        )
+        if pdf_cache is not None:
+            pdf_cache.put(etag, pdf)
         
-        # Body text style
-        body_style = ParagraphStyle(
-            'BodyText',
-            parent=styles['BodyText'],
-            fontSize=10,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=8,
-            spaceBefore=0,
-            alignment=TA_JUSTIFY,
-            fontName='Helvetica',
-            leading=14
-        )
-        
-        # Bullet point style
-        bullet_style = ParagraphStyle(
-            'BulletPoint',
-            parent=styles['BodyText'],
-            fontSize=10,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=6,
-            leftIndent=20,
-            fontName='Helvetica',
-            leading=13
-        )
+        return pdf_response(pdf, etag, company_name)
         
-        # Parse markdown content
-        lines = content.split('\n')
-        i = 0
-        in_table = False
-        table_data = []
-        
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Skip empty lines
-            if not line:
-                if not in_table:
-                    elements.append(Spacer(1, 0.15 * inch))
-                i += 1
-                continue
-            
-            # Handle main title (# header - company name)
-            if line.startswith('# ') and i < 3:  # Main title at the top
-                text = line.replace('# ', '').replace('Account Plan:', '').strip()
-                elements.append(Paragraph(text, title_style))
-                elements.append(Paragraph('Account Plan & Strategic Analysis', subtitle_style))
-                elements.append(Spacer(1, 0.3 * inch))
-                i += 1
-                continue
-            
-            # Handle section headers (## )
-            elif line.startswith('## '):
-                text = line.replace('## ', '')
-                # Add section divider line
-                elements.append(Spacer(1, 0.1 * inch))
-                elements.append(Paragraph(text, section_style))
-                # Add underline
-                elements.append(Spacer(1, 0.05 * inch))
-                i += 1
-                continue
-            
-            # Handle subsection headers (###)
-            elif line.startswith('### '):
-                text = line.replace('### ', '')
-                elements.append(Paragraph(text, subsection_style))
-                i += 1
-                continue
-            
-            # Handle table rows
-            elif line.startswith('|'):
-                if not in_table:
-                    in_table = True
-                    table_data = []
-                
-                # Parse table row
-                cells = [cell.strip() for cell in line.split('|')[1:-1]]
-                
-                # Skip separator rows (----)
-                if all('-' in cell for cell in cells):
-                    i += 1
-                    continue
-                
-                # Clean up cell content - remove markdown formatting
-                cleaned_cells = []
-                for cell in cells:
-                    # Remove ** for bold
-                    cell = cell.replace('**', '')
-                    # Replace <br> with line breaks
-                    cell = cell.replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-                    # Replace - bullet points with actual bullets
-                    cell = re.sub(r'^\s*-\s+', '• ', cell)
-                    # Clean up multiple spaces
-                    cell = re.sub(r'\s+', ' ', cell)
-                    cleaned_cells.append(cell)
-                
-                table_data.append(cleaned_cells)
-                i += 1
-                
-                # Check if next line is still part of table
-                if i < len(lines) and not lines[i].strip().startswith('|'):
-                    # End of table - render it
-                    if table_data:
-                        # Convert table cells to Paragraph objects for better text wrapping
-                        wrapped_table_data = []
-                        for row_idx, row in enumerate(table_data):
-                            wrapped_row = []
-                            for col_idx, cell in enumerate(row):
-                                if row_idx == 0:
-                                    # Header row - keep as plain text
-                                    wrapped_row.append(cell)
-                                else:
-                                    # Body rows - wrap in Paragraph for automatic line breaking
-                                    para = Paragraph(cell, bullet_style)
-                                    wrapped_row.append(para)
-                            wrapped_table_data.append(wrapped_row)
-                        
-                        # Create table with appropriate column widths (total width = 6.5")
-                        table = Table(wrapped_table_data, colWidths=[1.3*inch, 5.2*inch])
-                        table.setStyle(TableStyle([
-                            # Header row styling
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ff4444')),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                            ('FONTSIZE', (0, 0), (-1, 0), 11),
-                            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                            ('TOPPADDING', (0, 0), (-1, 0), 12),
-                            
-                            # Body rows styling
-                            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                            ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#333333')),
-                            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                            ('FONTSIZE', (0, 1), (-1, -1), 9),
-                            ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
-                            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                            ('TOPPADDING', (0, 1), (-1, -1), 8),
-                            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                            
-                            # Grid
-                            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
-                            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#ff4444')),
-                            
-                            # Alternating row colors
-                            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
-                        ]))
-                        elements.append(table)
-                        elements.append(Spacer(1, 0.2 * inch))
-                        table_data = []
-                    in_table = False
-                continue
-            
-            # Handle bold bullet points (• **text:** content)
-            elif line.startswith('* **') or line.startswith('- **'):
-                in_table = False
-                text = line.replace('* ', '').replace('- ', '')
-                # Remove ** for bold and use <b> tags
-                text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-                # Remove any remaining <br> tags
-                text = text.replace('<br>', ' ').replace('<br/>', ' ').replace('<br />', ' ')
-                elements.append(Paragraph(f"• {text}", bullet_style))
-                i += 1
-                continue
-            
-            # Handle regular bullet points
-            elif line.startswith('* ') or line.startswith('- ') or re.match(r'^\d+\.', line):
-                in_table = False
-                text = re.sub(r'^[\*\-]\s+', '', line)
-                text = re.sub(r'^\d+\.\s+', '', text)
-                # Convert **bold** to <b>bold</b>
-                text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-                # Remove any <br> tags
-                text = text.replace('<br>', ' ').replace('<br/>', ' ').replace('<br />', ' ')
-                elements.append(Paragraph(f"• {text}", bullet_style))
-                i += 1
-                continue
-            
-            # Handle regular paragraphs
-            else:
-                in_table = False
-                # Convert **bold** to <b>bold</b>
-                text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', line)
-                # Convert *italic* to <i>italic</i>
-                text = re.sub(r'\*(.*?)\*', r'<i>\1</i>', text)
-                # Remove any <br> tags
-                text = text.replace('<br>', ' ').replace('<br/>', ' ').replace('<br />', ' ')
-                elements.append(Paragraph(text, body_style))
-                i += 1
-                continue
-        
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        print(f"✅ PDF generated successfully: {len(buffer.getvalue())} bytes")
-        
-        return send_file(
-            buffer,
+    except Exception as e:
+        import traceback
+        print("Error generating PDF:")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/pdf/<etag>', methods=['GET'])
+def get_cached_pdf(etag):
+    """
+    Serve a PDF rendered earlier by /api/download-pdf, by its ETag.
+    
+    The URL is content-addressed, so a matching If-None-Match always gets a
+    304 and the response may be cached indefinitely. Returns 404 once the PDF
+    has left the cache (or caching is disabled); POST the report again then.
+    """
+    if not re.fullmatch(r'[0-9a-f]{64}', etag):
+        return jsonify({'error': 'Invalid PDF id'}), 404
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        pdf_cache = get_pdf_cache()
+        pdf = pdf_cache.get(etag) if pdf_cache is not None else None
+        if pdf is None:
+            return jsonify({'error': 'PDF not found; request it from /api/download-pdf'}), 404
+        response = send_file(
+            BytesIO(pdf),
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=f'{company_name}_account_plan.pdf'
+            download_name=f"{request.args.get('company_name', 'Report')}_account_plan.pdf"
+        )
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+@app.route('/api/download-pdf/bulk', methods=['POST'])
+def download_pdf_bulk():
+    """
+    Export many account plans at once, rendered in a process pool.
+    
+    Accepts JSON with "reports" (a list of {"company_name", "content"}) and/or
+    "report_ids" (company names of cached account plans), plus "format":
+    "zip" (default, one PDF per report) or "pdf" (one merged PDF with a table
+    of contents). The file is streamed back as it is produced.
+    """
+    try:
+        data = request.json or {}
+        export_format = data.get('format', 'zip')
+        if export_format not in ('zip', 'pdf'):
+            return jsonify({'error': 'format must be "zip" or "pdf"'}), 400
+        
+        reports = []
+        for item in data.get('reports') or []:
+            if not isinstance(item, dict) or not item.get('content'):
+                return jsonify({'error': 'Each report needs "content" markdown'}), 400
+            reports.append({'company_name': item.get('company_name') or 'Report', 'content': item['content']})
+        
+        report_ids = data.get('report_ids') or []
+        if report_ids:
+            report_cache = get_report_cache()
+            if report_cache is None:
+                return jsonify({'error': 'Report cache is disabled, send "reports" instead'}), 400
+            missing = []
+            for report_id in report_ids:
+                entry = report_cache.get(str(report_id), max_age=-1)
+                if entry is None:
+                    missing.append(report_id)
+                else:
+                    reports.append({'company_name': entry['company_name'], 'content': entry['report']})
+            if missing:
+                return jsonify({'error': 'No cached report for some IDs', 'missing': missing}), 404
+        
+        if not reports:
+            return jsonify({'error': 'Send "reports" or "report_ids"'}), 400
+        if len(reports) > PDF_EXPORT_MAX_REPORTS:
+            return jsonify({'error': f'Too many reports: {len(reports)} (max {PDF_EXPORT_MAX_REPORTS})'}), 400
+        
+        print(f"📦 Bulk PDF export request: {len(reports)} reports as {export_format}")
+        
+        if export_format == 'pdf':
+            title = data.get('title') or 'Account Plans'
+            # Rendered up front so a failure is a 500, not a truncated download
+            pdf = render_bundle(reports, title)
+            return Response(
+                stream_bytes(pdf),
+                mimetype='application/pdf',
+                headers={'Content-Disposition': 'attachment; filename="account_plans.pdf"'}
+            )
+        
+        return Response(
+            stream_with_context(stream_zip(reports)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': 'attachment; filename="account_plans.zip"'}
         )
         
     except Exception as e:
         import traceback
-        print("Error generating PDF:")
+        print("Error in download_pdf_bulk:")
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
@@ -521,65 +670,185 @@ def edit_section():
         
         if not edit_instructions or not full_report:
             return jsonify({'error': 'Missing required fields'}), 400
+        sections = data.get('sections')
+        if sections is not None and (not isinstance(sections, list) or not all(isinstance(title, str) for title in sections)):
+            return jsonify({'error': '"sections" must be a list of section headings'}), 400
+        
+        # Only the sections the instructions are about are regenerated
+        result = edit_report(full_report, edit_instructions, company_name, sections)
         
-        # Use Gemini to update the report based on instructions
-        from src.graph import get_llm
-        from langchain_core.messages import SystemMessage, HumanMessage
+        if result['mode'] == 'sections':
+            print(f"  ✓ Edited sections: {', '.join(result['edited_sections']) or 'new section only'}")
+        else:
+            print(f"  ✓ Regenerated the full report")
+        print(f"✅ Report updated ({len(result['updated_report'])} characters, {len(result['diff'])} sections changed)")
         
-        system_prompt = """You are an expert Sales Strategist updating an account plan based on user feedback.
+        return jsonify({
+            'status': 'success',
+            'message': 'Report updated based on your instructions',
+            'updated_report': result['updated_report'],
+            'mode': result['mode'],
+            'edited_sections': result['edited_sections'],
+            'diff': result['diff']
+        })
+        
+    except UnknownSectionError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        print("Error in edit_section:")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
 
-Your task:
-1. Read the current account plan carefully
-2. Apply the user's editing instructions to improve the report
-3. Return the COMPLETE updated report in markdown format
-4. Maintain the same structure and section headers
-5. Keep the professional style and formatting
-6. Only modify the parts requested by the user, keep everything else intact
+def run_research_job(job):
+    """Job runner: resolve the company name, then stream the research events."""
+    company_name, tier = extract_company_name(job.payload['company_name'])
+    job.payload['resolved_company_name'] = company_name
+    job.payload['extraction_tier'] = tier
+    yield from research_events(company_name, extraction_tier=tier, force_refresh=job.payload.get('force_refresh', False),
+                               incremental=job.payload.get('incremental', False))
 
-IMPORTANT: Return the FULL report with all sections, not just the changed parts."""
 
-        user_prompt = f"""Current Account Plan:
+# Background research jobs served by a fixed worker pool
+research_jobs = JobQueue(run_research_job)
 
-{full_report}
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    data = request.json or {}
+    user_input = data.get('company_name')
+    
+    if not user_input:
+        return jsonify({'error': 'Company name is required'}), 400
+    
+    try:
+        job = research_jobs.submit({
+            'company_name': user_input,
+            'force_refresh': bool(data.get('force_refresh', False)),
+            'incremental': bool(data.get('incremental', False))
+        })
+    except QueueFullError as e:
+        response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+    
+    print(f"📥 Queued research job {job.id} for: {user_input}")
+    
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/jobs/{job.id}',
+        'events_url': f'/api/jobs/{job.id}/events'
+    }), 202
 
----
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = research_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
 
-User's editing instructions:
-{edit_instructions}
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    job = research_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def generate():
+        """Replay the job's events so far, then follow it until it finishes"""
+        for event in job.iter_events():
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield sse_event(event)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
 
-Please update the account plan following these instructions and return the complete updated report."""
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = research_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
 
-        print(f"  → Sending to Gemini for report update...")
-        
-        llm = get_llm()
-        llm_messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt)
-        ]
-        
-        response = llm.invoke(llm_messages)
-        updated_report = response.content.strip()
-        
-        # Clean up markdown code blocks if present
-        if "```markdown" in updated_report:
-            updated_report = updated_report.split("```markdown")[1].split("```")[0].strip()
-        elif "```" in updated_report:
-            updated_report = updated_report.replace("```", "").strip()
+@app.route('/api/batch', methods=['POST'])
+def research_batch():
+    """
+    Research a list of companies and stream one batch_result event per company,
+    followed by a batch_summary event.
+    
+    Accepts JSON {"companies": ["name", ...]} or {"text": "<csv or json>"}, or a
+    multipart upload with a CSV/JSON "file". Optional fields: max_parallel,
+    on_conflict ("proceed" or "skip"), incremental (refresh the stored
+    account plans, rewriting only what changed).
+    """
+    try:
+        if 'file' in request.files:
+            upload = request.files['file']
+            fmt = 'json' if upload.filename.lower().endswith('.json') else 'auto'
+            companies = parse_companies(upload.read().decode('utf-8'), fmt)
+            options = request.form
+        else:
+            data = request.json or {}
+            if 'companies' in data:
+                names = data['companies']
+                if not isinstance(names, list) or not all(isinstance(name, str) and name.strip() for name in names):
+                    return jsonify({'error': '"companies" must be a list of non-empty company names'}), 400
+                companies = parse_companies(json.dumps(names), 'json')
+            else:
+                companies = parse_companies(data.get('text', ''))
+            options = data
+        
+        if not companies:
+            return jsonify({'error': 'At least one company name is required'}), 400
+        if len(companies) > BATCH_MAX_COMPANIES:
+            return jsonify({'error': f'Batch too large: {len(companies)} companies (max {BATCH_MAX_COMPANIES})'}), 400
+        
+        try:
+            max_parallel = int(options.get('max_parallel', BATCH_MAX_PARALLEL))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'max_parallel must be a whole number'}), 400
+        if max_parallel < 1:
+            return jsonify({'error': 'max_parallel must be at least 1'}), 400
+        max_parallel = min(max_parallel, BATCH_MAX_PARALLEL)
+        on_conflict = options.get('on_conflict', 'proceed')
+        if on_conflict not in ('proceed', 'skip'):
+            return jsonify({'error': 'on_conflict must be "proceed" or "skip"'}), 400
+        # Form fields arrive as strings
+        incremental = options.get('incremental', False)
+        if isinstance(incremental, str):
+            incremental = incremental.lower() in ('1', 'true', 'yes')
+        
+        print(f"📥 Batch research request: {len(companies)} companies, parallelism {max_parallel}")
         
-        print(f"  ✓ Report updated ({len(updated_report)} characters)")
-        print(f"✅ Report regenerated successfully with AI")
+        def generate():
+            for event in run_batch(companies, max_parallel=max_parallel, on_conflict=on_conflict,
+                                   incremental=bool(incremental)):
+                yield sse_event(event)
         
-        return jsonify({
-            'status': 'success',
-            'message': 'Report updated based on your instructions',
-            'updated_report': updated_report
-        })
+        return Response(stream_with_context(generate()), mimetype='text/event-stream')
         
     except Exception as e:
         import traceback
-        print("Error in edit_section:")
+        print("Error in research_batch:")
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/jobs', methods=['GET'])
+def job_stats():
+    """Report worker pool and queue utilisation for research jobs."""
+    if ADMIN_TOKEN and request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify(research_jobs.stats())
+
+@app.route('/api/admin/sessions', methods=['GET'])
+def list_sessions():
+    """List live research sessions in this process and their memory footprint."""
+    if ADMIN_TOKEN and request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify(active_sessions.snapshot())
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
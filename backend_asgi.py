@@ -0,0 +1,119 @@
+"""
+ASGI entry point for the StratifyAI backend.
+
+Serves an async /api/research endpoint that streams node-level progress from
+graph.astream, so an open SSE connection costs an event-loop task rather than
+a blocked worker thread. Every other route is served by the Flask app in
+backend_api.py, mounted in the same process so conflict sessions are shared.
+
+Run with:
+    uvicorn backend_asgi:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import time
+import traceback
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route, request_response
+
+import backend_api
+from backend_api import (abandon_research_run, cached_report_event, extract_company_name, finish_research_run,
+                         sse_event, start_research_run, stream_chunk_events)
+from src.telemetry import observe_request
+
+
+def record_request(started, method, status):
+    """Background task recording /api/research in /metrics once the response is sent."""
+    return BackgroundTask(lambda: observe_request('/api/research', method, status, time.perf_counter() - started))
+
+
+async def research_company(request):
+    started = time.perf_counter()
+    if request.method != 'POST':
+        return JSONResponse({'error': 'Method not allowed'}, status_code=405,
+                            background=record_request(started, request.method, 405))
+
+    try:
+        data = await request.json()
+        user_input = data.get('company_name')
+
+        if not user_input:
+            return JSONResponse({'error': 'Company name is required'}, status_code=400,
+                                background=record_request(started, 'POST', 400))
+
+        print(f"📥 User input: {user_input}")
+
+        company_name, tier = await asyncio.to_thread(extract_company_name, user_input)
+
+        print(f"✅ Extracted company name: {company_name} (tier: {tier})")
+
+        force_refresh = bool(data.get('force_refresh', False))
+        incremental = bool(data.get('incremental', False))
+
+    except Exception as e:
+        print("Error in research_company:")
+        print(traceback.format_exc())
+        return JSONResponse({'error': str(e)}, status_code=500,
+                            background=record_request(started, 'POST', 500))
+
+    async def generate():
+        """Async generator streaming one progress event per finished node"""
+        config = None
+        settled = False
+        try:
+            if not force_refresh:
+                cached = await asyncio.to_thread(cached_report_event, company_name)
+                if cached:
+                    yield sse_event(cached)
+                    return
+
+            yield sse_event({'type': 'progress', 'message': f'🔍 Starting research for {company_name}...', 'extraction_tier': tier})
+
+            graph, config, initial_state = await asyncio.to_thread(start_research_run, company_name, incremental)
+
+            yield sse_event({'type': 'progress', 'message': '📊 Gathering company data from multiple sources...'})
+
+            seen_metrics = {}
+            async for mode, chunk in graph.astream(initial_state, config, stream_mode=["updates", "messages"]):
+                for event in stream_chunk_events(mode, chunk, seen_metrics):
+                    yield sse_event(event)
+
+            snapshot = await graph.aget_state(config)
+            event = await asyncio.to_thread(finish_research_run, config, snapshot)
+            settled = True
+            yield sse_event(event)
+
+        except Exception as e:
+            print("Error in generate():")
+            print(traceback.format_exc())
+            yield sse_event({'type': 'error', 'message': str(e)})
+
+        finally:
+            # Failed run, or the client disconnected (the task is cancelled mid-stream)
+            if config is not None and not settled:
+                abandon_research_run(config)
+
+    return StreamingResponse(generate(), media_type='text/event-stream',
+                             background=record_request(started, 'POST', 200))
+
+
+# The async route carries its own CORS handling; mounted Flask routes use flask_cors
+research_endpoint = CORSMiddleware(
+    request_response(research_company),
+    allow_origins=['*'],
+    allow_methods=['POST'],
+    allow_headers=['*']
+)
+
+app = Starlette(routes=[
+    Route('/api/research', research_endpoint),
+    Mount('/', app=WSGIMiddleware(backend_api.app)),
+])
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,193 @@
+"""
+Offline stand-ins for Tavily and Gemini used by the benchmark harness.
+
+Both replay the JSON fixtures in benchmarks/fixtures with configurable latency
+and jitter, so graph and endpoint performance can be measured without network
+access or API keys.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Companies whose name starts with this prefix get conflicting search results
+CONFLICT_PREFIX = "Conflict"
+
+
+def _load_fixture(name: str) -> dict:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+TAVILY_FIXTURES = _load_fixture("tavily_responses.json")
+GEMINI_FIXTURES = _load_fixture("gemini_responses.json")
+
+
+# ============================================================================
+# LATENCY MODEL
+# ============================================================================
+
+class Latency:
+    """Base latency in seconds with uniform ±jitter (a fraction of the base)."""
+
+    def __init__(self, seconds: float = 0.0, jitter: float = 0.0, seed: Optional[int] = None):
+        self.seconds = seconds
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            spread = self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.seconds * (1 + spread))
+
+    def sleep(self) -> None:
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+
+tavily_latency = Latency()
+gemini_latency = Latency()
+
+
+def configure(tavily_seconds: float, gemini_seconds: float, jitter: float, seed: int = 0) -> None:
+    """Set the simulated latency of every fake Tavily and Gemini call."""
+    global tavily_latency, gemini_latency
+    tavily_latency = Latency(tavily_seconds, jitter, seed)
+    gemini_latency = Latency(gemini_seconds, jitter, seed + 1)
+
+
+def _fill(text: str, company: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-")
+    return text.replace("{company}", company).replace("{slug}", slug)
+
+
+# ============================================================================
+# FAKE TAVILY
+# ============================================================================
+
+class FakeTavilyClient:
+    """Drop-in for tavily.TavilyClient that replays recorded search results."""
+
+    _TOPICS = ("overview", "news", "products", "market")
+
+    def __init__(self, api_key: Optional[str] = None, **kwargs):
+        self.api_key = api_key
+
+    def search(self, query: str, search_depth: str = "basic", max_results: int = 5, **kwargs) -> dict:
+        tavily_latency.sleep()
+
+        topic = next((t for t in self._TOPICS if t in query.lower()), "overview")
+        # Queries start with the company name: the leading run of capitalized words
+        match = re.match(r"(?:[A-Z0-9][\w&.'-]*\s*)+", query)
+        company = match.group(0).strip() if match else query.split()[0]
+
+        results = [
+            {key: _fill(value, company) if isinstance(value, str) else value for key, value in result.items()}
+            for result in TAVILY_FIXTURES[topic]
+        ]
+        if company.startswith(CONFLICT_PREFIX) and topic == "overview":
+            results = [
+                {key: _fill(value, company) if isinstance(value, str) else value for key, value in result.items()}
+                for result in TAVILY_FIXTURES["conflicting"]
+            ] + results
+
+        return {"query": query, "results": results[:max_results]}
+
+
+# ============================================================================
+# FAKE GEMINI
+# ============================================================================
+
+def _company_in(messages: List[BaseMessage]) -> str:
+    text = str(messages[-1].content)
+    match = re.search(r"(?:about|for) (.+?)(?::|\n| based on)", text)
+    return match.group(1).strip() if match else "Company"
+
+
+def fake_answer(messages: List[BaseMessage]) -> str:
+    """Pick the fixture response matching the prompt the graph sent."""
+    system = str(messages[0].content)
+    prompt = str(messages[-1].content)
+    company = _company_in(messages)
+
+    if "company name extractor" in system:
+        words = re.findall(r"[A-Z][\w&.-]*", prompt)
+        return words[-1] if words else prompt.split()[-1]
+    if "ONE BATCH" in system:
+        return json.dumps(GEMINI_FIXTURES["batch"])
+    if "auditor" in system:
+        # Conflicts come from the deterministic numeric check's hints
+        key = "reviewer_conflict" if "numeric check flagged" in prompt else "reviewer_clean"
+        return _fill(json.dumps(GEMINI_FIXTURES[key]), company)
+    if "rewriting sections" in system:
+        sections = prompt.split("Sections to update:", 1)[-1].split("\n---\n", 1)[0].strip()
+        if sections.startswith("(none"):
+            return GEMINI_FIXTURES["edit_note"].strip()
+        return sections + "\n" + GEMINI_FIXTURES["edit_note"]
+    if "refreshing sections" in system:
+        return prompt.split("Sections to update:", 1)[-1].split("\n---\n", 1)[0].strip()
+    if "updating an account plan" in system:
+        report = prompt.split("Current Account Plan:", 1)[-1].split("\n---\n", 1)[0].strip()
+        return report + "\n" + GEMINI_FIXTURES["edit_note"]
+    return _fill(GEMINI_FIXTURES["report"], company)
+
+
+class FakeChatModel(BaseChatModel):
+    """Drop-in for ChatGoogleGenerativeAI that replays recorded responses."""
+
+    model: str = "fake-gemini"
+    temperature: float = 0.7
+    google_api_key: Any = None
+    chunk_chars: int = 64
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    def _usage(self, messages: List[BaseMessage], text: str) -> dict:
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        completion_tokens = len(text) // 4
+        return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        gemini_latency.sleep()
+        text = fake_answer(messages)
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        # Time to first token takes most of the latency, the rest is spread over chunks
+        delay = gemini_latency.sample()
+        time.sleep(delay * 0.6)
+        text = fake_answer(messages)
+        chunks = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+        for idx, piece in enumerate(chunks):
+            usage = self._usage(messages, text) if idx == len(chunks) - 1 else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece, usage_metadata=usage))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+            time.sleep(delay * 0.4 / len(chunks))
+
+
+def install() -> None:
+    """Route src.graph's Tavily and Gemini clients to the fakes."""
+    import src.graph as graph
+
+    graph.TavilyClient = FakeTavilyClient
+    graph.ChatGoogleGenerativeAI = FakeChatModel
+    with graph._llm_clients_lock:
+        graph._llm_clients.clear()
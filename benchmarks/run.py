@@ -0,0 +1,270 @@
+"""
+Offline benchmark harness for the research graph and the Flask API.
+
+Tavily and Gemini are replaced by the fixture-replaying fakes in
+benchmarks/fakes.py, so runs need no network access or API keys. Each
+scenario runs in its own process so peak RSS is measured per scenario.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --scenario no_conflict --scenario pdf --iterations 50 --concurrency 8
+    python -m benchmarks.run --tavily-latency 1.2 --gemini-latency 3 --jitter 0.3 --json results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+SCENARIOS = ("graph", "refresh", "no_conflict", "conflict_resume", "pdf", "render", "edit")
+
+
+# ============================================================================
+# SCENARIOS
+# ============================================================================
+
+def _sse_events(response) -> List[dict]:
+    events = []
+    for line in response.get_data(as_text=True).splitlines():
+        if line.startswith("data: "):
+            events.append(json.loads(line[6:]))
+    response.close()
+    return events
+
+
+def _build_scenario(name: str) -> Callable[[int], None]:
+    """Return a callable running one iteration of the scenario; it raises on failure."""
+    import backend_api
+    from benchmarks.fakes import GEMINI_FIXTURES, _fill
+    from src.batch import research_one
+    from src.graph import get_research_graph, new_thread_config, release_research_thread
+    from src.pdf_render import THEMES, render_pdf
+
+    client = backend_api.app.test_client()
+    report = _fill(GEMINI_FIXTURES["report"], "Benchmark Corp")
+
+    def graph(i):
+        result = research_one(f"Graph Corp {i}")
+        if result["status"] != "completed":
+            raise RuntimeError(result["error"] or result["status"])
+
+    # Incremental refresh of an unchanged plan: searches run, review and writing are skipped
+    def run_graph(extra: dict) -> dict:
+        config = new_thread_config("bench_refresh")
+        try:
+            return get_research_graph().invoke({
+                "messages": [], "company_name": "Refresh Corp", "research_data": [],
+                "conflicting_info": False, "clarification_question": "", "conflicting_data": "",
+                "final_report": "", "human_resolution": "", **extra
+            }, config)
+        finally:
+            release_research_thread(config)
+
+    baseline = run_graph({}) if name == "refresh" else None
+
+    def refresh(i):
+        state = run_graph({"previous_report": baseline["final_report"], "previous_research": baseline["research_data"]})
+        if (state.get("refresh") or {}).get("mode") != "unchanged":
+            raise RuntimeError(f"expected an unchanged refresh, got: {state.get('refresh')}")
+
+    def no_conflict(i):
+        events = _sse_events(client.post("/api/research", json={"company_name": f"Clean Corp {i}", "force_refresh": True}))
+        if not events or events[-1]["type"] != "complete":
+            raise RuntimeError(f"unexpected final event: {events[-1] if events else None}")
+
+    def conflict_resume(i):
+        events = _sse_events(client.post("/api/research", json={"company_name": f"Conflict Corp {i}", "force_refresh": True}))
+        if not events or events[-1]["type"] != "conflict":
+            raise RuntimeError(f"expected a conflict, got: {events[-1] if events else None}")
+        response = client.post("/api/resolve-conflict", json={"resolution": "proceed", "session_id": events[-1]["session_id"]})
+        body = response.get_json()
+        response.close()
+        if response.status_code != 200 or not body.get("report"):
+            raise RuntimeError(f"resume failed: {response.status_code} {body}")
+
+    def pdf(i):
+        response = client.post("/api/download-pdf", json={"content": report, "company_name": f"Benchmark Corp {i}"})
+        size = len(response.get_data())
+        response.close()
+        if response.status_code != 200 or not size:
+            raise RuntimeError(f"PDF failed: {response.status_code}")
+
+    def render(i):
+        # Rendering alone, without HTTP or the PDF cache, across every theme
+        for theme in THEMES:
+            if not render_pdf(report, f"Benchmark Corp {i}", theme=theme):
+                raise RuntimeError(f"empty PDF for theme {theme}")
+
+    edit_instructions = ("Add a next steps section", "Make the SWOT threats more specific")
+
+    def edit(i):
+        response = client.post("/api/edit-section", json={
+            "company_name": "Benchmark Corp",
+            "edit_instructions": edit_instructions[i % len(edit_instructions)],
+            "full_report": report
+        })
+        body = response.get_json()
+        response.close()
+        if response.status_code != 200 or not body.get("updated_report"):
+            raise RuntimeError(f"edit failed: {response.status_code} {body}")
+
+    return locals()[name]
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linearly interpolated percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_in_process(name: str, options: dict, results) -> None:
+    os.environ.update(options["env"])
+
+    from benchmarks import fakes
+    fakes.configure(options["tavily_latency"], options["gemini_latency"], options["jitter"], options["seed"])
+    fakes.install()
+
+    log = io.StringIO() if not options["verbose"] else sys.stdout
+    with contextlib.redirect_stdout(log):
+        run_once = _build_scenario(name)
+        for i in range(options["warmup"]):
+            run_once(-1 - i)
+
+        latencies = []
+        errors = []
+
+        def timed(i):
+            started = time.perf_counter()
+            try:
+                run_once(i)
+            except Exception as e:
+                errors.append(str(e))
+                return
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            list(executor.map(timed, range(options["iterations"])))
+        wall = time.perf_counter() - started
+
+    results.put({
+        "scenario": name,
+        "iterations": options["iterations"],
+        "concurrency": options["concurrency"],
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "throughput_per_s": round(len(latencies) / wall, 2) if wall else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    })
+
+
+def run_scenario(name: str, options: dict) -> dict:
+    """Run one scenario in a fresh process and return its measurements."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_in_process, args=(name, options, results))
+    process.start()
+    process.join()
+    if results.empty():
+        return {"scenario": name, "errors": options["iterations"], "first_error": f"process exited with {process.exitcode}"}
+    return results.get()
+
+
+def print_table(rows: List[dict]) -> None:
+    columns = ("scenario", "iterations", "concurrency", "errors", "p50_ms", "p95_ms", "p99_ms", "throughput_per_s", "peak_rss_mb")
+    widths = [max(len(col), *(len(str(row.get(col, ""))) for row in rows)) for col in columns]
+    print("  ".join(col.ljust(width) for col, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row.get(col, "")).ljust(width) for col, width in zip(columns, widths)))
+    for row in rows:
+        if row.get("first_error"):
+            print(f"\n⚠️  {row['scenario']}: {row['errors']} failed, first error: {row['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks with fake Tavily and Gemini")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--iterations", type=int, default=20, help="Measured runs per scenario (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Runs in flight at once (default: 4)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs before timing (default: 1)")
+    parser.add_argument("--tavily-latency", type=float, default=0.2, help="Seconds per fake Tavily search (default: 0.2)")
+    parser.add_argument("--gemini-latency", type=float, default=0.5, help="Seconds per fake Gemini call (default: 0.5)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Uniform ± latency jitter as a fraction (default: 0.2)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for jitter")
+    parser.add_argument("--keep-pacing", action="store_true", help="Keep the 0.5s UI pause after SSE progress events")
+    parser.add_argument("--json", metavar="FILE", help="Also write results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show backend logs")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="stratify-bench-")
+    env = {
+        "TAVILY_API_KEY": "offline",
+        "GOOGLE_API_KEY": "offline",
+        # Every run must reach the fakes, not a cache
+        "SEARCH_CACHE_ENABLED": "false",
+        "REPORT_CACHE_ENABLED": "false",
+        "PDF_CACHE_ENABLED": "false",
+        "CHECKPOINT_DB_PATH": os.path.join(workdir, "checkpoints.sqlite3"),
+    }
+    if not args.keep_pacing:
+        env["PROGRESS_EVENT_DELAY"] = "0"
+
+    options = {
+        "env": env,
+        "iterations": args.iterations,
+        "concurrency": max(1, args.concurrency),
+        "warmup": args.warmup,
+        "tavily_latency": args.tavily_latency,
+        "gemini_latency": args.gemini_latency,
+        "jitter": args.jitter,
+        "seed": args.seed,
+        "verbose": args.verbose
+    }
+
+    rows = []
+    for name in args.scenario or SCENARIOS:
+        print(f"⏱️  Running {name}...", flush=True)
+        rows.append(run_scenario(name, options))
+
+    print()
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"options": {k: v for k, v in options.items() if k != "env"}, "results": rows}, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+    sys.exit(1 if any(row.get("errors") for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
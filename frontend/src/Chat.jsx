@@ -111,13 +111,17 @@ function Chat() {
 
       const reader = response.body.getReader();
       const decoder = new TextDecoder();
+      let streamedReport = '';
+      let buffer = '';
 
       while (true) {
         const { done, value } = await reader.read();
         if (done) break;
 
-        const chunk = decoder.decode(value);
-        const lines = chunk.split('\n');
+        // Keep any partial SSE line until the rest of it arrives
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
 
         for (const line of lines) {
           if (line.startsWith('data: ')) {
@@ -136,6 +140,20 @@ function Chat() {
                 }
                 return updated;
               });
+            } else if (data.type === 'report_delta') {
+              // Show the account plan as the writer produces it
+              streamedReport += data.delta;
+              setMessages((prev) => {
+                const updated = [...prev];
+                const progressIndex = updated.findIndex(m => m.isProgress);
+                if (progressIndex !== -1) {
+                  updated[progressIndex] = {
+                    ...updated[progressIndex],
+                    content: streamedReport,
+                  };
+                }
+                return updated;
+              });
             } else if (data.type === 'conflict') {
               // Remove progress message
               setMessages((prev) => prev.filter(m => !m.isProgress));
@@ -0,0 +1,204 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List
+
+from src.graph import get_research_graph, new_thread_config, release_research_thread
+from src.report_cache import get_report_cache, is_cacheable_report
+from src.research_diff import incremental_state
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Companies researched at the same time in a batch
+BATCH_MAX_PARALLEL = int(os.getenv("BATCH_MAX_PARALLEL", "4"))
+
+# Largest batch accepted in one request
+BATCH_MAX_COMPANIES = int(os.getenv("BATCH_MAX_COMPANIES", "500"))
+
+
+# ============================================================================
+# INPUT PARSING
+# ============================================================================
+
+def parse_companies(text: str, fmt: str = "auto") -> List[str]:
+    """
+    Parse a list of company names from CSV or JSON text.
+
+    CSV input uses a "company_name" or "company" column when a header is
+    present, otherwise the first column. JSON input is a list of names or of
+    objects with a "company_name" key.
+
+    Args:
+        text: File contents
+        fmt: "csv", "json" or "auto" (JSON if the text starts with '[')
+
+    Returns:
+        De-duplicated company names in input order
+    """
+    if fmt == "auto":
+        fmt = "json" if text.lstrip().startswith("[") else "csv"
+
+    names = []
+    if fmt == "json":
+        for item in json.loads(text):
+            if isinstance(item, dict):
+                item = item.get("company_name") or item.get("company", "")
+            names.append(str(item))
+    else:
+        rows = [row for row in csv.reader(text.splitlines()) if row]
+        if rows:
+            header = [cell.strip().lower() for cell in rows[0]]
+            column = 0
+            for key in ("company_name", "company"):
+                if key in header:
+                    column = header.index(key)
+                    rows = rows[1:]
+                    break
+            names = [row[column] for row in rows if len(row) > column]
+
+    seen = set()
+    companies = []
+    for name in names:
+        name = name.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            companies.append(name)
+    return companies
+
+
+def load_companies(path: str) -> List[str]:
+    """Read a CSV or JSON company list from disk."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    fmt = "json" if path.lower().endswith(".json") else "auto"
+    return parse_companies(text, fmt)
+
+
+# ============================================================================
+# BATCH EXECUTION
+# ============================================================================
+
+def research_one(company_name: str, on_conflict: str = "proceed", incremental: bool = False) -> dict:
+    """
+    Run the full research graph for one company without human interaction.
+
+    Args:
+        company_name: Company to research
+        on_conflict: "proceed" to write the report anyway, "skip" to stop at conflicts
+        incremental: Refresh the account plan stored in the report cache,
+            rewriting only what changed, and store the result back
+
+    Returns:
+        Result dict with status, report, conflict question, timing and, for
+        incremental runs, refresh (how the stored plan was refreshed)
+    """
+    started = time.time()
+    graph = get_research_graph()
+    config = new_thread_config(f"batch_{company_name}")
+    result = {"company_name": company_name, "report": "", "conflict_question": "", "error": ""}
+
+    initial_state = {
+        "messages": [],
+        "company_name": company_name,
+        "research_data": [],
+        "conflicting_info": False,
+        "clarification_question": "",
+        "conflicting_data": "",
+        "final_report": "",
+        "human_resolution": ""
+    }
+    if incremental:
+        initial_state.update(incremental_state(company_name))
+
+    try:
+        state = graph.invoke(initial_state, config)
+
+        if state.get("conflicting_info"):
+            result["conflict_question"] = state.get("clarification_question", "")
+            if on_conflict == "proceed":
+                graph.update_state(config, {"conflicting_info": False, "human_resolution": "proceed"}, as_node="human_review")
+                state = graph.invoke(None, config)
+            else:
+                result["status"] = "conflict"
+                return result
+
+        result["report"] = state.get("final_report", "")
+        result["status"] = "completed" if result["report"] else "failed"
+        if not result["report"]:
+            result["error"] = "No report generated"
+
+        if incremental:
+            result["refresh"] = state.get("refresh") or {"mode": "full", "sections": []}
+            # The next refresh diffs against this run
+            cache = get_report_cache()
+            research_data = state.get("research_data", [])
+            if cache is not None and is_cacheable_report(result["report"], research_data):
+                try:
+                    cache.put(company_name, result["report"], research_data)
+                except Exception as e:
+                    print(f"Report cache write failed: {e}")
+
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+
+    finally:
+        release_research_thread(config)
+        result["elapsed_seconds"] = round(time.time() - started, 2)
+
+    return result
+
+
+def run_batch(companies: List[str], max_parallel: int = BATCH_MAX_PARALLEL,
+              on_conflict: str = "proceed", incremental: bool = False) -> Iterator[dict]:
+    """
+    Research many companies with bounded parallelism.
+
+    Tavily and Gemini calls from all workers share the process-wide rate
+    limiters configured in graph.py. With incremental, each stored account
+    plan is refreshed rather than rewritten (see research_one), which makes
+    scheduled re-runs of an account list cheap. Closing the generator early
+    cancels the companies that have not started yet.
+
+    Yields:
+        One {"type": "batch_result", ...} event per company as it finishes,
+        then a single {"type": "batch_summary", ...} event
+    """
+    started = time.time()
+    results = []
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_parallel))
+    try:
+        futures = [executor.submit(research_one, name, on_conflict, incremental) for name in companies]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            yield {"type": "batch_result", **result}
+    finally:
+        # A consumer that stops early (client disconnect) must not wait for, or pay
+        # for, the companies not yet started
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    timings = sorted(r["elapsed_seconds"] for r in results)
+    refresh_modes = {}
+    for r in results:
+        if r.get("refresh"):
+            refresh_modes[r["refresh"]["mode"]] = refresh_modes.get(r["refresh"]["mode"], 0) + 1
+
+    yield {
+        "type": "batch_summary",
+        "total": len(results),
+        "completed": sum(1 for r in results if r["status"] == "completed"),
+        "conflicts": sum(1 for r in results if r["conflict_question"]),
+        "failed": [{"company_name": r["company_name"], "error": r["error"]} for r in results if r["status"] == "failed"],
+        "skipped": [r["company_name"] for r in results if r["status"] == "conflict"],
+        "wall_seconds": round(time.time() - started, 2),
+        "mean_seconds": round(sum(timings) / len(timings), 2) if timings else 0.0,
+        "max_seconds": timings[-1] if timings else 0.0,
+        "refresh_modes": refresh_modes
+    }
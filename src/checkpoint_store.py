@@ -0,0 +1,158 @@
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# "sqlite" for the durable file-backed store, "memory" for a per-process MemorySaver
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite").lower()
+
+# Location of the SQLite database holding graph checkpoints
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", os.path.join(".cache", "checkpoints.sqlite3"))
+
+# Seconds of inactivity after which a thread is considered abandoned (default: 24 hours)
+CHECKPOINT_THREAD_TTL = int(os.getenv("CHECKPOINT_THREAD_TTL", str(24 * 60 * 60)))
+
+# Minimum seconds between two garbage collection sweeps
+CHECKPOINT_GC_INTERVAL = int(os.getenv("CHECKPOINT_GC_INTERVAL", "600"))
+
+
+# ============================================================================
+# DURABLE CHECKPOINTER
+# ============================================================================
+
+class DurableSqliteSaver(SqliteSaver):
+    """
+    File-backed checkpoint saver shared by every worker process.
+
+    Extends SqliteSaver with:
+        - WAL journaling and a busy timeout so several processes can read and
+          write the same database file concurrently
+        - a thread_activity table, indexed by thread_id and last update time,
+          used to find and delete abandoned threads after a TTL
+        - async methods that run the sync implementation in a worker thread,
+          so the same saver serves graph.stream and graph.astream
+    """
+
+    def __init__(self, conn: sqlite3.Connection, thread_ttl: int = CHECKPOINT_THREAD_TTL,
+                 gc_interval: int = CHECKPOINT_GC_INTERVAL):
+        super().__init__(conn)
+        self.thread_ttl = thread_ttl
+        self.gc_interval = gc_interval
+        self._last_gc = 0.0
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+
+        super().setup()
+        self.conn.executescript(
+            """
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS thread_activity (
+                thread_id TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_thread_activity_updated_at
+                ON thread_activity (updated_at);
+            """
+        )
+
+    def _touch(self, thread_id: str) -> None:
+        now = time.time()
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT INTO thread_activity (thread_id, created_at, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (str(thread_id), now, now)
+            )
+
+        if now - self._last_gc > self.gc_interval:
+            self._last_gc = now
+            self.collect_abandoned_threads()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        self._touch(config["configurable"]["thread_id"])
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        super().put_writes(config, writes, task_id, task_path)
+        self._touch(config["configurable"]["thread_id"])
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+
+    def collect_abandoned_threads(self, ttl: Optional[int] = None) -> int:
+        """
+        Delete every thread whose last checkpoint is older than the TTL.
+
+        Args:
+            ttl: Inactivity threshold in seconds (defaults to the saver's thread_ttl)
+
+        Returns:
+            Number of threads deleted
+        """
+        cutoff = time.time() - (self.thread_ttl if ttl is None else ttl)
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT thread_id FROM thread_activity WHERE updated_at < ?", (cutoff,))
+            expired = [row[0] for row in cur.fetchall()]
+
+        for thread_id in expired:
+            self.delete_thread(thread_id)
+
+        if expired:
+            print(f"🧹 Checkpoint GC: removed {len(expired)} abandoned threads")
+        return len(expired)
+
+    # Async variants delegate to the sync implementation in a worker thread
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = ""):
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def create_checkpointer():
+    """
+    Create the checkpointer used by the shared research graph.
+
+    Returns:
+        DurableSqliteSaver by default, or a MemorySaver when CHECKPOINT_BACKEND=memory
+    """
+    if CHECKPOINT_BACKEND == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+        return MemorySaver()
+
+    directory = os.path.dirname(CHECKPOINT_DB_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(CHECKPOINT_DB_PATH, check_same_thread=False, timeout=30)
+    saver = DurableSqliteSaver(conn)
+    saver.setup()
+    return saver
@@ -0,0 +1,183 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+
+# ============================================================================
+# KNOWN COMPANIES
+# ============================================================================
+
+# Lower-case aliases → canonical company name
+KNOWN_COMPANY_ALIASES = {
+    "accenture": "Accenture",
+    "alphabet": "Alphabet",
+    "amazon": "Amazon",
+    "amzn": "Amazon",
+    "apple": "Apple",
+    "aapl": "Apple",
+    "astrazeneca": "AstraZeneca",
+    "astra zeneca": "AstraZeneca",
+    "deloitte": "Deloitte",
+    "facebook": "Meta",
+    "google": "Google",
+    "ibm": "IBM",
+    "infosys": "Infosys",
+    "intel": "Intel",
+    "meta": "Meta",
+    "meta platforms": "Meta",
+    "microsoft": "Microsoft",
+    "msft": "Microsoft",
+    "netflix": "Netflix",
+    "nvidia": "NVIDIA",
+    "openai": "OpenAI",
+    "oracle": "Oracle",
+    "salesforce": "Salesforce",
+    "samsung": "Samsung",
+    "sap": "SAP",
+    "tcs": "Tata Consultancy Services",
+    "tata consultancy services": "Tata Consultancy Services",
+    "tesla": "Tesla",
+    "tsla": "Tesla",
+    "walmart": "Walmart",
+}
+
+# Legal forms dropped from the end of names ("Apple Inc" → "Apple"); generic words
+# such as "Group" or "Company" are part of names like "Co-operative Group"
+_LEGAL_SUFFIX = re.compile(
+    r"[\s,]+(?:inc|incorporated|corp|corporation|ltd|limited|llc|plc|gmbh|ag|s\.?a|n\.?v|b\.?v|pty)\.?$",
+    re.IGNORECASE
+)
+
+# Separators of several companies ("stripe vs adyen", "Acme, Globex"); left to the LLM tier
+_SEPARATORS = re.compile(r"[,/;]|\b(?:vs|versus|and)\b", re.IGNORECASE)
+
+# Short requests wrapped around a name, e.g. "Research Microsoft", "Can you analyze Tesla for me?"
+_REQUEST_PATTERN = re.compile(
+    r"^(?:hi|hey|hello)?[\s,]*(?:please\s+)?(?:can|could|would)?\s*(?:you\s+)?(?:please\s+)?"
+    r"(?:research|analy[sz]e|look\s+up|look\s+into|investigate|profile|tell\s+me\s+about|"
+    r"give\s+me\s+(?:an?\s+)?(?:account\s+plan|report|overview)\s+(?:for|on)|"
+    r"i\s+want\s+to\s+research(?:\s+about)?|account\s+plan\s+for)\s+"
+    r"(?:about\s+)?(?:the\s+)?(?:a\s+)?(?:company\s+(?:called|named)\s+)?"
+    r"(?P<name>.+?)(?:\s+for\s+me)?(?:\s+please)?[\s\?\.!]*$",
+    re.IGNORECASE
+)
+
+# Words that mean the input is a sentence rather than a bare name
+_SENTENCE_WORDS = {
+    "research", "analyze", "analyse", "tell", "about", "want", "can", "could", "would",
+    "please", "me", "my", "i", "you", "what", "who", "how", "why", "is", "are", "the", "company",
+    "called", "named", "help", "find", "report", "plan", "give", "info", "information",
+    "hi", "hey", "hello", "thanks", "thank",
+}
+
+# Longest input (in words) treated as a bare company name
+_MAX_NAME_WORDS = 5
+
+
+# ============================================================================
+# TIERED EXTRACTOR
+# ============================================================================
+
+def canonicalize(name: str) -> str:
+    """
+    Clean up a company name and map known aliases to their canonical form.
+
+    Args:
+        name: Raw company name
+
+    Returns:
+        Canonical company name
+    """
+    name = " ".join(name.strip().strip("\"'“”").split())
+    name = _LEGAL_SUFFIX.sub("", name).strip(" ,.")
+
+    alias = KNOWN_COMPANY_ALIASES.get(name.lower())
+    if alias:
+        return alias
+
+    # All-lowercase input gets title case; deliberate casing (AstraZeneca) is kept
+    if name.islower():
+        name = name.title()
+    return name
+
+
+def _looks_like_name(text: str) -> bool:
+    words = re.findall(r"[\w&'.-]+", text.lower())
+    if not words or len(words) > _MAX_NAME_WORDS:
+        return False
+    # "Acme, Inc." is still one company
+    if any(ch in text for ch in "?!") or _SEPARATORS.search(_LEGAL_SUFFIX.sub("", text)):
+        return False
+    return not any(word in _SENTENCE_WORDS for word in words)
+
+
+class CompanyNameExtractor:
+    """
+    Resolve user input to a company name using the cheapest tier that works.
+
+    Tiers, in order:
+        cache     - previously resolved input (LRU)
+        alias     - input is a known company or ticker
+        heuristic - input is already a short bare name
+        regex     - a short request wrapped around a name ("Research Microsoft")
+        llm       - anything else is sent to the fallback (Gemini)
+    """
+
+    def __init__(self, llm_fallback: Callable[[str], str], max_cache_size: int = 1024):
+        self.llm_fallback = llm_fallback
+        self.max_cache_size = max_cache_size
+        self.tier_counts = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            name = self._cache.get(key)
+            if name is not None:
+                self._cache.move_to_end(key)
+            return name
+
+    def _cache_put(self, key: str, name: str) -> None:
+        with self._lock:
+            self._cache[key] = name
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cache_size:
+                self._cache.popitem(last=False)
+
+    def _count(self, tier: str) -> None:
+        with self._lock:
+            self.tier_counts[tier] = self.tier_counts.get(tier, 0) + 1
+
+    def extract(self, user_input: str) -> Tuple[str, str]:
+        """
+        Extract the company name from user input.
+
+        Args:
+            user_input: Raw text typed by the user
+
+        Returns:
+            (company_name, tier) where tier names the stage that resolved it
+        """
+        text = " ".join(user_input.split())
+        key = text.lower()
+
+        name = self._cache_get(key)
+        if name is not None:
+            tier = "cache"
+        elif key.rstrip(" .?!") in KNOWN_COMPANY_ALIASES:
+            name, tier = KNOWN_COMPANY_ALIASES[key.rstrip(" .?!")], "alias"
+        elif _looks_like_name(text):
+            name, tier = canonicalize(text), "heuristic"
+        else:
+            match = _REQUEST_PATTERN.match(text)
+            candidate = match.group("name") if match else ""
+            if candidate and _looks_like_name(candidate):
+                name, tier = canonicalize(candidate), "regex"
+            else:
+                name, tier = canonicalize(self.llm_fallback(text)), "llm"
+
+        if tier != "cache":
+            self._cache_put(key, name)
+        self._count(tier)
+        return name, tier
@@ -0,0 +1,159 @@
+import os
+import re
+from typing import List, Optional, Tuple
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Largest share of a prompt one finding may take before it is cut to key sentences
+FINDING_MAX_TOKENS = int(os.getenv("FINDING_MAX_TOKENS", "400"))
+
+# Smallest leftover budget worth filling with a trimmed finding
+_MIN_TRIMMED_TOKENS = 60
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_TERM_PATTERN = re.compile(r"[a-z0-9]{4,}")
+
+
+# ============================================================================
+# TOKEN ESTIMATES
+# ============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Gemini prompts (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+# ============================================================================
+# CONTEXT PACKING
+# ============================================================================
+
+def key_sentences(content: str, max_tokens: int, terms: Optional[set] = None) -> str:
+    """
+    Shorten text to its most informative sentences within a token budget.
+
+    Sentences with figures, query terms, or at the start of the text rank
+    highest; the chosen ones are returned in their original order.
+
+    Args:
+        content: Finding content
+        max_tokens: Budget for the returned text
+        terms: Lower-case words from the search query
+
+    Returns:
+        Content unchanged if it fits, otherwise the selected sentences
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return content
+
+    terms = terms or set()
+    sentences = [s for s in _SENTENCE_SPLIT.split(content) if s.strip()]
+
+    def rank(pair):
+        idx, sentence = pair
+        lowered = sentence.lower()
+        score = 2 if any(ch.isdigit() for ch in sentence) else 0
+        score += sum(1 for term in terms if term in lowered)
+        score += 1 if idx == 0 else 0
+        return (-score, idx)
+
+    chosen = []
+    used = 0
+    for idx, sentence in sorted(enumerate(sentences), key=rank):
+        # Leave room for the " … " marking skipped text
+        tokens = estimate_tokens(sentence + " … ")
+        if used + tokens > max_tokens:
+            continue
+        chosen.append(idx)
+        used += tokens
+
+    if not chosen:
+        return content[:max_tokens * 4 - 2].rsplit(" ", 1)[0] + " …"
+
+    chosen.sort()
+    text = sentences[chosen[0]]
+    for previous, idx in zip(chosen, chosen[1:]):
+        text += (" " if idx == previous + 1 else " … ") + sentences[idx]
+    return text
+
+
+def rank_findings(findings: List[dict]) -> List[int]:
+    """
+    Order findings for packing: human notes first, then round-robin across
+    search queries by descending Tavily score, so every query is represented
+    before any query gets a second slot.
+
+    Returns:
+        Indices into findings in packing order
+    """
+    pinned = [idx for idx, item in enumerate(findings) if item.get("url") == "human-input"]
+
+    by_query = {}
+    for idx, item in enumerate(findings):
+        if idx not in pinned:
+            by_query.setdefault(item.get("query", ""), []).append(idx)
+
+    def score(idx):
+        # Findings that several queries surfaced (see dedup "merged") rank higher
+        item = findings[idx]
+        queries = {item.get("query", "")} | {m.get("query", "") for m in item.get("merged", [])}
+        return (item.get("score", 0.0) or 0.0) + 0.1 * (len(queries) - 1)
+
+    for indices in by_query.values():
+        indices.sort(key=score, reverse=True)
+
+    order = list(pinned)
+    for rank in range(max((len(v) for v in by_query.values()), default=0)):
+        round_ = [indices[rank] for indices in by_query.values() if rank < len(indices)]
+        order.extend(sorted(round_, key=score, reverse=True))
+    return order
+
+
+def pack_findings(findings: List[dict], token_budget: Optional[int] = None,
+                  max_item_tokens: int = FINDING_MAX_TOKENS, url_label: str = "URL") -> Tuple[List[str], dict]:
+    """
+    Format findings for a prompt, best first, within a token budget.
+
+    Long findings are cut to their key sentences; findings that no longer fit
+    are left out. Human clarification notes are always kept whole.
+
+    Args:
+        findings: research_data entries
+        token_budget: Total tokens for all entries, or None for no limit
+        max_item_tokens: Per-finding cap before key-sentence trimming
+        url_label: Label for the source line ("URL" or "Source")
+
+    Returns:
+        (formatted entries, stats dict with tokens, packed, total and trimmed)
+    """
+    entries = []
+    used = 0
+    trimmed = 0
+
+    for idx in rank_findings(findings):
+        item = findings[idx]
+        content = item.get("content", "")
+        pinned = item.get("url") == "human-input"
+        terms = set(_TERM_PATTERN.findall(item.get("query", "").lower()))
+
+        header = f"Finding {len(entries) + 1}:\nTitle: {item.get('title', '')}\nContent: "
+        footer = f"\n{url_label}: {item.get('url', '')}"
+        overhead = estimate_tokens(header + footer)
+
+        limit = max_item_tokens
+        if token_budget is not None and not pinned:
+            limit = min(limit, token_budget - used - overhead)
+            if limit < _MIN_TRIMMED_TOKENS:
+                continue
+
+        if not pinned and estimate_tokens(content) > limit:
+            content = key_sentences(content, limit, terms)
+            trimmed += 1
+
+        entry = header + content + footer
+        entries.append(entry)
+        used += estimate_tokens(entry)
+
+    return entries, {"tokens": used, "packed": len(entries), "total": len(findings), "trimmed": trimmed}
@@ -0,0 +1,198 @@
+import hashlib
+import os
+import random
+import re
+from typing import List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Jaccard similarity of word shingles above which two findings are the same article
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.7"))
+
+# Words per shingle
+_SHINGLE_SIZE = 3
+
+# MinHash signature length, split into LSH bands of _ROWS_PER_BAND rows
+_NUM_BINS = 32
+_ROWS_PER_BAND = 4
+
+# Fixed salt; with the stable shingle hash below, signatures are comparable across processes
+_SALT = random.Random(1729).getrandbits(61)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Query parameters that never change the page content
+_TRACKING_PARAMS = re.compile(r"^(?:utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid|ocid|smid|guccounter)$", re.IGNORECASE)
+
+
+# ============================================================================
+# URL CANONICALIZATION
+# ============================================================================
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different links to one page compare equal.
+
+    Lower-cases the host, drops "www."/"m."/"amp." prefixes, fragments,
+    tracking parameters, AMP suffixes and trailing slashes.
+
+    Args:
+        url: Raw URL from Tavily
+
+    Returns:
+        Canonical form of the URL
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip().lower()
+
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m.", "amp."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    path = re.sub(r"/(?:amp|index\.html?)/?$", "", parts.path) or "/"
+    path = path.rstrip("/") or "/"
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(key)
+    ))
+
+    return urlunsplit(("https", host, path, query, ""))
+
+
+# ============================================================================
+# MINHASH SIMILARITY
+# ============================================================================
+
+def _stable_hash(text: str) -> int:
+    # Built-in hash() of a str is randomized per process (PYTHONHASHSEED)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(text: str) -> frozenset:
+    """Hashed word shingles of a text (single words for very short texts)."""
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < _SHINGLE_SIZE:
+        return frozenset(map(_stable_hash, words))
+    windows = zip(*(words[i:] for i in range(_SHINGLE_SIZE)))
+    return frozenset(map(_stable_hash, map(" ".join, windows)))
+
+
+def minhash(shingle_set: frozenset) -> Tuple[int, ...]:
+    """
+    One-permutation MinHash signature of a shingle set.
+
+    Each hash is routed to one of _NUM_BINS bins and every bin keeps its
+    minimum, so a signature costs a single pass over the shingles. Empty bins
+    are -1 and never match in LSH.
+    """
+    signature = [-1] * _NUM_BINS
+    for h in shingle_set:
+        h = (h ^ _SALT) & 0xFFFFFFFFFFFFFFF
+        slot, value = h % _NUM_BINS, h // _NUM_BINS
+        if signature[slot] < 0 or value < signature[slot]:
+            signature[slot] = value
+    return tuple(signature)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# ============================================================================
+# DEDUPLICATION
+# ============================================================================
+
+def deduplicate_findings(findings: List[dict], threshold: float = DEDUP_SIMILARITY) -> Tuple[List[dict], int]:
+    """
+    Collapse findings that are the same page or near-identical copies.
+
+    Findings are grouped when their canonical URLs match, or when MinHash LSH
+    proposes them as candidates and their exact shingle Jaccard similarity is
+    at least `threshold`. Each group keeps its highest-score finding, in its
+    original position, with a "merged" list recording the url, query and
+    score of every copy folded into it.
+
+    Args:
+        findings: research_data entries with title, url, content, score, query
+        threshold: Minimum content similarity for near-duplicates
+
+    Returns:
+        (deduplicated findings, number of findings removed)
+    """
+    count = len(findings)
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[root_j] = root_i
+
+    # Same page under different URLs; findings without a real URL are only compared by content
+    by_url = {}
+    for idx, item in enumerate(findings):
+        url = item.get("url", "")
+        if not url.strip() or url == "human-input":
+            continue
+        key = canonical_url(url)
+        if key in by_url:
+            union(by_url[key], idx)
+        else:
+            by_url[key] = idx
+
+    # Syndicated or lightly edited copies: LSH buckets propose candidates,
+    # exact Jaccard confirms them
+    shingle_sets = [shingles(f"{item.get('title', '')} {item.get('content', '')}") for item in findings]
+    buckets = {}
+    for idx, shingle_set in enumerate(shingle_sets):
+        if not shingle_set:
+            continue
+        signature = minhash(shingle_set)
+        for band in range(0, _NUM_BINS, _ROWS_PER_BAND):
+            rows = signature[band:band + _ROWS_PER_BAND]
+            if -1 not in rows:
+                buckets.setdefault((band, rows), []).append(idx)
+
+    checked = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                if (i, j) in checked or find(i) == find(j):
+                    continue
+                checked.add((i, j))
+                if jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                    union(i, j)
+
+    groups = {}
+    for idx in range(count):
+        groups.setdefault(find(idx), []).append(idx)
+
+    kept = []
+    for members in groups.values():
+        best = max(members, key=lambda i: (findings[i].get("score", 0.0) or 0.0, -i))
+        item = dict(findings[best])
+        item["merged"] = [
+            {"url": findings[i].get("url", ""), "query": findings[i].get("query", ""), "score": findings[i].get("score", 0.0)}
+            for i in members if i != best
+        ]
+        kept.append((best, item))
+
+    kept.sort(key=lambda pair: pair[0])
+    return [item for _, item in kept], count - len(kept)
@@ -1,10 +1,20 @@
+import argparse
+import json
 import os
+import re
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
-from graph import create_research_graph, AgentState
 
-# Load environment variables
+# Add the parent directory to the Python path to import from src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Load environment variables before src.* reads its settings at import time
 load_dotenv()
 
+from src.graph import get_research_graph, new_thread_config, AgentState
+from src.batch import BATCH_MAX_PARALLEL, load_companies, run_batch
+
 
 def test_research(company_name: str):
     """
@@ -27,11 +37,12 @@ def test_research(company_name: str):
         "final_report": ""
     }
     
-    # Create and run graph
-    graph = create_research_graph()
+    # Run the shared graph on a fresh thread
+    graph = get_research_graph()
+    config = new_thread_config("cli")
     
     print("🔄 Executing research workflow...\n")
-    result = graph.invoke(initial_state)
+    result = graph.invoke(initial_state, config)
     
     # Display results
     print("\n" + "=" * 60)
@@ -71,7 +82,73 @@ def test_research(company_name: str):
     print("\n" + "=" * 60)
 
 
+def run_batch_research(path: str, output_dir: str, max_parallel: int, on_conflict: str,
+                       incremental: bool = False):
+    """
+    Research every company listed in a CSV or JSON file.
+    
+    Each report is written to <output_dir>/<company>.md as soon as it finishes;
+    the run summary is written to <output_dir>/summary.json.
+    
+    Args:
+        path: CSV or JSON file with company names
+        output_dir: Directory for reports and the summary
+        max_parallel: Companies researched at the same time
+        on_conflict: "proceed" or "skip" when the reviewer finds a conflict
+        incremental: Refresh the stored account plans, rewriting only what changed
+    """
+    companies = load_companies(path)
+    if not companies:
+        print(f"❌ No company names found in {path}. Exiting.")
+        exit(1)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"📋 Batch: {len(companies)} companies, parallelism {max_parallel}\n")
+    
+    for event in run_batch(companies, max_parallel=max_parallel, on_conflict=on_conflict, incremental=incremental):
+        if event["type"] == "batch_result":
+            name = event["company_name"]
+            if event["report"]:
+                filename = re.sub(r"[^A-Za-z0-9._-]+", "_", name) + ".md"
+                with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
+                    f.write(event["report"])
+            
+            icon = {"completed": "✅", "conflict": "⚠️ ", "failed": "❌"}[event["status"]]
+            detail = event["error"] or event["conflict_question"]
+            if event.get("refresh") and not detail:
+                sections = ", ".join(event["refresh"]["sections"]) if event["refresh"]["mode"] == "sections" else ""
+                detail = f"refresh: {event['refresh']['mode']} {sections}".rstrip()
+            print(f"{icon} {name} ({event['elapsed_seconds']}s) {detail}".rstrip())
+        else:
+            with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+                json.dump(event, f, indent=2)
+            
+            print("\n" + "=" * 60)
+            print("📊 BATCH SUMMARY")
+            print("=" * 60)
+            print(f"Completed: {event['completed']}/{event['total']}  "
+                  f"Conflicts: {event['conflicts']}  Failed: {len(event['failed'])}")
+            print(f"Wall time: {event['wall_seconds']}s  Mean per company: {event['mean_seconds']}s")
+            if event["refresh_modes"]:
+                print("Refresh: " + "  ".join(f"{mode}: {count}" for mode, count in sorted(event["refresh_modes"].items())))
+            print(f"Reports written to: {output_dir}")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="StratifyAI - Autonomous Company Research Agent")
+    parser.add_argument("--batch", metavar="FILE", help="CSV or JSON file of companies to research in batch")
+    parser.add_argument("--output-dir", default="reports", help="Directory for batch reports (default: reports)")
+    parser.add_argument("--parallel", type=int, default=BATCH_MAX_PARALLEL, help="Companies researched at once in batch mode")
+    parser.add_argument("--on-conflict", choices=["proceed", "skip"], default="proceed",
+                        help="Write the report anyway or skip the company when a conflict is found")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Refresh stored account plans in batch mode, rewriting only sections whose research changed")
+    args = parser.parse_args()
+    
+    if args.batch:
+        run_batch_research(args.batch, args.output_dir, args.parallel, args.on_conflict, args.incremental)
+        exit(0)
+    
     # Interactive company input
     print("=" * 60)
     print("🚀 StratifyAI - Autonomous Company Research Agent")
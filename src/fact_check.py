@@ -0,0 +1,315 @@
+import os
+import re
+from typing import List, Optional, Tuple
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Relative difference between two sources' figures that counts as a conflict
+NUMERIC_CONFLICT_TOLERANCE = float(os.getenv("NUMERIC_CONFLICT_TOLERANCE", "0.15"))
+
+
+# ============================================================================
+# PATTERNS
+# ============================================================================
+
+_UNIT_MULTIPLIERS = {
+    "trillion": 1e12, "tn": 1e12, "t": 1e12,
+    "billion": 1e9, "bn": 1e9, "b": 1e9,
+    "million": 1e6, "mn": 1e6, "mm": 1e6, "m": 1e6,
+    "thousand": 1e3, "k": 1e3,
+}
+
+_CURRENCIES = {
+    "$": "USD", "us$": "USD", "usd": "USD", "dollars": "USD",
+    "€": "EUR", "eur": "EUR", "euros": "EUR",
+    "£": "GBP", "gbp": "GBP", "pounds": "GBP",
+    "₹": "INR", "inr": "INR", "rupees": "INR",
+}
+
+_NUMBER = r"(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+_UNIT = r"(?:\s*(?P<unit>trillion|billion|million|thousand|tn|bn|mn|mm|[tbmk])\b)?"
+
+# "$10B", "US$ 10.5 billion", "EUR 3bn", "10,000 million dollars"
+_MONEY_PATTERN = re.compile(
+    r"(?P<prefix>US\$|\$|€|£|₹|\b(?:USD|EUR|GBP|INR)\s?)\s?" + _NUMBER + _UNIT +
+    r"|" + _NUMBER.replace("number", "number2") +
+    r"(?:\s*(?P<unit2>trillion|billion|million|thousand|tn|bn|mn))?\s+(?P<suffix>dollars|USD|euros|EUR|pounds|GBP|rupees|INR)\b",
+    re.IGNORECASE
+)
+
+# "15%", "15 percent"
+_PERCENT_PATTERN = re.compile(r"(?P<number>\d+(?:\.\d+)?)\s?(?:%|percent\b|per cent\b)", re.IGNORECASE)
+
+# "221,000 employees", "about 1.5 million staff"
+_HEADCOUNT_PATTERN = re.compile(
+    _NUMBER + r"(?:\s*(?P<unit>million|thousand|k)\b)?\+?\s+(?:full-time\s+|global\s+)?(?:employees|staff|workers|people)\b",
+    re.IGNORECASE
+)
+
+# "founded in 1975", "established 1911"
+_FOUNDED_PATTERN = re.compile(r"\b(?:founded|established|incorporated)\s+(?:in\s+)?(?P<year>(?:18|19|20)\d{2})\b", re.IGNORECASE)
+
+# Capitalised words that end a name in Title Case headlines ("CEO Satya Nadella Says AI...")
+_NAME_STOPWORDS = (
+    "Says", "Said", "Tells", "Told", "Announces", "Announced", "Unveils", "Reveals", "Explains", "Warns",
+    "Admits", "Confirms", "Predicts", "Expects", "Believes", "Thinks", "Wants", "Plans", "Talks", "Speaks",
+    "Discusses", "Calls", "Urges", "Sees", "Shares", "Joins", "Steps", "Takes", "Gets", "Makes", "Becomes",
+    "Launches", "Leads", "Is", "Was", "Will", "Has", "Had", "And", "On", "In", "Of", "For", "At", "To",
+    "With", "About", "After", "Over", "The",
+)
+_NAME_WORD = r"(?!(?:" + "|".join(_NAME_STOPWORDS) + r")\b)[A-Z][a-z'’-]+"
+_PERSON = r"(?P<name>" + _NAME_WORD + r"(?:\s+[A-Z]\.)?(?:\s+" + _NAME_WORD + r"){1,2})"
+
+# "CEO Satya Nadella", "chief executive officer, Tim Cook" / "Tim Cook, the CEO"
+# (a possessive before "CEO" is the employer, as in "Acme Corporation's CEO")
+_CEO_PATTERNS = [
+    re.compile(r"\b(?:CEO|[Cc]hief [Ee]xecutive(?: [Oo]fficer)?)\s*(?:,|\bis\b|\bwas\b|:)?\s+" + _PERSON),
+    re.compile(_PERSON + r"(?<!['’]s),?\s+(?:[Ii]s\s+)?(?:[Tt]he\s+)?(?:company's\s+)?(?:current\s+)?(?:CEO|[Cc]hief [Ee]xecutive)\b"),
+]
+
+_FORMER = re.compile(r"\b(?:former|ex-|previous|then|late|founding)\s*$", re.IGNORECASE)
+
+_YEAR_PATTERN = re.compile(r"\b(?:FY\s?)?(?P<year>(?:19|20)\d{2})\b")
+_QUARTER_PATTERN = re.compile(r"\b(?:Q[1-4]|quarter(?:ly)?)\b", re.IGNORECASE)
+# Characters around a figure searched for the year it refers to
+_PERIOD_WINDOW = 60
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9$€£])|\n+")
+
+# Keywords that decide which metric a money or percent figure belongs to
+_MONEY_METRICS = {
+    "revenue": ("revenue", "sales", "turnover", "top line"),
+    "net_income": ("net income", "net profit", "profit", "earnings"),
+    "market_cap": ("market cap", "market capitalization", "market value", "valuation", "valued at"),
+}
+_PERCENT_METRICS = {
+    "revenue_growth": ("growth", "grew", "increase", "rose"),
+    "operating_margin": ("margin",),
+    "market_share": ("market share",),
+}
+
+METRIC_LABELS = {
+    "revenue": "Revenue",
+    "net_income": "Net income",
+    "market_cap": "Market capitalization",
+    "revenue_growth": "Growth rate",
+    "operating_margin": "Margin",
+    "market_share": "Market share",
+    "headcount": "Employees",
+    "founded": "Founding year",
+    "ceo": "CEO",
+}
+
+
+# ============================================================================
+# EXTRACTION
+# ============================================================================
+
+def _parse_number(number: str, unit: Optional[str]) -> float:
+    value = float(number.replace(",", ""))
+    if unit:
+        value *= _UNIT_MULTIPLIERS[unit.lower()]
+    return value
+
+
+def _nearest_keyword(sentence: str, position: int, metrics: dict) -> Optional[str]:
+    # Attribute a figure to the metric keyword closest to it in the sentence,
+    # preferring keywords that precede it ("revenue of $10B, profit of $1B")
+    lowered = sentence.lower()
+    best, best_distance = None, None
+    for metric, keywords in metrics.items():
+        for keyword in keywords:
+            for match in re.finditer(r"\b" + re.escape(keyword), lowered):
+                distance = match.start() - position
+                distance = -distance if distance < 0 else 2 * distance
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = metric, distance
+    return best
+
+
+def _period(sentence: str, position: int) -> Optional[str]:
+    # Figures for different years or for a quarter are not comparable with each other
+    founding_years = {m.start("year") for m in _FOUNDED_PATTERN.finditer(sentence)}
+    years = [
+        (abs(m.start() - position), m.group("year")) for m in _YEAR_PATTERN.finditer(sentence)
+        if abs(m.start() - position) <= _PERIOD_WINDOW and m.start("year") not in founding_years
+    ]
+    period = min(years)[1] if years else None
+    if _QUARTER_PATTERN.search(sentence):
+        period = f"{period or ''} quarter".strip()
+    return period
+
+
+def _fact(metric: str, value, text: str, url: str, period: Optional[str] = None, unit: str = "") -> dict:
+    return {"metric": metric, "value": value, "text": text.strip(), "url": url, "period": period, "unit": unit}
+
+
+def extract_facts(text: str, url: str) -> List[dict]:
+    """
+    Pull comparable facts out of one research finding.
+
+    Extracts money amounts (revenue, net income, market cap), percentages
+    (growth, margin, market share), headcount, founding year and CEO name,
+    each normalized to a base unit and tagged with its source URL and period.
+
+    Args:
+        text: Finding title and content
+        url: Source URL
+
+    Returns:
+        List of fact dicts with metric, value, text, url, period and unit
+    """
+    facts = []
+
+    for sentence in _SENTENCE_SPLIT.split(text):
+        if not sentence.strip():
+            continue
+
+        for match in _MONEY_PATTERN.finditer(sentence):
+            metric = _nearest_keyword(sentence, match.start(), _MONEY_METRICS)
+            if metric is None:
+                continue
+            if match.group("number"):
+                value = _parse_number(match.group("number"), match.group("unit"))
+                currency = _CURRENCIES[match.group("prefix").strip().lower()]
+            else:
+                value = _parse_number(match.group("number2"), match.group("unit2"))
+                currency = _CURRENCIES[match.group("suffix").lower()]
+            facts.append(_fact(metric, value, match.group(0), url, _period(sentence, match.start()), currency))
+
+        for match in _PERCENT_PATTERN.finditer(sentence):
+            metric = _nearest_keyword(sentence, match.start(), _PERCENT_METRICS)
+            if metric is None:
+                continue
+            # "Grew 40%" only counts as revenue growth when revenue is the subject
+            if metric == "revenue_growth" and _nearest_keyword(sentence, match.start(), _MONEY_METRICS) != "revenue":
+                continue
+            facts.append(_fact(metric, float(match.group("number")), match.group(0), url,
+                               _period(sentence, match.start()), "%"))
+
+        for match in _HEADCOUNT_PATTERN.finditer(sentence):
+            value = _parse_number(match.group("number"), match.group("unit"))
+            facts.append(_fact("headcount", value, match.group(0), url, _period(sentence, match.start())))
+
+        for match in _FOUNDED_PATTERN.finditer(sentence):
+            facts.append(_fact("founded", int(match.group("year")), match.group(0), url))
+
+        for pattern in _CEO_PATTERNS:
+            for match in pattern.finditer(sentence):
+                if _FORMER.search(sentence[:match.start()]):
+                    continue
+                name = re.sub(r"['’]s$", "", match.group("name"))
+                facts.append(_fact("ceo", name.split()[-1].lower(), name, url))
+
+    return facts
+
+
+# ============================================================================
+# CONFLICT DETECTION
+# ============================================================================
+
+def format_value(metric: str, value, unit: str = "") -> str:
+    """Render a normalized value for display ("$10.0B", "15.0%", "221,000")."""
+    if metric == "ceo":
+        return str(value).title()
+    if metric == "founded":
+        return str(value)
+    if unit == "%":
+        return f"{value:g}%"
+    if unit:
+        symbol = {"USD": "$", "EUR": "€", "GBP": "£", "INR": "₹"}.get(unit, unit + " ")
+        for suffix, size in (("T", 1e12), ("B", 1e9), ("M", 1e6)):
+            if value >= size:
+                return f"{symbol}{value / size:,.1f}{suffix}"
+        return f"{symbol}{value:,.0f}"
+    return f"{value:,.0f}"
+
+
+def find_conflicts(facts: List[dict], tolerance: float = NUMERIC_CONFLICT_TOLERANCE) -> List[dict]:
+    """
+    Flag facts that disagree between sources.
+
+    Facts are compared only within the same metric, period and unit, and only
+    across different URLs. Numbers conflict when they differ by more than
+    `tolerance` relative to the larger value; founding years conflict on any
+    difference, and CEO names when two of them share no word.
+
+    Args:
+        facts: Facts from extract_facts
+        tolerance: Relative difference allowed between numeric figures
+
+    Returns:
+        List of conflict dicts with metric, period and the per-source claims
+    """
+    groups = {}
+    for fact in facts:
+        key = (fact["metric"], fact["period"], fact["unit"])
+        groups.setdefault(key, []).append(fact)
+
+    conflicts = []
+    for (metric, period, unit), group in groups.items():
+        # One claim per source: the first mention in each finding
+        by_url = {}
+        for fact in group:
+            by_url.setdefault(fact["url"], fact)
+        claims = list(by_url.values())
+        if len(claims) < 2:
+            continue
+
+        if metric == "ceo":
+            # "Satya Nadella" and "Nadella" name the same person
+            names = [set(claim["text"].lower().split()) for claim in claims]
+            disagree = any(not a & b for i, a in enumerate(names) for b in names[i + 1:])
+        elif metric == "founded":
+            disagree = len({claim["value"] for claim in claims}) > 1
+        else:
+            values = [claim["value"] for claim in claims]
+            high, low = max(values), min(values)
+            disagree = high > 0 and (high - low) / high > tolerance
+
+        if disagree:
+            conflicts.append({
+                "metric": metric,
+                "period": period,
+                "claims": [
+                    {"value": format_value(metric, claim["value"] if metric != "ceo" else claim["text"], unit),
+                     "text": claim["text"], "url": claim["url"]}
+                    for claim in claims
+                ]
+            })
+
+    return conflicts
+
+
+def check_research_data(research_data: List[dict], tolerance: float = NUMERIC_CONFLICT_TOLERANCE) -> Tuple[List[dict], List[dict]]:
+    """
+    Run extraction and conflict detection over all research findings.
+
+    Returns:
+        (facts, conflicts)
+    """
+    facts = []
+    for item in research_data:
+        text = f"{item.get('title', '')}. {item.get('content', '')}"
+        facts.extend(extract_facts(text, item.get("url", "")))
+    return facts, find_conflicts(facts, tolerance)
+
+
+def format_conflicts(conflicts: List[dict]) -> str:
+    """
+    Describe detected conflicts, one block per metric.
+
+    Returns:
+        Plain-text summary listing each source's figure and URL
+    """
+    blocks = []
+    for conflict in conflicts:
+        label = METRIC_LABELS.get(conflict["metric"], conflict["metric"])
+        if conflict["period"]:
+            label += f" ({conflict['period']})"
+        lines = [f"{label}:"]
+        lines.extend(f"- {claim['value']} (\"{claim['text']}\") — {claim['url']}" for claim in conflict["claims"])
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
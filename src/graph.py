@@ -1,14 +1,80 @@
-from typing import TypedDict, List, Annotated, Literal
+from typing import TypedDict, List, Dict, Annotated, Literal, Optional, Tuple
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.rate_limiters import InMemoryRateLimiter
 from tavily import TavilyClient
+from src.search_cache import get_search_cache
+from src.checkpoint_store import create_checkpointer
+from src.fact_check import check_research_data, format_conflicts
+from src.dedup import DEDUP_ENABLED, deduplicate_findings
+from src.context_packer import estimate_tokens, pack_findings
+from src.query_planner import QUERY_PLANNER_ENABLED, SEARCH_CREDITS, format_coverage, gap_plan, initial_plan, measure_coverage
+from src.instrumentation import NodeMetrics, current_metrics, instrument_node, invoke_llm, record_external_call
+from src.report_sections import Section, join_sections, section_key, split_sections
+from src.research_diff import diff_research, finding_topics, has_changes, needs_full_rewrite
+from concurrent.futures import ThreadPoolExecutor
 import os
+import threading
+import time
+import uuid
 import json
 from operator import add
 
 
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Maximum number of Tavily searches in flight at once (1 = sequential)
+TAVILY_MAX_CONCURRENCY = int(os.getenv("TAVILY_MAX_CONCURRENCY", "4"))
+
+# Per-query timeout in seconds for a single Tavily search
+TAVILY_QUERY_TIMEOUT = float(os.getenv("TAVILY_QUERY_TIMEOUT", "20"))
+
+# Extra attempts for a Tavily query that fails or times out
+TAVILY_MAX_RETRIES = int(os.getenv("TAVILY_MAX_RETRIES", "1"))
+
+# Gemini model used by every node
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+
+# Sampling temperatures: creative writing vs. deterministic auditing/extraction
+WRITER_TEMPERATURE = 0.7
+REVIEWER_TEMPERATURE = 0.0
+
+# Approximate prompt token budget per reviewer batch, and batches reviewed at once
+REVIEWER_BATCH_TOKENS = int(os.getenv("REVIEWER_BATCH_TOKENS", "6000"))
+REVIEWER_MAX_CONCURRENCY = int(os.getenv("REVIEWER_MAX_CONCURRENCY", "4"))
+
+# Approximate token budget for the research findings in the writer prompt
+WRITER_CONTEXT_TOKENS = int(os.getenv("WRITER_CONTEXT_TOKENS", "8000"))
+
+# Gemini review when the local numeric check finds no disagreement:
+# "full" (review every batch), or opt in to "light" (first batch only, later
+# findings go unreviewed) or "skip" (no call)
+REVIEWER_CLEAN_POLICY = os.getenv("REVIEWER_CLEAN_POLICY", "full").lower()
+
+# Process-wide request rate limits shared by every run (0 = unlimited)
+TAVILY_REQUESTS_PER_SECOND = float(os.getenv("TAVILY_REQUESTS_PER_SECOND", "0"))
+GEMINI_REQUESTS_PER_SECOND = float(os.getenv("GEMINI_REQUESTS_PER_SECOND", "0"))
+
+
+def _make_rate_limiter(requests_per_second: float):
+    if requests_per_second <= 0:
+        return None
+    return InMemoryRateLimiter(
+        requests_per_second=requests_per_second,
+        check_every_n_seconds=0.05,
+        max_bucket_size=max(1.0, requests_per_second)
+    )
+
+
+tavily_rate_limiter = _make_rate_limiter(TAVILY_REQUESTS_PER_SECOND)
+gemini_rate_limiter = _make_rate_limiter(GEMINI_REQUESTS_PER_SECOND)
+
+
 # ============================================================================
 # SYSTEM PROMPTS
 # ============================================================================
@@ -27,6 +93,36 @@ Respond ONLY with a valid JSON object in this exact format:
 
 Do not include any other text, explanations, or markdown formatting. Only output the JSON object."""
 
+REVIEWER_BATCH_SYSTEM_PROMPT = """You are a skeptical data auditor reviewing ONE BATCH of research findings about a company. Other batches are reviewed separately.
+
+1. Compare the facts in this batch and look strictly for numerical or factual discrepancies (e.g., conflicting revenue, different CEO names, contradictory strategic goals).
+2. List the key verifiable facts in this batch (revenue, CEO/executives, headcount, founding year, major deals, strategic goals), each tagged with its finding number and URL, so they can be cross-checked against other batches.
+
+When you detect a conflict, describe what conflicting information you found. Do NOT ask the user to clarify.
+
+Respond ONLY with a valid JSON object in this exact format:
+{
+    "conflict_detected": true or false,
+    "clarification_question": "Description of the conflicting information found, if any. Otherwise empty string.",
+    "key_facts": ["Fact (Finding N, URL)", "..."]
+}
+
+Do not include any other text, explanations, or markdown formatting. Only output the JSON object."""
+
+REVIEWER_MERGE_SYSTEM_PROMPT = """You are a skeptical data auditor combining the results of several batch reviews of research about one company.
+
+You receive, for each batch, the conflicts its reviewer found and the key facts it extracted. Decide whether the research as a whole contains numerical or factual discrepancies: keep genuine within-batch conflicts, and look for facts in different batches that contradict each other (e.g., conflicting revenue, different CEO names, contradictory strategic goals). Ignore differences explained by different time periods or rounding.
+
+Describe the conflicting information found in a single statement. Do NOT ask the user to clarify.
+
+Respond ONLY with a valid JSON object in this exact format:
+{
+    "conflict_detected": true or false,
+    "clarification_question": "Description of the conflicting information found, if any. Otherwise empty string."
+}
+
+Do not include any other text, explanations, or markdown formatting. Only output the JSON object."""
+
 WRITER_SYSTEM_PROMPT = """
 You are a highly analytical and experienced Sales Strategist and Account Planning Specialist.
 Your task is to take the validated company research data and synthesize it into a formal, structured Account Plan document.
@@ -62,6 +158,18 @@ Your task is to take the validated company research data and synthesize it into
 **DATA SOURCE:** Only use the validated, non-conflicting research data provided in the state. Do not invent any facts.
 """
 
+REFRESH_SYSTEM_PROMPT = """You are a Sales Strategist refreshing sections of an existing account plan with new research.
+
+You receive only the sections whose supporting research changed since the plan was written, the current research data behind them, and a list of what changed.
+
+Your task:
+1. Update each section so it reflects the current research data, especially the new and changed findings
+2. Keep statements the research still supports; drop ones that relied only on removed findings
+3. Return ONLY those sections in markdown, each starting with its unchanged "## " heading
+4. Keep the structure and formatting of each section (tables stay tables, bullets stay bullets)
+
+**DATA SOURCE:** Only use the research data provided. Do not invent any facts."""
+
 
 # ============================================================================
 # STATE DEFINITION
@@ -81,6 +189,11 @@ class AgentState(TypedDict):
         conflicting_data: Details about the conflicting information
         final_report: Generated account plan report
         human_resolution: Human's decision when conflict occurs
+        metrics: Timing and token usage per node, keyed by node name
+        previous_report: Stored account plan to refresh incrementally (optional)
+        previous_research: research_data the stored plan was written from (optional)
+        research_changes: diff_research result against previous_research
+        refresh: How the writer refreshed previous_report (mode and sections)
     """
     messages: List[str]  # Changed from Annotated to prevent accumulation
     company_name: str
@@ -90,12 +203,21 @@ class AgentState(TypedDict):
     conflicting_data: str
     final_report: str
     human_resolution: str
+    metrics: Dict[str, NodeMetrics]
+    previous_report: str
+    previous_research: List[dict]
+    research_changes: dict
+    refresh: dict
 
 
 def research_node(state: AgentState) -> AgentState:
     """
     Research Node: Uses Tavily to search for company information.
     
+    The base searches run at basic depth first. Advanced searches are then
+    made only for required fields (revenue, CEO, recent news, competitors)
+    the basic results do not cover; see src/query_planner.py.
+    
     Args:
         state: Current agent state containing company_name
         
@@ -117,59 +239,251 @@ def research_node(state: AgentState) -> AgentState:
     
     tavily_client = TavilyClient(api_key=tavily_api_key)
     
-    # Research queries
-    queries = [
-        f"{company_name} company overview and business model",
-        f"{company_name} recent news and developments",
-        f"{company_name} products and services",
-        f"{company_name} market position and competitors"
-    ]
+    search_cache = get_search_cache()
     
-    messages.append(f"🔍 Starting research on: {company_name}")
+    # Worker threads record into this node's collector explicitly
+    metrics = current_metrics()
+    
+    def run_search(search):
+        """Run a single Tavily search and return (results, error, cached)."""
+        query, search_depth, max_results = search
+        if search_cache is not None:
+            try:
+                cached = search_cache.get(query, search_depth, max_results)
+            except Exception as e:
+                print(f"Search cache read failed: {e}")
+                cached = None
+            if cached is not None:
+                return cached.get("results", []), None, True
+        
+        started = time.perf_counter()
+        for attempt in range(TAVILY_MAX_RETRIES + 1):
+            try:
+                if tavily_rate_limiter is not None:
+                    tavily_rate_limiter.acquire()
+                response = tavily_client.search(
+                    query=query,
+                    search_depth=search_depth,
+                    max_results=max_results,
+                    timeout=TAVILY_QUERY_TIMEOUT
+                )
+                break
+            except Exception as e:
+                if attempt == TAVILY_MAX_RETRIES:
+                    record_external_call("tavily", time.perf_counter() - started, metrics, error=True, retries=attempt)
+                    return [], e, False
+        
+        record_external_call("tavily", time.perf_counter() - started, metrics, retries=attempt)
+        
+        if search_cache is not None:
+            try:
+                search_cache.put(query, search_depth, max_results, response)
+            except Exception as e:
+                print(f"Search cache write failed: {e}")
+        
+        return response.get("results", []), None, False
     
     research_results = []
+    cache_hits = 0
+    failed_searches = 0
+    credits = 0
     
-    for query in queries:
-        try:
-            messages.append(f"  → Searching: {query}")
-            
-            # Perform search
-            response = tavily_client.search(
-                query=query,
-                search_depth="advanced",
-                max_results=3
-            )
+    def run_round(searches):
+        """Fan a round of searches out over a bounded pool and collect their findings in plan order."""
+        nonlocal cache_hits, failed_searches, credits
+        
+        max_workers = max(1, min(TAVILY_MAX_CONCURRENCY, len(searches)))
+        for search in searches:
+            messages.append(f"  → Searching ({search.depth}): {search.query}")
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(run_search, searches))
+        
+        for search, (results, error, cached) in zip(searches, outcomes):
+            if error is not None:
+                failed_searches += 1
+                messages.append(f"  ✗ Error searching '{search.query}': {str(error)}")
+                continue
             
             # Extract relevant information
-            for result in response.get("results", []):
+            for result in results:
                 research_results.append({
-                    "query": query,
+                    "query": search.query,
                     "title": result.get("title", ""),
                     "url": result.get("url", ""),
                     "content": result.get("content", ""),
                     "score": result.get("score", 0.0)
                 })
             
-            messages.append(f"  ✓ Found {len(response.get('results', []))} results")
-            
-        except Exception as e:
-            messages.append(f"  ✗ Error searching '{query}': {str(e)}")
+            if cached:
+                cache_hits += 1
+                messages.append(f"  ✓ Found {len(results)} results (cached)")
+            else:
+                credits += SEARCH_CREDITS.get(search.depth, 1)
+                messages.append(f"  ✓ Found {len(results)} results")
+    
+    messages.append(f"🔍 Starting research on: {company_name}")
+    
+    # Cheap basic-depth searches first; advanced searches only for the fields they missed
+    searches = initial_plan(company_name)
+    run_round(searches)
+    
+    if QUERY_PLANNER_ENABLED:
+        coverage = measure_coverage(research_results, company_name)
+        messages.append(f"  📋 Coverage: {format_coverage(coverage)}")
+        
+        gaps = gap_plan(company_name, coverage)
+        if gaps:
+            messages.append(f"  → Following up on {len(gaps)} gaps with advanced searches")
+            run_round(gaps)
+            searches += gaps
+            coverage = measure_coverage(research_results, company_name)
+            messages.append(f"  📋 Coverage: {format_coverage(coverage)}")
+        else:
+            messages.append("  ✓ Coverage met - advanced searches skipped")
+    
+    messages.append(f"  💳 Tavily: {len(searches)} searches, {credits} credits")
+    if search_cache is not None:
+        messages.append(f"  💾 Search cache: {cache_hits} hits, {len(searches) - cache_hits} misses")
+    
+    # Drop repeated pages and syndicated copies before they reach the prompts
+    if DEDUP_ENABLED and research_results:
+        research_results, removed = deduplicate_findings(research_results)
+        if removed:
+            messages.append(f"  🧹 Merged {removed} duplicate findings")
+    
+    # Incremental refresh: compare with the research behind the stored account plan
+    updates = {}
+    previous_research = state.get("previous_research")
+    if previous_research:
+        if failed_searches:
+            # Findings of a failed search would all look removed
+            messages.append("  ⚠️  A search failed - incremental refresh disabled for this run")
+        else:
+            changes = diff_research(previous_research, research_results, company_name)
+            messages.append(
+                f"  🔁 Since the last run: {len(changes['added'])} new, {len(changes['changed'])} changed, "
+                f"{len(changes['removed'])} removed, {changes['unchanged']} unchanged findings"
+            )
+            updates["research_changes"] = changes
+        # Not needed any more; keep it out of the checkpoints
+        updates["previous_research"] = []
     
     # Update state
     messages.append(f"\n📊 Research complete: {len(research_results)} total findings")
     
-    return {**state, "messages": messages, "research_data": research_results}
+    return {**state, **updates, "messages": messages, "research_data": research_results}
 
 
 # ============================================================================
 # REVIEWER NODE
 # ============================================================================
 
+def parse_json_response(response_text: str) -> dict:
+    """
+    Parse a JSON object from an LLM response, tolerating markdown code fences.
+    
+    Raises:
+        json.JSONDecodeError: If the response is not valid JSON
+    """
+    # Clean up response if it has markdown code blocks
+    if "```json" in response_text:
+        response_text = response_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in response_text:
+        response_text = response_text.split("```")[1].split("```")[0].strip()
+    
+    return json.loads(response_text)
+
+
+def batch_by_tokens(entries: List[str], token_budget: int) -> List[List[str]]:
+    """
+    Greedily pack formatted findings into batches that fit a token budget.
+    
+    A single entry larger than the budget gets a batch of its own.
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    
+    for entry in entries:
+        tokens = estimate_tokens(entry)
+        if current and current_tokens + tokens > token_budget:
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(entry)
+        current_tokens += tokens
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+def review_batches(llm, company_name: str, batches: List[List[str]], messages: List[str], hints: str = "") -> str:
+    """
+    Map-reduce review: audit each batch concurrently, then merge the verdicts.
+    
+    Args:
+        llm: Chat model used for every call
+        company_name: Company being researched
+        batches: Formatted findings grouped into token-budgeted batches
+        messages: Execution log, appended to in place
+        hints: Discrepancies flagged by the local numeric check, passed to the merge
+        
+    Returns:
+        Raw text of the merge call, in the single-review JSON format
+    """
+    metrics = current_metrics()
+    
+    def review_batch(batch):
+        llm_messages = [
+            SystemMessage(content=REVIEWER_BATCH_SYSTEM_PROMPT),
+            HumanMessage(content=f"Analyze this batch of research data about {company_name}:\n\n" + "\n\n".join(batch))
+        ]
+        try:
+            return parse_json_response(invoke_llm(llm, llm_messages, metrics).content.strip()), None
+        except Exception as e:
+            return None, e
+    
+    max_workers = max(1, min(REVIEWER_MAX_CONCURRENCY, len(batches)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        verdicts = list(executor.map(review_batch, batches))
+    
+    batch_reports = []
+    for idx, (verdict, error) in enumerate(verdicts, 1):
+        if error is not None:
+            messages.append(f"  ✗ Batch {idx} review failed: {str(error)}")
+            continue
+        
+        conflict = verdict.get("clarification_question", "") if verdict.get("conflict_detected") else ""
+        facts = verdict.get("key_facts", [])
+        messages.append(f"  ✓ Batch {idx}: {'conflict' if conflict else 'no conflict'}, {len(facts)} key facts")
+        batch_reports.append(
+            f"Batch {idx}:\nConflict found: {conflict or 'none'}\nKey facts:\n" +
+            "\n".join(f"- {fact}" for fact in facts)
+        )
+    
+    if not batch_reports:
+        raise ValueError("All reviewer batches failed")
+    
+    messages.append("  → Merging batch verdicts...")
+    llm_messages = [
+        SystemMessage(content=REVIEWER_MERGE_SYSTEM_PROMPT),
+        HumanMessage(content=f"Batch review results for {company_name}:\n\n" + "\n\n".join(batch_reports) + hints)
+    ]
+    return invoke_llm(llm, llm_messages, metrics).content.strip()
+
+
 def reviewer_node(state: AgentState) -> AgentState:
     """
     Reviewer Node: Analyzes research data for conflicts and contradictions.
     
-    Uses Gemini LLM to detect factual discrepancies in the research findings.
+    A local numeric check first compares revenue, headcount, CEO and similar
+    facts across sources. Gemini then reviews the findings: fully when the
+    check flagged something, otherwise as set by REVIEWER_CLEAN_POLICY.
+    Findings that fit in one token budget are reviewed in a single call;
+    larger corpora are split into batches reviewed concurrently and merged
+    in a final pass.
     
     Args:
         state: Current agent state containing research_data
@@ -186,36 +500,73 @@ def reviewer_node(state: AgentState) -> AgentState:
         messages.append("  ⚠️  No research data to review")
         return {**state, "messages": messages, "conflicting_info": False}
     
-    # Prepare research summary for LLM
-    research_summary = "\n\n".join([
-        f"Finding {idx + 1}:\nTitle: {item['title']}\nContent: {item['content']}\nURL: {item['url']}"
-        for idx, item in enumerate(research_data[:10])  # Limit to first 10 to avoid token limits
-    ])
+    # The stored account plan was written from exactly this research
+    changes = state.get("research_changes")
+    if changes is not None and not has_changes(changes):
+        messages.append("\n✅ Research unchanged since the last run - review skipped")
+        return {**state, "messages": messages, "conflicting_info": False}
+    
+    # Deterministic pass: extract comparable facts and flag disagreements
+    facts, numeric_conflicts = check_research_data(research_data)
+    numeric_summary = format_conflicts(numeric_conflicts)
+    messages.append(f"  → Numeric check: {len(facts)} facts extracted, {len(numeric_conflicts)} discrepancies")
+    
+    # Prepare research summary for LLM: every finding, best first, long ones cut to key sentences
+    entries, packing = pack_findings(research_data)
+    research_summary = "\n\n".join(entries)
+    batches = batch_by_tokens(entries, REVIEWER_BATCH_TOKENS)
+    
+    def numeric_verdict():
+        # Used when Gemini is skipped or its review fails
+        if numeric_conflicts:
+            messages.append(f"\n⚠️  CONFLICT DETECTED!")
+            messages.append(f"  Sources disagree on:\n{numeric_summary}")
+            return {
+                **state,
+                "messages": messages,
+                "conflicting_info": True,
+                "clarification_question": "Sources report different figures:\n" + numeric_summary,
+                "conflicting_data": numeric_summary
+            }
+        return {**state, "messages": messages, "conflicting_info": False}
+    
+    hints = ""
+    if numeric_conflicts:
+        hints = f"\n\nAn automated numeric check flagged these possible discrepancies:\n{numeric_summary}"
+    elif REVIEWER_CLEAN_POLICY == "skip":
+        messages.append("\n✅ No conflicts detected - numeric check passed, Gemini review skipped")
+        return numeric_verdict()
+    elif REVIEWER_CLEAN_POLICY == "light" and len(batches) > 1:
+        messages.append(f"  → Numeric check passed, reviewing first {len(batches[0])} of {len(entries)} findings")
+        batches = batches[:1]
     
     try:
-        llm = get_llm()
+        llm = get_llm(temperature=REVIEWER_TEMPERATURE)
         
-        messages.append("  → Sending data to Gemini for analysis...")
-        
-        # Get LLM response
-        llm_messages = [
-            SystemMessage(content=REVIEWER_SYSTEM_PROMPT),
-            HumanMessage(content=f"Analyze this research data about {state['company_name']}:\n\n{research_summary}")
-        ]
-        response = llm.invoke(llm_messages)
-        response_text = response.content.strip()
+        if len(batches) == 1:
+            messages.append("  → Sending data to Gemini for analysis...")
+            
+            # Get LLM response
+            llm_messages = [
+                SystemMessage(content=REVIEWER_SYSTEM_PROMPT),
+                HumanMessage(content=f"Analyze this research data about {state['company_name']}:\n\n" + "\n\n".join(batches[0]) + hints)
+            ]
+            response = invoke_llm(llm, llm_messages)
+            response_text = response.content.strip()
+        else:
+            messages.append(f"  → Reviewing {len(entries)} findings in {len(batches)} batches...")
+            response_text = review_batches(llm, state['company_name'], batches, messages, hints)
         
         messages.append(f"  ✓ Gemini response received")
+        reviewed = sum(len(batch) for batch in batches)
+        messages.append(
+            f"  📏 Reviewer context: {reviewed}/{packing['total']} findings, "
+            f"{packing['trimmed']} trimmed, ~{sum(estimate_tokens(e) for batch in batches for e in batch)} finding tokens"
+        )
         
         # Parse JSON response
         try:
-            # Clean up response if it has markdown code blocks
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(response_text)
+            result = parse_json_response(response_text)
             
             conflict_detected = result.get("conflict_detected", False)
             clarification_question = result.get("clarification_question", "")
@@ -231,17 +582,17 @@ def reviewer_node(state: AgentState) -> AgentState:
                 "messages": messages, 
                 "conflicting_info": conflict_detected,
                 "clarification_question": clarification_question if conflict_detected else "",
-                "conflicting_data": research_summary[:500] if conflict_detected else ""
+                "conflicting_data": (numeric_summary or research_summary[:500]) if conflict_detected else ""
             }
                 
         except json.JSONDecodeError as e:
             messages.append(f"  ✗ Error parsing Gemini response: {str(e)}")
             messages.append(f"  Raw response: {response_text[:200]}...")
-            return {**state, "messages": messages, "conflicting_info": False}
+            return numeric_verdict()
             
     except Exception as e:
         messages.append(f"  ✗ Error during review: {str(e)}")
-        return {**state, "messages": messages, "conflicting_info": False}
+        return numeric_verdict()
 
 
 # ============================================================================
@@ -291,6 +642,125 @@ def human_node(state: AgentState) -> AgentState:
 # WRITER NODE (STUB)
 # ============================================================================
 
+# Key (see section_key) of the section listing the research sources
+SOURCES_SECTION_KEY = "research sources"
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove markdown code block markers Gemini sometimes wraps its answer in."""
+    if "```markdown" in text:
+        return text.split("```markdown")[1].split("```")[0].strip()
+    if "```" in text:
+        return text.replace("```", "").strip()
+    return text
+
+
+def sources_section(research_data: List[dict]) -> Tuple[str, int]:
+    """
+    Build the Research Sources section appended to every account plan.
+    
+    Returns:
+        (section markdown, number of unique sources listed)
+    """
+    section = "## 📚 Research Sources\n\n"
+    section += "This report was compiled using the following sources:\n\n"
+    
+    seen_urls = set()
+    for item in research_data:
+        url = item.get('url', '')
+        if url and url != 'human-input' and url not in seen_urls:
+            seen_urls.add(url)
+            title = item.get('title', 'Untitled')
+            section += f"{len(seen_urls)}. [{title}]({url})\n"
+    
+    return section, len(seen_urls)
+
+
+def refresh_report(company_name: str, previous_report: str, research_data: List[dict],
+                   changes: dict, messages: List[str]) -> Optional[Tuple[str, List[str]]]:
+    """
+    Regenerate only the sections of a stored account plan whose research changed.
+    
+    The sections named in changes["sections"] are rewritten from the current
+    findings of the changed topics; the Research Sources section is rebuilt
+    and everything else is kept as is.
+    
+    Args:
+        company_name: Company the plan is about
+        previous_report: Stored account plan markdown
+        research_data: Findings of the new run
+        changes: diff_research result
+        messages: Progress log, appended to in place
+    
+    Returns:
+        (refreshed report, titles of the regenerated sections), or None if the
+        stored plan lacks a needed section or Gemini's answer cannot be mapped
+        back onto it
+    """
+    preamble, sections = split_sections(previous_report)
+    keys = [section_key(section.title) for section in sections]
+    
+    sources_idx = next((idx for idx, key in enumerate(keys) if SOURCES_SECTION_KEY in key), None)
+    targets = [idx for idx, key in enumerate(keys) if any(name in key for name in changes["sections"])]
+    found = {name for name in changes["sections"] for key in keys if name in key}
+    if sources_idx is None or found != set(changes["sections"]):
+        return None
+    
+    updated = list(sections)
+    if targets:
+        topics = set(changes["topics"])
+        relevant = [item for item in research_data if finding_topics(item, company_name) & topics]
+        entries, packing = pack_findings(relevant, WRITER_CONTEXT_TOKENS, url_label="Source")
+        
+        changed_lines = [f"- New: {item['title']} ({item['url']})" for item in changes["added"]]
+        changed_lines += [f"- Updated: {item['title']} ({item['url']})" for item in changes["changed"]]
+        changed_lines += [f"- No longer found: {item['title']} ({item['url']})" for item in changes["removed"]]
+        
+        # Trailing "---" rules belong to the report layout, not the section text
+        current = "\n\n".join(sections[idx].markdown.rstrip("-").rstrip() for idx in targets)
+        user_prompt = f"""Account plan for {company_name}. Sections to update:
+
+{current}
+
+---
+
+What changed since the plan was written:
+{chr(10).join(changed_lines)}
+
+Current research data for these sections:
+
+{chr(10).join(entries)}"""
+        
+        messages.append(
+            f"  📏 Refresh context: {len(targets)} sections, {packing['packed']}/{packing['total']} findings, "
+            f"~{estimate_tokens(REFRESH_SYSTEM_PROMPT) + estimate_tokens(user_prompt)} prompt tokens"
+        )
+        messages.append("  → Sending changed sections to Gemini...")
+        
+        # Only some sections come back, so keep these tokens out of the report_delta stream
+        response = invoke_llm(get_llm().with_config(tags=[TAG_NOSTREAM]), [
+            SystemMessage(content=REFRESH_SYSTEM_PROMPT),
+            HumanMessage(content=user_prompt)
+        ])
+        _, returned = split_sections(strip_code_fences(response.content.strip()))
+        by_key = {section_key(section.title): section for section in returned}
+        
+        for idx in targets:
+            section = by_key.get(keys[idx])
+            if section is None:
+                return None
+            updated[idx] = section
+    
+    # The sources list always reflects the new research
+    sources, _ = sources_section(research_data)
+    updated[sources_idx] = Section(sections[sources_idx].title, sources.strip())
+    if sources_idx > 0:
+        before = updated[sources_idx - 1]
+        updated[sources_idx - 1] = Section(before.title, before.markdown.rstrip("-").rstrip() + "\n\n---")
+    
+    return join_sections(preamble, updated), [sections[idx].title for idx in targets]
+
+
 def writer_node(state: AgentState) -> AgentState:
     """
     Writer Node: Generates final account plan report.
@@ -314,11 +784,34 @@ def writer_node(state: AgentState) -> AgentState:
         final_report = f"# Account Plan: {company_name}\n\nInsufficient data for analysis."
         return {**state, "messages": messages, "final_report": final_report}
     
-    # Prepare research summary for LLM
-    research_summary = "\n\n".join([
-        f"Finding {idx + 1}:\nTitle: {item['title']}\nContent: {item['content']}\nSource: {item['url']}"
-        for idx, item in enumerate(research_data[:15])  # Use top 15 findings
-    ])
+    # Incremental refresh: reuse the stored plan, or rewrite only what changed
+    previous_report = state.get("previous_report", "")
+    changes = state.get("research_changes")
+    if previous_report and changes is not None:
+        if not has_changes(changes):
+            messages.append("  ♻️  Research unchanged since the last run - reusing the previous account plan")
+            refresh = {"mode": "unchanged", "sections": []}
+            return {**state, "messages": messages, "final_report": previous_report, "refresh": refresh}
+        
+        if needs_full_rewrite(changes):
+            messages.append(f"  → Research changed broadly ({', '.join(changes['topics'])}) - rewriting the whole plan")
+        else:
+            try:
+                refreshed = refresh_report(company_name, previous_report, research_data, changes, messages)
+            except Exception as e:
+                messages.append(f"  ✗ Error refreshing sections: {str(e)}")
+                refreshed = None
+            
+            if refreshed is not None:
+                report, titles = refreshed
+                messages.append(f"  ✓ Refreshed {len(titles)} sections: {', '.join(titles)}")
+                refresh = {"mode": "sections", "sections": titles}
+                return {**state, "messages": messages, "final_report": report, "refresh": refresh}
+            messages.append("  → Could not refresh single sections - rewriting the whole plan")
+    
+    # Prepare research summary for LLM: best findings that fit the token budget
+    entries, packing = pack_findings(research_data, WRITER_CONTEXT_TOKENS, url_label="Source")
+    research_summary = "\n\n".join(entries)
     
     try:
         llm = get_llm()
@@ -329,38 +822,26 @@ def writer_node(state: AgentState) -> AgentState:
             HumanMessage(content=f"Generate an Account Plan for {company_name} based on this research data:\n\n{research_summary}")
         ]
         
+        messages.append(
+            f"  📏 Writer context: {packing['packed']}/{packing['total']} findings, {packing['trimmed']} trimmed, "
+            f"~{sum(estimate_tokens(m.content) for m in llm_messages)} prompt tokens"
+        )
         messages.append("  → Sending data to Gemini for synthesis...")
         
         # Get LLM response
-        response = llm.invoke(llm_messages)
-        report = response.content.strip()
-        
-        # Clean up markdown code blocks if present
-        if "```markdown" in report:
-            report = report.split("```markdown")[1].split("```")[0].strip()
-        elif "```" in report:
-            # Remove any other code block markers
-            report = report.replace("```", "").strip()
+        response = invoke_llm(llm, llm_messages)
+        report = strip_code_fences(response.content.strip())
         
         # Append research sources section
-        report += "\n\n---\n\n"
-        report += "## 📚 Research Sources\n\n"
-        report += "This report was compiled using the following sources:\n\n"
-        
-        # Add unique sources
-        seen_urls = set()
-        source_num = 1
-        for item in research_data:
-            url = item.get('url', '')
-            if url and url != 'human-input' and url not in seen_urls:
-                seen_urls.add(url)
-                title = item.get('title', 'Untitled')
-                report += f"{source_num}. [{title}]({url})\n"
-                source_num += 1
+        sources, source_count = sources_section(research_data)
+        report += "\n\n---\n\n" + sources
         
         messages.append(f"  ✓ Account plan generated successfully ({len(report)} characters)")
-        messages.append(f"  ✓ Added {len(seen_urls)} research sources")
+        messages.append(f"  ✓ Added {source_count} research sources")
         
+        if previous_report:
+            refresh = {"mode": "full", "sections": [section.title for section in split_sections(report)[1]]}
+            return {**state, "messages": messages, "final_report": report, "refresh": refresh}
         return {**state, "messages": messages, "final_report": report}
         
     except Exception as e:
@@ -396,22 +877,24 @@ def route_after_human(state: AgentState) -> Literal["writer", "end"]:
 # GRAPH CREATION
 # ============================================================================
 
-def create_research_graph():
+def create_research_graph(checkpointer=None):
     """
     Creates the research agent graph with checkpointer for interrupts.
     
     Flow: Researcher → Reviewer → [Human Review OR Writer] → END
     
+    Args:
+        checkpointer: Checkpoint saver to compile with (defaults to a new MemorySaver)
+    
     Returns:
         Compiled StateGraph with interrupt capability
     """
     workflow = StateGraph(AgentState)
     
-    # Add all nodes
-    workflow.add_node("researcher", research_node)
-    workflow.add_node("reviewer", reviewer_node)
-    workflow.add_node("human_review", human_node)
-    workflow.add_node("writer", writer_node)
+    # Add all nodes, each timed into state["metrics"]
+    for name, node in (("researcher", research_node), ("reviewer", reviewer_node),
+                       ("human_review", human_node), ("writer", writer_node)):
+        workflow.add_node(name, instrument_node(name, node))
     
     # Set entry point
     workflow.set_entry_point("researcher")
@@ -443,17 +926,110 @@ def create_research_graph():
     workflow.add_edge("writer", END)
     
     # Compile with checkpointer and interrupt before human_review
-    checkpointer = MemorySaver()
+    if checkpointer is None:
+        checkpointer = MemorySaver()
     return workflow.compile(
         checkpointer=checkpointer,
         interrupt_before=["human_review"]
     )
 
 
-# Initialize LLM (for future nodes)
-def get_llm():
+# ============================================================================
+# GRAPH REGISTRY
+# ============================================================================
+
+_research_graph = None
+_research_graph_lock = threading.Lock()
+
+
+def get_research_graph():
+    """
+    Return the process-wide compiled research graph.
+    
+    The graph is built and compiled once with a single shared checkpointer
+    (the durable SQLite store unless CHECKPOINT_BACKEND=memory). Runs are kept
+    apart by the thread_id in their config, so every caller must use its own
+    thread (see new_thread_config).
+    
+    Returns:
+        Shared compiled StateGraph
+    """
+    global _research_graph
+    
+    if _research_graph is None:
+        with _research_graph_lock:
+            if _research_graph is None:
+                _research_graph = create_research_graph(checkpointer=create_checkpointer())
+    return _research_graph
+
+
+def new_thread_config(prefix: str = "session") -> dict:
     """
-    Initialize Google Gemini LLM.
+    Build a run config with a fresh, unique thread_id.
+    
+    Args:
+        prefix: Human-readable prefix for the thread_id
+        
+    Returns:
+        Config dict for graph.invoke / graph.stream
+    """
+    return {"configurable": {"thread_id": f"{prefix}_{uuid.uuid4().hex}"}}
+
+
+def get_paused_thread_config(thread_id: str):
+    """
+    Look up a run paused at the human_review interrupt.
+    
+    Works from any process sharing the checkpoint store, not just the one
+    that started the run.
+    
+    Args:
+        thread_id: Thread ID of the paused run
+        
+    Returns:
+        Config dict for resuming the run, or None if no such paused run exists
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    snapshot = get_research_graph().get_state(config)
+    if "human_review" not in (snapshot.next or ()):
+        return None
+    return config
+
+
+def release_research_thread(config: dict) -> None:
+    """
+    Drop the checkpoints of a finished run from the shared checkpointer.
+    
+    Args:
+        config: Config dict the run was started with
+    """
+    thread_id = config["configurable"]["thread_id"]
+    try:
+        get_research_graph().checkpointer.delete_thread(thread_id)
+    except Exception as e:
+        print(f"Could not release thread {thread_id}: {e}")
+
+
+# ============================================================================
+# LLM CLIENT POOL
+# ============================================================================
+
+_llm_clients = {}
+_llm_clients_lock = threading.Lock()
+
+
+def get_llm(model: str = GEMINI_MODEL, temperature: float = WRITER_TEMPERATURE):
+    """
+    Return a shared Google Gemini LLM client.
+    
+    Clients are memoized per (model, temperature, API key), so repeated calls
+    reuse the same client and its underlying connections. Chat model clients
+    are stateless between calls and safe to share across worker threads.
+    Every client shares the process-wide Gemini rate limiter, if configured.
+    
+    Args:
+        model: Gemini model name
+        temperature: Sampling temperature
     
     Returns:
         ChatGoogleGenerativeAI instance
@@ -462,8 +1038,15 @@ def get_llm():
     if not google_api_key:
         raise ValueError("GOOGLE_API_KEY not found in environment variables")
     
-    return ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0.7,
-        google_api_key=google_api_key
-    )
+    key = (model, temperature, google_api_key)
+    with _llm_clients_lock:
+        llm = _llm_clients.get(key)
+        if llm is None:
+            llm = ChatGoogleGenerativeAI(
+                model=model,
+                temperature=temperature,
+                google_api_key=google_api_key,
+                rate_limiter=gemini_rate_limiter
+            )
+            _llm_clients[key] = llm
+    return llm
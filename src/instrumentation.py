@@ -0,0 +1,173 @@
+import contextvars
+import json
+import threading
+import time
+from typing import Callable, List, Optional, TypedDict
+
+from src.context_packer import estimate_tokens
+from src.telemetry import observe_external_call, observe_node
+
+
+# ============================================================================
+# NODE METRICS
+# ============================================================================
+
+class NodeMetrics(TypedDict):
+    """
+    Timing and cost of one graph node run.
+
+    Attributes:
+        wall_seconds: Total time spent in the node
+        external_calls: Tavily and Gemini calls made (cache hits excluded)
+        external_seconds: Summed latency of those calls (overlaps when parallel)
+        errors: External calls that failed
+        retries: External calls repeated after a failure
+        prompt_tokens: Gemini input tokens
+        completion_tokens: Gemini output tokens
+        research_bytes: Size of research_data when the node finished
+    """
+    wall_seconds: float
+    external_calls: int
+    external_seconds: float
+    errors: int
+    retries: int
+    prompt_tokens: int
+    completion_tokens: int
+    research_bytes: int
+
+
+class MetricsCollector:
+    """Accumulates external-call metrics for one node run. Safe to share between threads."""
+
+    def __init__(self):
+        self.external_calls = 0
+        self.external_seconds = 0.0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def record_call(self, service: str, seconds: float, error: bool = False, retries: int = 0,
+                    prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        """
+        Record one external call.
+
+        Args:
+            service: "tavily" or "gemini"
+            seconds: Call latency, including retries
+            error: Whether the call ultimately failed
+            retries: Attempts after the first
+            prompt_tokens: Gemini input tokens
+            completion_tokens: Gemini output tokens
+        """
+        with self._lock:
+            self.external_calls += 1
+            self.external_seconds += seconds
+            self.errors += int(error)
+            self.retries += retries
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def to_metrics(self, wall_seconds: float, research_data: List[dict]) -> NodeMetrics:
+        with self._lock:
+            return NodeMetrics(
+                wall_seconds=round(wall_seconds, 3),
+                external_calls=self.external_calls,
+                external_seconds=round(self.external_seconds, 3),
+                errors=self.errors,
+                retries=self.retries,
+                prompt_tokens=self.prompt_tokens,
+                completion_tokens=self.completion_tokens,
+                research_bytes=len(json.dumps(research_data, default=str).encode("utf-8"))
+            )
+
+
+_current_collector = contextvars.ContextVar("node_metrics_collector", default=None)
+
+
+def current_metrics() -> Optional[MetricsCollector]:
+    """
+    Return the collector of the node running in this context, if any.
+
+    Worker threads do not inherit it: capture it in the node and pass it along.
+    """
+    return _current_collector.get()
+
+
+def record_external_call(service: str, seconds: float, metrics: Optional[MetricsCollector] = None,
+                         error: bool = False, retries: int = 0,
+                         prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+    """
+    Record an external call in the process-wide /metrics and, when given,
+    in the node's collector.
+    """
+    observe_external_call(service, seconds, error, retries, prompt_tokens, completion_tokens)
+    if metrics is not None:
+        metrics.record_call(service, seconds, error, retries, prompt_tokens, completion_tokens)
+
+
+def instrument_node(name: str, node: Callable[[dict], dict]) -> Callable[[dict], dict]:
+    """
+    Wrap a graph node so its run is timed and stored under state["metrics"][name].
+
+    Args:
+        name: Node name in the graph
+        node: Node function taking and returning the agent state
+
+    Returns:
+        Wrapped node function
+    """
+    def run(state: dict) -> dict:
+        collector = MetricsCollector()
+        token = _current_collector.set(collector)
+        started = time.perf_counter()
+        try:
+            result = node(state)
+        finally:
+            _current_collector.reset(token)
+
+        wall_seconds = time.perf_counter() - started
+        observe_node(name, wall_seconds)
+
+        metrics = dict(state.get("metrics") or {})
+        metrics[name] = collector.to_metrics(wall_seconds, result.get("research_data", []))
+        return {**result, "metrics": metrics}
+
+    run.__name__ = getattr(node, "__name__", name)
+    run.__doc__ = node.__doc__
+    return run
+
+
+def invoke_llm(llm, messages: list, metrics: Optional[MetricsCollector] = None):
+    """
+    Call a chat model and record its latency and token usage.
+
+    Token counts come from the response's usage metadata when the model
+    reports it, otherwise they are estimated from the text.
+
+    Args:
+        llm: Chat model
+        messages: Prompt messages
+        metrics: Node collector to record into (defaults to the current node's, if any)
+
+    Returns:
+        The model response
+    """
+    metrics = metrics or current_metrics()
+    started = time.perf_counter()
+    try:
+        response = llm.invoke(messages)
+    except Exception:
+        record_external_call("gemini", time.perf_counter() - started, metrics, error=True)
+        raise
+
+    usage = getattr(response, "usage_metadata", None) or {}
+    record_external_call(
+        "gemini",
+        time.perf_counter() - started,
+        metrics,
+        prompt_tokens=usage.get("input_tokens") or sum(estimate_tokens(str(m.content)) for m in messages),
+        completion_tokens=usage.get("output_tokens") or estimate_tokens(str(response.content))
+    )
+    return response
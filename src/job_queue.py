@@ -0,0 +1,268 @@
+import math
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Iterator, Optional
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Number of research jobs executed concurrently
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+
+# Maximum number of jobs waiting for a worker before submissions are rejected
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "32"))
+
+# Seconds finished jobs (and their events) are kept for polling
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", str(60 * 60)))
+
+# Retry-After hint in seconds used before any job has finished
+JOB_DEFAULT_RETRY_AFTER = int(os.getenv("JOB_DEFAULT_RETRY_AFTER", "30"))
+
+
+# ============================================================================
+# JOBS
+# ============================================================================
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Job:
+    """
+    A unit of background work and the ordered events it has produced.
+
+    Status moves from queued → running → one of completed, awaiting_resolution,
+    failed or cancelled.
+    """
+
+    FINISHED = ("completed", "awaiting_resolution", "failed", "cancelled")
+
+    def __init__(self, payload: dict):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = "queued"
+        self.events = []
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in self.FINISHED
+
+    def emit(self, event: dict) -> None:
+        """Append an event and wake any streaming readers."""
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def start(self) -> bool:
+        """Move a queued job to running; False if it was cancelled first."""
+        with self._cond:
+            if self.cancel_requested or self.status != "queued":
+                return False
+            self.status = "running"
+            self.started_at = time.time()
+            return True
+
+    def request_cancel(self) -> None:
+        """Flag the job for cancellation; a job still queued is cancelled at once."""
+        with self._cond:
+            if self.finished:
+                return
+            self.cancel_requested = True
+            if self.status == "queued":
+                self.finish("cancelled")
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        with self._cond:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def iter_events(self, timeout: float = 15.0) -> Iterator[Optional[dict]]:
+        """
+        Replay past events, then follow new ones until the job finishes.
+
+        Yields None after `timeout` seconds without activity so callers can
+        send keep-alives.
+        """
+        index = 0
+        while True:
+            with self._cond:
+                if index >= len(self.events) and not self.finished:
+                    self._cond.wait(timeout)
+                pending = self.events[index:]
+                index += len(pending)
+                done = self.finished and index >= len(self.events)
+
+            if pending:
+                yield from pending
+            elif not done:
+                yield None
+
+            if done:
+                return
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "payload": self.payload,
+            "error": self.error,
+            "event_count": len(self.events),
+            "last_event": self.events[-1] if self.events else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobQueue:
+    """
+    Bounded queue of jobs served by a fixed pool of worker threads.
+
+    The runner is called with each job and yields event dicts; the last event's
+    "type" decides the final status ("conflict" → awaiting_resolution, "error"
+    → failed, anything else → completed). Running jobs are cancelled
+    cooperatively between events.
+    """
+
+    def __init__(self, runner: Callable[[Job], Iterator[dict]], workers: int = JOB_WORKERS,
+                 max_queued: int = JOB_QUEUE_SIZE, result_ttl: int = JOB_RESULT_TTL):
+        self.runner = runner
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._durations = []
+        self._threads = []
+
+    def _ensure_workers(self) -> None:
+        # Workers start lazily so importing the module has no side effects
+        with self._lock:
+            if self._threads:
+                return
+            for idx in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{idx}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, payload: dict) -> Job:
+        """
+        Enqueue a job.
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        self._ensure_workers()
+        self._prune()
+
+        job = Job(payload)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFullError(self.retry_after())
+
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation; queued jobs are cancelled immediately."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+
+        job.request_cancel()
+        return job
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up."""
+        with self._lock:
+            durations = self._durations[-20:]
+        if not durations:
+            return JOB_DEFAULT_RETRY_AFTER
+        average = sum(durations) / len(durations)
+        return max(1, math.ceil(average * self._queue.qsize() / max(1, self.workers)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "max_queued": self._queue.maxsize,
+            "jobs": counts
+        }
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: Job) -> None:
+        # Checked under the job's lock, so a concurrent cancel either wins or sees it running
+        if not job.start():
+            return
+        last_event = None
+        events = self.runner(job)
+
+        try:
+            for event in events:
+                job.emit(event)
+                last_event = event
+                if job.cancel_requested:
+                    events.close()
+                    job.finish("cancelled")
+                    return
+        except Exception as e:
+            job.emit({"type": "error", "message": str(e)})
+            job.finish("failed", str(e))
+            return
+        finally:
+            with self._lock:
+                self._durations.append(time.time() - job.started_at)
+                del self._durations[:-100]
+
+        last_type = (last_event or {}).get("type")
+        if last_type == "conflict":
+            job.finish("awaiting_resolution")
+        elif last_type == "error":
+            job.finish("failed", last_event.get("message"))
+        else:
+            job.finish("completed")
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PDF_CACHE_ENABLED = os.getenv("PDF_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Total size of rendered PDFs kept in memory before least-recently-used eviction (default: 64 MB)
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Optional directory for a second, on-disk tier that survives restarts (empty: memory only)
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "")
+
+# Total size of the on-disk tier before least-recently-used eviction (default: 512 MB)
+PDF_CACHE_DISK_MAX_BYTES = int(os.getenv("PDF_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+# ============================================================================
+# PDF CACHE
+# ============================================================================
+
+def pdf_key(markdown: str, company_name: str, style_version: str) -> str:
+    """
+    Content address of a rendered PDF.
+
+    Args:
+        markdown: Report markdown
+        company_name: Company name (used in the PDF title metadata)
+        style_version: Renderer layout version; bump it to invalidate every entry
+
+    Returns:
+        Hex SHA-256 digest, also used as the ETag
+    """
+    digest = hashlib.sha256()
+    for part in (style_version, company_name, markdown):
+        encoded = part.encode("utf-8")
+        # Length prefixes keep ("ab", "c") and ("a", "bc") apart
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class PDFCache:
+    """
+    Content-addressed store of rendered PDFs.
+
+    Entries live in memory in an LRU bounded by total bytes. When a directory
+    is given, PDFs are also written to disk (bounded the same way, oldest
+    access time evicted first) and promoted back into memory on a hit. Safe
+    to share between threads.
+    """
+
+    def __init__(self, max_bytes: int = PDF_CACHE_MAX_BYTES, directory: str = PDF_CACHE_DIR,
+                 disk_max_bytes: int = PDF_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _remember(self, key: str, pdf: bytes) -> None:
+        # Caller holds the lock
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        if len(pdf) > self.max_bytes:
+            return
+        self._entries[key] = pdf
+        self._size += len(pdf)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return pdf
+
+    def _write_disk(self, key: str, pdf: bytes) -> None:
+        if not self.directory or len(pdf) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(pdf)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write PDF cache file: {e}")
+            return
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pdf"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF for a content key, or None."""
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pdf
+
+        pdf = self._read_disk(key)
+        with self._lock:
+            if pdf is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, pdf)
+        return pdf
+
+    def put(self, key: str, pdf: bytes) -> None:
+        """Store a rendered PDF under its content key."""
+        with self._lock:
+            self._remember(key, pdf)
+        self._write_disk(key, pdf)
+
+
+_pdf_cache = None
+_pdf_cache_lock = threading.Lock()
+
+
+def get_pdf_cache() -> Optional[PDFCache]:
+    """
+    Return the process-wide PDF cache, or None when caching is disabled.
+    """
+    global _pdf_cache
+
+    if not PDF_CACHE_ENABLED:
+        return None
+
+    with _pdf_cache_lock:
+        if _pdf_cache is None:
+            _pdf_cache = PDFCache()
+        return _pdf_cache
@@ -0,0 +1,263 @@
+import io
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterator, List, Tuple
+
+from src.pdf_cache import get_pdf_cache, pdf_key
+from src.pdf_render import PDF_STYLE_VERSION, render_bundle_pdf, render_pdf
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Worker processes rendering PDFs for bulk exports (ReportLab is CPU-bound and holds the GIL)
+PDF_EXPORT_WORKERS = int(os.getenv("PDF_EXPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Largest number of reports accepted in one bulk export
+PDF_EXPORT_MAX_REPORTS = int(os.getenv("PDF_EXPORT_MAX_REPORTS", "200"))
+
+# Size of the chunks a merged PDF is streamed in
+_CHUNK_BYTES = 64 * 1024
+
+
+# ============================================================================
+# PROCESS POOL
+# ============================================================================
+
+_export_pool = None
+_export_pool_lock = threading.Lock()
+
+
+def get_export_pool() -> ProcessPoolExecutor:
+    """
+    Return the process-wide PDF rendering pool, starting it on first use.
+
+    Workers are spawned rather than forked so they never inherit the web
+    server's threads or locks.
+    """
+    global _export_pool
+
+    with _export_pool_lock:
+        if _export_pool is None:
+            _export_pool = ProcessPoolExecutor(
+                max_workers=max(1, PDF_EXPORT_WORKERS),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _export_pool
+
+
+def _discard_export_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died, so the next submission starts a fresh one."""
+    global _export_pool
+
+    with _export_pool_lock:
+        if _export_pool is pool:
+            _export_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def submit_export(fn: Callable, *args) -> Tuple[ProcessPoolExecutor, Future]:
+    """
+    Submit a render to the export pool, replacing the pool once if it is broken.
+
+    A crashed worker (e.g. killed for memory) leaves a ProcessPoolExecutor
+    unusable, so it is shut down and a new one started.
+
+    Returns:
+        (pool the render was submitted to, its future)
+    """
+    pool = get_export_pool()
+    try:
+        return pool, pool.submit(fn, *args)
+    except BrokenProcessPool:
+        print("⚠️ PDF export pool was broken, starting a new one")
+        _discard_export_pool(pool)
+        pool = get_export_pool()
+        return pool, pool.submit(fn, *args)
+
+
+def export_result(pool: ProcessPoolExecutor, future: Future, fn: Callable, *args):
+    """
+    Wait for a render submitted with submit_export.
+
+    If its worker died, the pool is replaced and the render tried once more.
+    """
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        print("⚠️ PDF export worker crashed, retrying in a new pool")
+        _discard_export_pool(pool)
+        _, future = submit_export(fn, *args)
+        return future.result()
+
+
+def run_export(fn: Callable, *args):
+    """Run a render in the export pool and return its result (see export_result)."""
+    pool, future = submit_export(fn, *args)
+    return export_result(pool, future, fn, *args)
+
+
+def _render_report(content: str, company_name: str) -> bytes:
+    return render_pdf(content, company_name)
+
+
+def _render_bundle(reports: List[dict], title: str) -> bytes:
+    return render_bundle_pdf(reports, title=title)
+
+
+def render_reports(reports: List[dict]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Render reports in the process pool and yield their PDFs in input order.
+
+    Only a couple of PDFs per worker are in flight at once, so memory stays
+    bounded however many reports are exported. PDFs already in the download
+    cache are not rendered again, and new ones are added to it.
+
+    Args:
+        reports: Dicts with company_name and content (markdown)
+
+    Yields:
+        (index into reports, PDF bytes or None if rendering failed)
+    """
+    pdf_cache = get_pdf_cache()
+    window = max(1, PDF_EXPORT_WORKERS) * 2
+    pending = deque()
+    queued = iter(enumerate(reports))
+
+    def submit_next() -> bool:
+        for idx, report in queued:
+            key = pdf_key(report['content'], report['company_name'], PDF_STYLE_VERSION)
+            cached = pdf_cache.get(key) if pdf_cache is not None else None
+            if cached is not None:
+                pending.append((idx, key, None, cached))
+            else:
+                submitted = submit_export(_render_report, report['content'], report['company_name'])
+                pending.append((idx, key, submitted, None))
+            return True
+        return False
+
+    while len(pending) < window and submit_next():
+        pass
+
+    while pending:
+        idx, key, submitted, pdf = pending.popleft()
+        if submitted is not None:
+            try:
+                # A crashed worker breaks every render in flight; each is retried once in a new pool
+                pdf = export_result(*submitted, _render_report, reports[idx]['content'], reports[idx]['company_name'])
+            except Exception as e:
+                print(f"⚠️ Could not render PDF for {reports[idx]['company_name']}: {e}")
+            else:
+                if pdf_cache is not None:
+                    pdf_cache.put(key, pdf)
+        submit_next()
+        yield idx, pdf
+
+
+# ============================================================================
+# ARCHIVES
+# ============================================================================
+
+class _ChunkWriter(io.RawIOBase):
+    """Write-only, unseekable sink that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_filename(company_name: str) -> str:
+    """File name of one account plan inside a bulk export."""
+    name = re.sub(r"[^\w.-]+", "_", company_name).strip("_") or "report"
+    return f"{name}_account_plan.pdf"
+
+
+def stream_zip(reports: List[dict]) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive with one PDF per report.
+
+    Each PDF is written to the archive and flushed to the client as soon as
+    it is rendered. PDFs are already compressed, so entries are stored as is.
+    Reports that fail to render are listed in FAILED.txt.
+
+    Args:
+        reports: Dicts with company_name and content (markdown)
+
+    Yields:
+        Chunks of the ZIP file
+    """
+    sink = _ChunkWriter()
+    used_names = set()
+    failed = []
+    started = time.perf_counter()
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for idx, pdf in render_reports(reports):
+            if pdf is None:
+                failed.append(reports[idx]['company_name'])
+                continue
+
+            name = export_filename(reports[idx]['company_name'])
+            stem = name[:-len("_account_plan.pdf")]
+            suffix = 2
+            while name in used_names:
+                name = f"{stem}_{suffix}_account_plan.pdf"
+                suffix += 1
+            used_names.add(name)
+
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            archive.writestr(info, pdf)
+            yield sink.drain()
+
+        if failed:
+            info = zipfile.ZipInfo("FAILED.txt", date_time=time.localtime()[:6])
+            archive.writestr(info, "Could not render:\n" + "\n".join(failed) + "\n")
+
+    yield sink.drain()
+    print(f"📦 Bulk export finished: {len(reports)} PDFs in {time.perf_counter() - started:.1f}s")
+
+
+def render_bundle(reports: List[dict], title: str = "Account Plans") -> bytes:
+    """
+    Render one merged PDF with a table of contents.
+
+    A merged document is laid out as a whole, so it is built by a single pool
+    worker (keeping the web process free). Call this before starting the
+    response so a render failure can still be reported as an error.
+
+    Args:
+        reports: Dicts with company_name and content (markdown)
+        title: Heading of the table of contents page
+
+    Returns:
+        The PDF file
+    """
+    started = time.perf_counter()
+    pdf = run_export(_render_bundle, reports, title)
+    print(f"📦 Bulk export finished: {len(reports)} reports merged in {time.perf_counter() - started:.1f}s")
+    return pdf
+
+
+def stream_bytes(data: bytes) -> Iterator[bytes]:
+    """Stream an already rendered file in chunks."""
+    for offset in range(0, len(data), _CHUNK_BYTES):
+        yield data[offset:offset + _CHUNK_BYTES]
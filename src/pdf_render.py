@@ -0,0 +1,495 @@
+import re
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, List, NamedTuple, Optional
+
+from reportlab import rl_config
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from reportlab.platypus.tableofcontents import TableOfContents
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Bump whenever parsing or any theme changes so cached PDFs are re-rendered
+PDF_STYLE_VERSION = "2"
+
+# PDFs are served as binary downloads, so skip ReportLab's ASCII85 wrapping of
+# compressed page streams: it costs about a tenth of the render time and makes
+# files a sixth larger. This is a process-wide ReportLab setting.
+rl_config.useA85 = 0
+
+
+# ============================================================================
+# MARKDOWN PARSING
+# ============================================================================
+
+class Block(NamedTuple):
+    """
+    One block of an account-plan markdown document.
+
+    Attributes:
+        kind: "heading", "paragraph", "bullet", "numbered", "table", "rule" or "blank"
+        text: Raw inline markdown (empty for tables, rules and blanks)
+        level: Heading level, or the item number of a numbered list entry
+        rows: Table cells, header row first (tables only)
+    """
+    kind: str
+    text: str = ""
+    level: int = 0
+    rows: Optional[List[List[str]]] = None
+
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_RULE = re.compile(r"^(?:-{3,}|\*{3,}|_{3,})$")
+_BULLET = re.compile(r"^[*+-]\s+(.*)$")
+_NUMBERED = re.compile(r"^(\d+)[.)]\s+(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?$")
+
+
+def _split_row(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split("|")]
+
+
+def parse_markdown(markdown: str) -> List[Block]:
+    """
+    Parse account-plan markdown into blocks in a single pass.
+
+    Handles the subset the writer produces: headings, paragraphs, bullet and
+    numbered lists, pipe tables and horizontal rules. Consecutive blank lines
+    collapse into one blank block.
+
+    Args:
+        markdown: Report markdown
+
+    Returns:
+        Blocks in document order
+    """
+    lines = markdown.split("\n")
+    blocks = []
+    i = 0
+
+    while i < len(lines):
+        line = lines[i].strip()
+        i += 1
+
+        if not line:
+            if blocks and blocks[-1].kind != "blank":
+                blocks.append(Block("blank"))
+            continue
+
+        match = _HEADING.match(line)
+        if match:
+            blocks.append(Block("heading", match.group(2).strip(), len(match.group(1))))
+            continue
+
+        if _RULE.match(line):
+            blocks.append(Block("rule"))
+            continue
+
+        # A table starts with a pipe, or is a pipe row followed by its separator row
+        next_line = lines[i].strip() if i < len(lines) else ""
+        if line.startswith("|") or ("|" in line and _TABLE_SEPARATOR.match(next_line)):
+            rows = [_split_row(line)]
+            while i < len(lines) and "|" in lines[i]:
+                row = lines[i].strip()
+                i += 1
+                if not _TABLE_SEPARATOR.match(row):
+                    rows.append(_split_row(row))
+            blocks.append(Block("table", rows=rows))
+            continue
+
+        match = _BULLET.match(line)
+        if match:
+            blocks.append(Block("bullet", match.group(1).strip()))
+            continue
+
+        match = _NUMBERED.match(line)
+        if match:
+            blocks.append(Block("numbered", match.group(2).strip(), int(match.group(1))))
+            continue
+
+        blocks.append(Block("paragraph", line))
+
+    return blocks
+
+
+_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC = re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])")
+_LINE_BULLET = re.compile(r"^\s*[-*]\s+")
+_SOURCE_LINK = re.compile(r"^\[([^\]]+)\]\(([^)\s]+)\)$")
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def format_inline(text: str) -> str:
+    """
+    Convert inline markdown to ReportLab paragraph markup.
+
+    Text is XML-escaped; **bold**, *italic*, [links](url) and <br> tags are
+    translated, any other HTML is shown literally.
+    """
+    parts = []
+    for idx, part in enumerate(_BREAK.split(text)):
+        part = _escape(part)
+        if idx:
+            # "<br>- item" is how the writer puts lists inside table cells
+            part = _LINE_BULLET.sub("• ", part)
+        part = _LINK.sub(r'<link href="\2">\1</link>', part)
+        part = _BOLD.sub(r"<b>\1</b>", part)
+        part = _ITALIC.sub(r"<i>\1</i>", part)
+        parts.append(part)
+    return "<br/>".join(parts)
+
+
+# ============================================================================
+# THEMES
+# ============================================================================
+
+class PDFTheme(NamedTuple):
+    """
+    Page layout, paragraph styles and table style for one look of the PDF.
+
+    Attributes:
+        margins: (left, right, top, bottom) in points
+        styles: ParagraphStyles keyed by title, subtitle, h1, h2, h3, body,
+            bullet, source, cell and header_cell
+        table_style: TableStyle applied to every table
+        table_width: Usable width of a table in points
+        first_column_width: Width of the first column in two-column tables
+        title_from_heading: Use the report's leading "# " heading as the PDF title;
+            otherwise a generic "Account Plan Report" header with the date is added
+        bold_first_column: Bold the first cell of each table body row
+    """
+    margins: tuple
+    styles: Dict[str, ParagraphStyle]
+    table_style: TableStyle
+    table_width: float
+    first_column_width: float
+    title_from_heading: bool
+    bold_first_column: bool
+
+
+_BASE_STYLES = getSampleStyleSheet()
+
+
+def _report_theme() -> PDFTheme:
+    """Red theme of the web frontend's PDF download."""
+    base = _BASE_STYLES
+    text = colors.HexColor('#333333')
+    accent = colors.HexColor('#ff4444')
+    styles = {
+        'title': ParagraphStyle('CompanyTitle', parent=base['Heading1'], fontSize=26, textColor=accent,
+                                spaceAfter=6, spaceBefore=0, alignment=TA_CENTER, fontName='Helvetica-Bold'),
+        'subtitle': ParagraphStyle('Subtitle', parent=base['Normal'], fontSize=12,
+                                   textColor=colors.HexColor('#666666'), spaceAfter=30 + 0.3 * inch,
+                                   alignment=TA_CENTER, fontName='Helvetica'),
+        'h1': ParagraphStyle('SectionHeading1', parent=base['Heading1'], fontSize=18, textColor=text,
+                             spaceAfter=10, spaceBefore=16 + 0.15 * inch, fontName='Helvetica-Bold'),
+        'h2': ParagraphStyle('SectionHeading', parent=base['Heading2'], fontSize=16, textColor=text,
+                             spaceAfter=10 + 0.05 * inch, spaceBefore=16 + 0.1 * inch, fontName='Helvetica-Bold'),
+        'h3': ParagraphStyle('SubsectionHeading', parent=base['Heading3'], fontSize=13,
+                             textColor=colors.HexColor('#444444'), spaceAfter=8, spaceBefore=12,
+                             fontName='Helvetica-Bold'),
+        'body': ParagraphStyle('BodyText', parent=base['BodyText'], fontSize=10, textColor=text,
+                               spaceAfter=8, spaceBefore=0, alignment=TA_JUSTIFY, fontName='Helvetica', leading=14),
+        'bullet': ParagraphStyle('BulletPoint', parent=base['BodyText'], fontSize=10, textColor=text,
+                                 spaceAfter=6, leftIndent=20, fontName='Helvetica', leading=13),
+        'source': ParagraphStyle('SourceLink', parent=base['BodyText'], fontSize=9, textColor=text,
+                                 spaceAfter=6, leftIndent=20, fontName='Helvetica', leading=12),
+        'cell': ParagraphStyle('TableCell', parent=base['BodyText'], fontSize=9, textColor=text,
+                               fontName='Helvetica', leading=12),
+        'header_cell': ParagraphStyle('TableHeader', parent=base['BodyText'], fontSize=11,
+                                      textColor=colors.whitesmoke, alignment=TA_CENTER,
+                                      fontName='Helvetica-Bold', leading=13),
+    }
+    table_style = TableStyle([
+        # Header row styling
+        ('BACKGROUND', (0, 0), (-1, 0), accent),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+
+        # Body rows styling
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 1), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+
+        # Grid
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
+        ('LINEBELOW', (0, 0), (-1, 0), 2, accent),
+
+        # Alternating row colors
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
+    ])
+    return PDFTheme(margins=(60, 60, 60, 40), styles=styles, table_style=table_style,
+                    table_width=6.5 * inch, first_column_width=1.3 * inch,
+                    title_from_heading=True, bold_first_column=False)
+
+
+def _streamlit_theme(accent_hex: str) -> PDFTheme:
+    """Navy theme of the Streamlit apps; only the subsection accent differs between them."""
+    base = _BASE_STYLES
+    navy = colors.HexColor('#1a2451')
+    accent = colors.HexColor(accent_hex)
+    body = ParagraphStyle('CustomBody', parent=base['BodyText'], fontSize=10,
+                          textColor=colors.HexColor('#2d3748'), spaceAfter=10, alignment=TA_LEFT, leading=14)
+    bullet = ParagraphStyle('CustomBullet', parent=base['BodyText'], fontSize=10,
+                            textColor=colors.HexColor('#374151'), spaceAfter=6, leftIndent=30,
+                            bulletIndent=15, leading=14)
+    styles = {
+        'title': ParagraphStyle('CustomTitle', parent=base['Heading1'], fontSize=26,
+                                textColor=colors.HexColor('#1a1a1a'), spaceAfter=10, alignment=TA_CENTER,
+                                fontName='Helvetica-Bold'),
+        'subtitle': ParagraphStyle('Subtitle', parent=base['Normal'], fontSize=10,
+                                   textColor=colors.HexColor('#666666'), spaceAfter=30 + 0.2 * inch,
+                                   alignment=TA_CENTER, fontName='Helvetica'),
+        'h1': ParagraphStyle('CustomHeading1', parent=base['Heading1'], fontSize=18, textColor=navy,
+                             spaceAfter=12, spaceBefore=20 + 0.15 * inch, fontName='Helvetica-Bold'),
+        'h2': ParagraphStyle('CustomHeading2', parent=base['Heading2'], fontSize=14, textColor=accent,
+                             spaceAfter=10, spaceBefore=15, fontName='Helvetica-Bold'),
+        'h3': ParagraphStyle('CustomHeading3', parent=base['Heading3'], fontSize=12, textColor=accent,
+                             spaceAfter=8, spaceBefore=12, fontName='Helvetica-Bold'),
+        'body': body,
+        'bullet': bullet,
+        'source': ParagraphStyle('SourceLink', parent=base['BodyText'], fontSize=9, textColor=accent,
+                                 spaceAfter=8, leftIndent=20, leading=12),
+        'cell': ParagraphStyle('CustomCell', parent=body, spaceAfter=0),
+        'header_cell': ParagraphStyle('CustomHeaderCell', parent=body, fontSize=11, spaceAfter=0,
+                                      textColor=colors.whitesmoke, fontName='Helvetica-Bold'),
+    }
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), navy),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cbd5e0')),
+        ('TOPPADDING', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
+        ('LEFTPADDING', (0, 0), (-1, -1), 10),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+    ])
+    margin = 0.75 * inch
+    return PDFTheme(margins=(margin, margin, margin, margin), styles=styles, table_style=table_style,
+                    table_width=6.5 * inch, first_column_width=1.5 * inch,
+                    title_from_heading=False, bold_first_column=True)
+
+
+# Built once at import: stylesheets and table styles are shared by every render
+THEMES = {
+    "report": _report_theme(),
+    "streamlit": _streamlit_theme('#4C72FF'),
+    "chat": _streamlit_theme('#10a37f'),
+}
+
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+_ACCOUNT_PLAN_PREFIX = re.compile(r"^Account Plan:\s*", re.IGNORECASE)
+
+_BLANK_SPACE = 0.12 * inch
+_BLOCK_SPACE = 0.2 * inch
+
+
+def _table(rows: List[List[str]], theme: PDFTheme) -> Table:
+    styles = theme.styles
+    columns = max(len(row) for row in rows)
+
+    data = []
+    for row_idx, row in enumerate(rows):
+        cells = []
+        for col_idx in range(columns):
+            text = format_inline(row[col_idx]) if col_idx < len(row) else ""
+            if row_idx == 0:
+                cells.append(Paragraph(text, styles['header_cell']))
+            elif col_idx == 0 and theme.bold_first_column:
+                cells.append(Paragraph(f"<b>{text}</b>", styles['cell']))
+            else:
+                cells.append(Paragraph(text, styles['cell']))
+        data.append(cells)
+
+    if columns == 2:
+        widths = [theme.first_column_width, theme.table_width - theme.first_column_width]
+    else:
+        widths = [theme.table_width / columns] * columns
+
+    table = Table(data, colWidths=widths, hAlign='LEFT', repeatRows=1)
+    table.setStyle(theme.table_style)
+    return table
+
+
+def build_story(blocks: List[Block], company_name: str, theme: PDFTheme) -> list:
+    """
+    Turn parsed blocks into ReportLab flowables.
+
+    Args:
+        blocks: Output of parse_markdown
+        company_name: Shown in the header of themes without title_from_heading
+        theme: Styles to render with
+
+    Returns:
+        Flowables for SimpleDocTemplate.build
+    """
+    styles = theme.styles
+    story = []
+    first = next((idx for idx, block in enumerate(blocks) if block.kind != "blank"), None)
+
+    if not theme.title_from_heading:
+        story.append(Paragraph("Account Plan Report", styles['title']))
+        story.append(Paragraph(
+            f"{_escape(company_name)} | Generated on {datetime.now().strftime('%B %d, %Y')}",
+            styles['subtitle']
+        ))
+
+    for idx, block in enumerate(blocks):
+        kind = block.kind
+
+        if kind == "blank":
+            story.append(Spacer(1, _BLANK_SPACE))
+        elif kind == "heading":
+            if theme.title_from_heading and idx == first and block.level == 1:
+                title = _ACCOUNT_PLAN_PREFIX.sub("", block.text)
+                story.append(Paragraph(format_inline(title), styles['title']))
+                story.append(Paragraph("Account Plan &amp; Strategic Analysis", styles['subtitle']))
+            else:
+                style = styles['h1'] if block.level == 1 else styles['h2'] if block.level == 2 else styles['h3']
+                story.append(Paragraph(format_inline(block.text), style))
+        elif kind == "paragraph":
+            story.append(Paragraph(format_inline(block.text), styles['body']))
+        elif kind == "bullet":
+            story.append(Paragraph(f"• {format_inline(block.text)}", styles['bullet']))
+        elif kind == "numbered":
+            # Research Sources entries are a bare link: show the title with the URL under it
+            link = _SOURCE_LINK.match(block.text)
+            if link:
+                story.append(Paragraph(
+                    f'<b>{block.level}. {_escape(link.group(1))}</b><br/>'
+                    f'<font size="8" color="#666666">{_escape(link.group(2))}</font>',
+                    styles['source']
+                ))
+            else:
+                story.append(Paragraph(f"{block.level}. {format_inline(block.text)}", styles['bullet']))
+        elif kind == "table":
+            if len(block.rows) > 1:
+                story.append(_table(block.rows, theme))
+                story.append(Spacer(1, _BLOCK_SPACE))
+        elif kind == "rule":
+            story.append(Spacer(1, _BLOCK_SPACE))
+
+    return story
+
+
+def render_pdf(markdown: str, company_name: str, theme: str = "report") -> bytes:
+    """
+    Render an account plan to PDF.
+
+    Args:
+        markdown: Report markdown
+        company_name: Company name for the PDF metadata and header
+        theme: Key of THEMES ("report", "streamlit" or "chat")
+
+    Returns:
+        PDF bytes
+    """
+    selected = THEMES[theme]
+    left, right, top, bottom = selected.margins
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        leftMargin=left,
+        rightMargin=right,
+        topMargin=top,
+        bottomMargin=bottom,
+        title=f"{company_name} Account Plan"
+    )
+    doc.build(build_story(parse_markdown(markdown), company_name, selected))
+    return buffer.getvalue()
+
+
+# ============================================================================
+# BUNDLES
+# ============================================================================
+
+_TOC_TITLE_STYLE = ParagraphStyle('BundleTitle', parent=_BASE_STYLES['Heading1'], fontSize=22,
+                                  spaceAfter=18, alignment=TA_CENTER, fontName='Helvetica-Bold')
+_TOC_ENTRY_STYLE = ParagraphStyle('BundleEntry', parent=_BASE_STYLES['Normal'], fontSize=11,
+                                  leading=16, fontName='Helvetica')
+
+
+class _BundleDocTemplate(SimpleDocTemplate):
+    """Records where each report starts for the table of contents and PDF outline."""
+
+    def afterFlowable(self, flowable):
+        entry = getattr(flowable, '_bundle_entry', None)
+        if entry is None:
+            return
+        title, key = entry
+        self.canv.bookmarkPage(key)
+        self.canv.addOutlineEntry(title, key, level=0)
+        self.notify('TOCEntry', (0, _escape(title), self.page, key))
+
+
+def render_bundle_pdf(reports: List[dict], theme: str = "report", title: str = "Account Plans") -> bytes:
+    """
+    Render several account plans into one PDF with a table of contents.
+
+    Each report starts on a new page and gets a bookmark in the PDF outline.
+    Page numbers need a second layout pass, so this takes about twice as long
+    as rendering the reports one by one.
+
+    Args:
+        reports: Dicts with company_name and content (markdown)
+        theme: Key of THEMES
+        title: Heading of the table of contents page
+
+    Returns:
+        PDF bytes
+    """
+    selected = THEMES[theme]
+    left, right, top, bottom = selected.margins
+
+    toc = TableOfContents()
+    toc.levelStyles = [_TOC_ENTRY_STYLE]
+    story = [Paragraph(_escape(title), _TOC_TITLE_STYLE), toc]
+
+    for idx, report in enumerate(reports):
+        company_name = report.get('company_name') or f"Report {idx + 1}"
+        marker = Spacer(1, 0)
+        marker._bundle_entry = (company_name, f"report-{idx}")
+        story.append(PageBreak())
+        story.append(marker)
+        story.extend(build_story(parse_markdown(report.get('content', '')), company_name, selected))
+
+    buffer = BytesIO()
+    doc = _BundleDocTemplate(
+        buffer,
+        pagesize=letter,
+        leftMargin=left,
+        rightMargin=right,
+        topMargin=top,
+        bottomMargin=bottom,
+        title=title
+    )
+    doc.multiBuild(story)
+    return buffer.getvalue()
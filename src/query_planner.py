@@ -0,0 +1,157 @@
+import os
+import re
+from typing import Dict, List, NamedTuple
+
+from src.fact_check import extract_facts
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Plan searches adaptively; when off, every run makes the four base searches at advanced depth
+QUERY_PLANNER_ENABLED = os.getenv("QUERY_PLANNER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Results per basic-depth search (Tavily bills per request, not per result)
+PLANNER_BASIC_MAX_RESULTS = int(os.getenv("PLANNER_BASIC_MAX_RESULTS", "5"))
+
+# Results per advanced-depth search, made only for fields the basic searches missed
+PLANNER_ADVANCED_MAX_RESULTS = int(os.getenv("PLANNER_ADVANCED_MAX_RESULTS", "3"))
+
+# Findings describing a news event needed before recent news counts as covered
+PLANNER_MIN_NEWS = int(os.getenv("PLANNER_MIN_NEWS", "2"))
+
+# Tavily API credits per search at each depth
+SEARCH_CREDITS = {"basic": 1, "advanced": 2}
+
+
+# ============================================================================
+# QUERY TEMPLATES
+# ============================================================================
+
+class PlannedSearch(NamedTuple):
+    """One Tavily search of a research plan."""
+    query: str
+    depth: str
+    max_results: int
+
+
+# Always searched: together they feed every section of the account plan
+BASE_QUERIES = (
+    "{company} company overview and business model",
+    "{company} recent news and developments",
+    "{company} products and services",
+    "{company} market position and competitors",
+)
+
+# Fields the account plan requires, with their labels and the follow-up search for a gap
+REQUIRED_FIELDS = {
+    "revenue": ("annual revenue", "{company} annual revenue and financial results overview"),
+    "ceo": ("CEO", "{company} CEO and leadership team overview"),
+    "news": ("recent news", "{company} latest news and announcements"),
+    "competitors": ("competitors", "{company} main competitors and market share"),
+}
+
+_NEWS_PATTERN = re.compile(
+    r"\b(?:announc|launch|acquir|acquisition|agree|unveil|partner|appoint|named|layoff|cut|restructur|"
+    r"expan|invest|deal|merger|lawsuit|settle|reported|quarter|earnings|guidance)",
+    re.IGNORECASE
+)
+
+_COMPETITOR_PATTERN = re.compile(
+    r"\b(?:competitor|competing|competes|competition|rival|market share|versus|vs\.|peers|alternatives? to)",
+    re.IGNORECASE
+)
+
+
+# ============================================================================
+# PLANNING
+# ============================================================================
+
+def initial_plan(company_name: str) -> List[PlannedSearch]:
+    """
+    First round of searches for a company.
+
+    Args:
+        company_name: Company to research
+
+    Returns:
+        The base searches, at basic depth when the planner is enabled
+    """
+    if QUERY_PLANNER_ENABLED:
+        depth, max_results = "basic", PLANNER_BASIC_MAX_RESULTS
+    else:
+        depth, max_results = "advanced", PLANNER_ADVANCED_MAX_RESULTS
+    return [PlannedSearch(template.format(company=company_name), depth, max_results) for template in BASE_QUERIES]
+
+
+def _mentions(text: str, company_name: str) -> bool:
+    # Results about a different company with a similar name do not count
+    words = [word for word in re.findall(r"\w+", company_name.lower()) if len(word) > 2]
+    lowered = text.lower()
+    return not words or any(word in lowered for word in words)
+
+
+def measure_coverage(findings: List[dict], company_name: str) -> Dict[str, bool]:
+    """
+    Check which required account plan fields the findings cover.
+
+    Revenue and CEO need an extracted figure or name (see fact_check);
+    recent news needs PLANNER_MIN_NEWS distinct findings of a news search
+    that describe an event, and competitors one finding about the competitive
+    landscape. Only findings that mention the company count.
+
+    Args:
+        findings: research_data entries with title, url and content
+        company_name: Company being researched
+
+    Returns:
+        Dict of field name (see REQUIRED_FIELDS) to whether it is covered
+    """
+    metrics = set()
+    news = set()
+    competitors = False
+
+    for item in findings:
+        text = f"{item.get('title', '')}. {item.get('content', '')}"
+        if not _mentions(text, company_name):
+            continue
+        metrics.update(fact["metric"] for fact in extract_facts(text, item.get("url", "")))
+        # Company profiles mention events too; only news searches count
+        query = item.get("query", "")[len(company_name):].lower()
+        if "news" in query and _NEWS_PATTERN.search(text):
+            news.add(item.get("url") or text)
+        if _COMPETITOR_PATTERN.search(text):
+            competitors = True
+
+    return {
+        "revenue": "revenue" in metrics,
+        "ceo": "ceo" in metrics,
+        "news": len(news) >= PLANNER_MIN_NEWS,
+        "competitors": competitors,
+    }
+
+
+def gap_plan(company_name: str, coverage: Dict[str, bool]) -> List[PlannedSearch]:
+    """
+    Advanced-depth follow-up searches for the fields still missing.
+
+    Args:
+        company_name: Company to research
+        coverage: measure_coverage result
+
+    Returns:
+        One search per uncovered field; empty when coverage is met or the
+        planner is disabled
+    """
+    if not QUERY_PLANNER_ENABLED:
+        return []
+    return [
+        PlannedSearch(REQUIRED_FIELDS[field][1].format(company=company_name), "advanced", PLANNER_ADVANCED_MAX_RESULTS)
+        for field, covered in coverage.items() if not covered
+    ]
+
+
+def format_coverage(coverage: Dict[str, bool]) -> str:
+    """One-line summary such as "annual revenue ✓, CEO ✓, recent news ✗, competitors ✓"."""
+    return ", ".join(f"{REQUIRED_FIELDS[field][0]} {'✓' if covered else '✗'}" for field, covered in coverage.items())
@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+REPORT_CACHE_ENABLED = os.getenv("REPORT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Location of the SQLite database holding finished account plans
+REPORT_CACHE_PATH = os.getenv("REPORT_CACHE_PATH", os.path.join(".cache", "report_cache.sqlite3"))
+
+# Seconds a cached account plan is served without re-running research (default: 24 hours)
+REPORT_CACHE_MAX_AGE = int(os.getenv("REPORT_CACHE_MAX_AGE", str(24 * 60 * 60)))
+
+
+# ============================================================================
+# REPORT CACHE
+# ============================================================================
+
+def company_key(company_name: str) -> str:
+    """Normalize a canonical company name into a cache key."""
+    return " ".join(company_name.lower().split())
+
+
+class ReportCache:
+    """
+    On-disk store of finished account plans keyed by canonical company name.
+
+    Each entry keeps the final markdown, the research_data it was written
+    from, and when it was generated. Entries older than max_age are reported
+    as stale but kept, so later runs can diff against them. Safe to share
+    between threads.
+    """
+
+    def __init__(self, path: str = REPORT_CACHE_PATH, max_age: int = REPORT_CACHE_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS reports (
+                    company_key TEXT PRIMARY KEY,
+                    company_name TEXT NOT NULL,
+                    report TEXT NOT NULL,
+                    research_data TEXT NOT NULL,
+                    generated_at REAL NOT NULL,
+                    last_served_at REAL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # sqlite3's own context manager commits or rolls back but never closes
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, company_name: str, max_age: Optional[int] = None) -> Optional[dict]:
+        """
+        Return the cached entry for a company if it is fresh enough.
+
+        Args:
+            company_name: Canonical company name
+            max_age: Freshness window in seconds (defaults to the cache's max_age);
+                pass -1 to accept entries of any age
+
+        Returns:
+            Dict with company_name, report, research_data, generated_at and
+            age_seconds, or None
+        """
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT company_name, report, research_data, generated_at FROM reports WHERE company_key = ?",
+                (company_key(company_name),)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            name, report, research_data, generated_at = row
+            if max_age >= 0 and now - generated_at > max_age:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+            conn.execute(
+                "UPDATE reports SET last_served_at = ? WHERE company_key = ?",
+                (now, company_key(company_name))
+            )
+
+        return {
+            "company_name": name,
+            "report": report,
+            "research_data": json.loads(research_data),
+            "generated_at": generated_at,
+            "age_seconds": round(now - generated_at, 1)
+        }
+
+    def put(self, company_name: str, report: str, research_data: List[dict]) -> None:
+        """Store (or replace) the account plan for a company."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reports "
+                "(company_key, company_name, report, research_data, generated_at, last_served_at) "
+                "VALUES (?, ?, ?, ?, ?, NULL)",
+                (company_key(company_name), company_name, report, json.dumps(research_data), time.time())
+            )
+
+
+def is_cacheable_report(report: str, research_data: List[dict]) -> bool:
+    """
+    Only cache real account plans: writer errors and "insufficient data"
+    placeholders never get the Research Sources section appended.
+    """
+    return bool(report and research_data and "## 📚 Research Sources" in report)
+
+
+_report_cache = None
+_report_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> Optional[ReportCache]:
+    """
+    Return the process-wide report cache, or None when caching is disabled.
+    """
+    global _report_cache
+
+    if not REPORT_CACHE_ENABLED:
+        return None
+
+    with _report_cache_lock:
+        if _report_cache is None:
+            _report_cache = ReportCache()
+        return _report_cache
@@ -0,0 +1,287 @@
+import difflib
+import re
+from typing import List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.graph import SOURCES_SECTION_KEY, get_llm, strip_code_fences
+from src.instrumentation import invoke_llm
+from src.report_sections import Section, join_sections, section_diff, section_key, split_sections
+
+
+# ============================================================================
+# TARGETING
+# ============================================================================
+
+class UnknownSectionError(Exception):
+    """Raised when the sections requested for an edit are not in the report."""
+
+
+# Instruction words that point at each mandatory section (matched against section_key)
+SECTION_KEYWORDS = {
+    "executive summary": ("executive summary",),
+    "key financial": ("financial", "revenue", "ceo", "decision maker", "recent news", "news",
+                      "pain point", "strategic direction"),
+    "swot": ("swot", "strength", "weakness", "opportunity", "opportunities", "threat"),
+    "conversation starters": ("conversation", "starter", "talking point", "opener"),
+    "research sources": ("research sources", "source", "citation", "reference"),
+}
+
+# Generic words, only used when no heading or specific keyword matches
+GENERIC_SECTION_KEYWORDS = {
+    "executive summary": ("summary", "overview", "intro", "introduction"),
+    "key financial": ("key insight", "insight"),
+    "conversation starters": ("question",),
+}
+
+
+def _mentions(text: str, phrase: str) -> bool:
+    # Whole words only, so "intro" does not match "introduce"; plurals allowed
+    return re.search(r"\b" + re.escape(phrase) + r"(?:s|es)?\b", text) is not None
+
+
+_WHOLE_REPORT = re.compile(
+    r"\b(whole report|entire report|full report|all sections|every section|each section|"
+    r"throughout|everywhere|overall tone|the report overall)\b",
+    re.IGNORECASE
+)
+_NEW_SECTION = re.compile(r"\b(add|create|include|insert|append|write)\b.*\bsections?\b", re.IGNORECASE)
+
+
+def find_target_sections(instructions: str, sections: List[Section]) -> Optional[List[int]]:
+    """
+    Work out which sections an edit instruction is about.
+
+    Sections are matched by their heading or by keywords of the mandatory
+    sections (e.g. "threats" targets the SWOT table), as whole words.
+    Generic words such as "summary" only count when nothing else matches.
+
+    Args:
+        instructions: The user's editing instructions
+        sections: Sections of the report
+
+    Returns:
+        Indices of the targeted sections, an empty list when the instruction
+        only asks for a new section, or None when it is about the whole report
+        or cannot be pinned down
+    """
+    if _WHOLE_REPORT.search(instructions):
+        return None
+
+    lowered = " ".join(instructions.lower().split())
+    instruction_key = section_key(instructions)
+    keys = [section_key(section.title) for section in sections]
+
+    def matching(keywords: dict) -> List[int]:
+        return [
+            idx for idx, key in enumerate(keys)
+            if any(name in key and any(_mentions(lowered, keyword) for keyword in words)
+                   for name, words in keywords.items())
+        ]
+
+    # Headings and specific keywords first; generic words like "summary" only as a fallback
+    targets = sorted(
+        {idx for idx, key in enumerate(keys) if key and _mentions(instruction_key, key)} | set(matching(SECTION_KEYWORDS))
+    )
+    if not targets:
+        targets = matching(GENERIC_SECTION_KEYWORDS)
+
+    if targets:
+        return targets
+    if _NEW_SECTION.search(instructions):
+        return []
+    return None
+
+
+# ============================================================================
+# EDITING
+# ============================================================================
+
+FULL_EDIT_SYSTEM_PROMPT = """You are an expert Sales Strategist updating an account plan based on user feedback.
+
+Your task:
+1. Read the current account plan carefully
+2. Apply the user's editing instructions to improve the report
+3. Return the COMPLETE updated report in markdown format
+4. Maintain the same structure and section headers
+5. Keep the professional style and formatting
+6. Only modify the parts requested by the user, keep everything else intact
+
+IMPORTANT: Return the FULL report with all sections, not just the changed parts."""
+
+SECTION_EDIT_SYSTEM_PROMPT = """You are an expert Sales Strategist rewriting sections of an account plan based on user feedback.
+
+You receive only the sections the user's instructions are about, plus the headings of the rest of the report for context.
+
+Your task:
+1. Apply the user's editing instructions to the given sections
+2. Return ONLY those sections in markdown, each starting with its unchanged "## " heading
+3. If the instructions ask for a new section, return it as an extra "## " section after the others
+4. Keep the professional style and formatting (tables stay tables, bullets stay bullets)
+5. Do not repeat or summarize any other part of the report"""
+
+
+def _edit_full_report(full_report: str, instructions: str) -> str:
+    user_prompt = f"""Current Account Plan:
+
+{full_report}
+
+---
+
+User's editing instructions:
+{instructions}
+
+Please update the account plan following these instructions and return the complete updated report."""
+
+    response = invoke_llm(get_llm(), [
+        SystemMessage(content=FULL_EDIT_SYSTEM_PROMPT),
+        HumanMessage(content=user_prompt)
+    ])
+    return strip_code_fences(response.content.strip())
+
+
+def _edit_sections(company_name: str, sections: List[Section], targets: List[int],
+                   instructions: str) -> Optional[List[Section]]:
+    """
+    Regenerate the targeted sections (or write new ones) and splice them back in.
+
+    Returned sections are matched to the targets by heading, then by position
+    or the closest heading when Gemini reworded it.
+
+    Returns None if Gemini's answer cannot be mapped back onto sections.
+    """
+    headings = "\n".join(f"- {section.title}" for section in sections)
+    if targets:
+        current = "\n\n".join(sections[idx].markdown for idx in targets)
+    else:
+        current = "(none: the instructions ask for a new section)"
+
+    user_prompt = f"""Account plan for {company_name}. Report sections:
+{headings}
+
+Sections to update:
+
+{current}
+
+---
+
+User's editing instructions:
+{instructions}
+
+Return only the updated sections."""
+
+    response = invoke_llm(get_llm(), [
+        SystemMessage(content=SECTION_EDIT_SYSTEM_PROMPT),
+        HumanMessage(content=user_prompt)
+    ])
+    text = strip_code_fences(response.content.strip())
+
+    _, returned = split_sections(text)
+    if not returned:
+        if len(targets) != 1:
+            return None
+        # A single section may come back without its heading
+        original = sections[targets[0]]
+        returned = [Section(original.title, f"## {original.title}\n\n{text}")]
+
+    by_key = {section_key(sections[idx].title): idx for idx in targets}
+    matched = {}
+    leftover = []
+    for section in returned:
+        idx = by_key.get(section_key(section.title))
+        if idx is not None and idx not in matched:
+            matched[idx] = section
+        else:
+            leftover.append(section)
+
+    # Headings often come back reworded ("SWOT Analysis (Updated)"): pair the rest
+    # by position when the counts line up, otherwise by the closest heading
+    missing = [idx for idx in targets if idx not in matched]
+    if missing and len(returned) == len(targets):
+        pairs = list(zip(missing, leftover))
+    else:
+        pairs = []
+        candidates = {section_key(sections[idx].title): idx for idx in missing}
+        for section in leftover:
+            close = difflib.get_close_matches(section_key(section.title), list(candidates), n=1, cutoff=0.6)
+            if close:
+                pairs.append((candidates.pop(close[0]), section))
+    for idx, section in pairs:
+        # Keep the original heading so the report structure stays stable
+        body = section.markdown.split("\n", 1)[1] if "\n" in section.markdown else ""
+        matched[idx] = Section(sections[idx].title, f"## {sections[idx].title}\n{body}")
+        leftover.remove(section)
+
+    # Anything else is a new section, which only makes sense if one was asked for
+    if leftover and not _NEW_SECTION.search(instructions):
+        return None
+
+    updated = list(sections)
+    for idx, section in matched.items():
+        updated[idx] = section
+
+    if leftover:
+        # New sections go after the last edited one, or before the sources
+        if targets:
+            insert_at = max(targets) + 1
+        else:
+            keys = [section_key(section.title) for section in updated]
+            insert_at = next((idx for idx, key in enumerate(keys) if SOURCES_SECTION_KEY in key), len(updated))
+        updated[insert_at:insert_at] = leftover
+
+    return updated
+
+
+def edit_report(full_report: str, instructions: str, company_name: str = "the company",
+                section_titles: Optional[List[str]] = None) -> dict:
+    """
+    Apply editing instructions to an account plan.
+
+    Only the sections the instructions are about are sent to Gemini and
+    regenerated; the rest of the report is kept as is. Instructions about the
+    whole report, or that match no section, fall back to regenerating the
+    full report.
+
+    Args:
+        full_report: Current account plan markdown
+        instructions: The user's editing instructions
+        company_name: Company the report is about
+        section_titles: Headings to edit, overriding the automatic targeting
+
+    Returns:
+        Dict with updated_report, mode ("sections" or "full"), edited_sections
+        (headings sent to Gemini) and diff (see section_diff)
+
+    Raises:
+        UnknownSectionError: If section_titles names no section of the report
+    """
+    preamble, sections = split_sections(full_report)
+
+    if section_titles:
+        wanted = {section_key(title) for title in section_titles}
+        targets = [idx for idx, section in enumerate(sections) if section_key(section.title) in wanted]
+        if not targets:
+            raise UnknownSectionError(f"No section matches {section_titles}")
+    else:
+        targets = find_target_sections(instructions, sections) if sections else None
+
+    updated_sections = None
+    if targets is not None:
+        updated_sections = _edit_sections(company_name, sections, targets, instructions)
+
+    if updated_sections is None:
+        updated_report = _edit_full_report(full_report, instructions)
+        _, updated_sections = split_sections(updated_report)
+        mode = "full"
+        edited = [section.title for section in sections]
+    else:
+        updated_report = join_sections(preamble, updated_sections)
+        mode = "sections"
+        edited = [sections[idx].title for idx in targets]
+
+    return {
+        "updated_report": updated_report,
+        "mode": mode,
+        "edited_sections": edited,
+        "diff": section_diff(sections, updated_sections)
+    }
@@ -0,0 +1,94 @@
+import difflib
+import re
+from typing import List, NamedTuple, Tuple
+
+
+# ============================================================================
+# SECTIONS
+# ============================================================================
+
+class Section(NamedTuple):
+    """
+    One "## " section of an account plan.
+
+    Attributes:
+        title: Heading text without the leading "## "
+        markdown: The whole section, heading line included
+    """
+    title: str
+    markdown: str
+
+
+_SECTION_HEADING = re.compile(r"^##[ \t]+(.+?)[ \t]*$", re.MULTILINE)
+
+
+def split_sections(report: str) -> Tuple[str, List[Section]]:
+    """
+    Split a report into the text before its first "## " heading and its sections.
+
+    Args:
+        report: Account plan markdown
+
+    Returns:
+        (preamble, sections in order)
+    """
+    matches = list(_SECTION_HEADING.finditer(report))
+    if not matches:
+        return report.strip(), []
+
+    preamble = report[:matches[0].start()].strip()
+    sections = []
+    for idx, match in enumerate(matches):
+        end = matches[idx + 1].start() if idx + 1 < len(matches) else len(report)
+        sections.append(Section(match.group(1).strip(), report[match.start():end].strip()))
+    return preamble, sections
+
+
+def join_sections(preamble: str, sections: List[Section]) -> str:
+    """Reassemble a report from split_sections output."""
+    parts = [preamble] if preamble else []
+    parts.extend(section.markdown for section in sections)
+    return "\n\n".join(parts) + "\n"
+
+
+def section_key(title: str) -> str:
+    """Normalize a heading for matching: lower-case words only, no emoji or punctuation."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", title.lower()).split())
+
+
+def section_diff(before: List[Section], after: List[Section]) -> List[dict]:
+    """
+    Compare two versions of a report section by section.
+
+    Args:
+        before: Sections of the original report
+        after: Sections of the edited report
+
+    Returns:
+        One dict per changed section with section, change ("modified",
+        "added" or "removed") and a unified diff of its lines
+    """
+    old = {section_key(section.title): section for section in before}
+    new = {section_key(section.title): section for section in after}
+    diff = []
+
+    def unified(a: str, b: str, title: str) -> str:
+        return "\n".join(difflib.unified_diff(
+            a.splitlines(), b.splitlines(), fromfile=f"before/{title}", tofile=f"after/{title}", lineterm=""
+        ))
+
+    for section in after:
+        key = section_key(section.title)
+        if key not in old:
+            diff.append({"section": section.title, "change": "added",
+                         "unified_diff": unified("", section.markdown, section.title)})
+        elif old[key].markdown != section.markdown:
+            diff.append({"section": section.title, "change": "modified",
+                         "unified_diff": unified(old[key].markdown, section.markdown, section.title)})
+
+    for section in before:
+        if section_key(section.title) not in new:
+            diff.append({"section": section.title, "change": "removed",
+                         "unified_diff": unified(section.markdown, "", section.title)})
+
+    return diff
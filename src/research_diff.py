@@ -0,0 +1,179 @@
+import hashlib
+import os
+from typing import List, Optional
+
+from src.dedup import canonical_url
+from src.report_cache import get_report_cache
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Regenerate the whole account plan instead of single sections once this share
+# of the findings is new, changed or gone (default: 0.6)
+REFRESH_FULL_REWRITE_RATIO = float(os.getenv("REFRESH_FULL_REWRITE_RATIO", "0.6"))
+
+# Report sections (matched against section_key) built mainly from each research topic
+TOPIC_SECTIONS = {
+    "overview": ("executive summary", "key financial"),
+    "news": ("key financial", "conversation starters"),
+    "products": ("swot",),
+    "market": ("swot",),
+}
+
+# Words in a Tavily query that identify its topic, checked in order
+_TOPIC_WORDS = (
+    ("news", ("news", "developments")),
+    ("products", ("products", "services")),
+    ("market", ("market", "competitor")),
+    ("overview", ("overview", "business model")),
+)
+
+
+# ============================================================================
+# FINGERPRINTS
+# ============================================================================
+
+def content_hash(text: str) -> str:
+    """Hex SHA-256 of a finding's content with whitespace and case normalized."""
+    return hashlib.sha256(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+def query_topic(query: str, company_name: str = "") -> Optional[str]:
+    """Research topic of a query ("overview", "news", "products" or "market"), or None."""
+    lowered = query.lower()
+    # Queries start with the company name, which may itself contain "news" etc.
+    if company_name and lowered.startswith(company_name.lower()):
+        lowered = lowered[len(company_name):]
+    for topic, words in _TOPIC_WORDS:
+        if any(word in lowered for word in words):
+            return topic
+    return None
+
+
+def finding_topics(item: dict, company_name: str = "") -> set:
+    """
+    Topics a finding supports: its own query plus the queries of duplicates
+    merged into it. None stands for a finding of unknown topic (e.g. human input).
+    """
+    queries = [item.get("query", "")] + [merged.get("query", "") for merged in item.get("merged", [])]
+    return {query_topic(query, company_name) for query in queries}
+
+
+def _index(findings: List[dict]) -> dict:
+    # Findings without a URL are keyed by their content instead
+    index = {}
+    for item in findings:
+        url = item.get("url", "")
+        key = canonical_url(url) if url and url != "human-input" else f"content:{content_hash(item.get('content', ''))}"
+        index[key] = item
+    return index
+
+
+# ============================================================================
+# DIFF
+# ============================================================================
+
+def diff_research(previous: List[dict], current: List[dict], company_name: str = "") -> dict:
+    """
+    Compare the research behind a stored account plan with a new run.
+
+    Findings are matched by canonical URL and compared by content hash.
+
+    Args:
+        previous: research_data the stored account plan was written from
+        current: research_data of the new run
+        company_name: Company the research is about
+
+    Returns:
+        Dict with added, changed and removed (lists of {title, url, query}),
+        unchanged (count), topics (sorted research topics touched by the
+        changes, with "other" for findings of unknown topic) and sections
+        (section keys to regenerate, see TOPIC_SECTIONS)
+    """
+    old = _index(previous)
+    new = _index(current)
+
+    def summary(item: dict) -> dict:
+        return {"title": item.get("title", ""), "url": item.get("url", ""), "query": item.get("query", "")}
+
+    added, changed, removed = [], [], []
+    unchanged = 0
+    topics = set()
+
+    for key, item in new.items():
+        if key not in old:
+            added.append(summary(item))
+        elif content_hash(old[key].get("content", "")) != content_hash(item.get("content", "")):
+            changed.append(summary(item))
+        else:
+            unchanged += 1
+            continue
+        topics |= finding_topics(item, company_name)
+
+    for key, item in old.items():
+        if key not in new:
+            removed.append(summary(item))
+            topics |= finding_topics(item, company_name)
+
+    sections = sorted({section for topic in topics if topic for section in TOPIC_SECTIONS[topic]})
+
+    return {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "unchanged": unchanged,
+        "topics": sorted(topic or "other" for topic in topics),
+        "sections": sections
+    }
+
+
+def has_changes(changes: dict) -> bool:
+    """True if a diff_research result found any new, changed or removed finding."""
+    return bool(changes["added"] or changes["changed"] or changes["removed"])
+
+
+def needs_full_rewrite(changes: dict) -> bool:
+    """
+    True when so much changed (or a finding of unknown topic changed) that
+    the account plan should be written from scratch.
+    """
+    if "other" in changes["topics"]:
+        return True
+    touched = len(changes["added"]) + len(changes["changed"]) + len(changes["removed"])
+    total = touched + changes["unchanged"]
+    return total > 0 and touched / total >= REFRESH_FULL_REWRITE_RATIO
+
+
+# ============================================================================
+# INCREMENTAL REFRESH
+# ============================================================================
+
+def incremental_state(company_name: str) -> dict:
+    """
+    State fields that make a research run refresh the stored account plan.
+
+    Stale entries are used too: they are exactly what a refresh diffs against.
+
+    Args:
+        company_name: Canonical company name
+
+    Returns:
+        Dict with previous_report and previous_research to merge into the
+        initial AgentState, or an empty dict when no plan is stored
+    """
+    cache = get_report_cache()
+    if cache is None:
+        return {}
+
+    try:
+        entry = cache.get(company_name, max_age=-1)
+    except Exception as e:
+        print(f"Report cache read failed: {e}")
+        return {}
+    if entry is None:
+        return {}
+
+    print(f"🔁 Refreshing the stored account plan for {company_name} ({entry['age_seconds']}s old)")
+    return {"previous_report": entry["report"], "previous_research": entry["research_data"]}
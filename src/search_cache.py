@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Location of the SQLite database holding cached Tavily responses
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join(".cache", "search_cache.sqlite3"))
+
+# Seconds a cached response stays valid (default: 24 hours)
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", str(24 * 60 * 60)))
+
+# Maximum number of cached responses before least-recently-used eviction
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000"))
+
+
+# ============================================================================
+# SEARCH CACHE
+# ============================================================================
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so trivially different spellings share a cache entry.
+
+    Args:
+        query: Raw search query
+
+    Returns:
+        Lower-cased query with collapsed whitespace
+    """
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    """
+    On-disk cache for Tavily search responses.
+
+    Entries are keyed by the normalized query plus search_depth and max_results,
+    expire after a TTL and are evicted least-recently-used once the cache grows
+    past max_entries. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH, ttl: int = SEARCH_CACHE_TTL,
+                 max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    search_depth TEXT NOT NULL,
+                    max_results INTEGER NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_search_cache_last_access ON search_cache (last_access)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # sqlite3's own context manager commits or rolls back but never closes
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(query: str, search_depth: str, max_results: int) -> str:
+        raw = f"{normalize_query(query)}|{search_depth}|{max_results}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, query: str, search_depth: str, max_results: int) -> Optional[dict]:
+        """
+        Look up a cached response.
+
+        Returns:
+            The cached Tavily response dict, or None on a miss or expired entry
+        """
+        key = self.make_key(query, search_depth, max_results)
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        return json.loads(response)
+
+    def put(self, query: str, search_depth: str, max_results: int, response: dict) -> None:
+        """Store a response and evict least-recently-used entries over the size bound."""
+        key = self.make_key(query, search_depth, max_results)
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache "
+                "(key, query, search_depth, max_results, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_query(query), search_depth, max_results,
+                 json.dumps(response), now, now)
+            )
+
+            (count,) = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM search_cache WHERE key IN "
+                    "(SELECT key FROM search_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """
+    Return the process-wide search cache, or None when caching is disabled.
+    """
+    global _search_cache
+
+    if not SEARCH_CACHE_ENABLED:
+        return None
+
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache()
+        return _search_cache
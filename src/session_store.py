@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from src.checkpoint_store import CHECKPOINT_THREAD_TTL
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Maximum number of live sessions held per process before the oldest is evicted
+SESSION_MAX_ACTIVE = int(os.getenv("SESSION_MAX_ACTIVE", "500"))
+
+# Seconds a session may sit idle before it is evicted (default: CHECKPOINT_THREAD_TTL, so a
+# paused conflict can be resolved for as long as its checkpoint is kept)
+SESSION_IDLE_TTL = int(os.getenv("SESSION_IDLE_TTL", str(CHECKPOINT_THREAD_TTL)))
+
+# Statuses of sessions whose graph is still executing; never evicted
+_ACTIVE_STATUSES = ("running", "resuming")
+
+
+# ============================================================================
+# SESSION REGISTRY
+# ============================================================================
+
+def estimate_state_bytes(state: Optional[dict]) -> int:
+    """
+    Approximate the memory footprint of an agent state.
+
+    Args:
+        state: Agent state dict
+
+    Returns:
+        Size in bytes of the JSON-serialized state
+    """
+    if not state:
+        return 0
+    return len(json.dumps(state, default=str).encode("utf-8"))
+
+
+class SessionRegistry:
+    """
+    Bounded registry of research sessions keyed by unique session ID.
+
+    Sessions are evicted after idle_ttl seconds without activity, and
+    least-recently-used once more than max_size are live. Both only take
+    sessions whose graph is not executing (e.g. paused at a conflict), so a
+    live run never loses its checkpoints. Eviction calls on_evict with
+    the session's config so its checkpoints can be released. Safe to share
+    between threads.
+    """
+
+    def __init__(self, max_size: int = SESSION_MAX_ACTIVE, idle_ttl: int = SESSION_IDLE_TTL,
+                 on_evict: Optional[Callable[[dict], None]] = None):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self.evictions = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, company_name: str, config: dict) -> None:
+        """Register a new session and evict any sessions over the bounds."""
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = {
+                "company_name": company_name,
+                "config": config,
+                "status": "running",
+                "created_at": now,
+                "last_access": now,
+                "footprint_bytes": 0
+            }
+            evicted = self._collect_evictions(now)
+        self._evict(evicted)
+
+    def update(self, session_id: str, status: Optional[str] = None, state: Optional[dict] = None) -> None:
+        """Mark a session as used and refresh its status and memory footprint."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            session["last_access"] = time.time()
+            if status is not None:
+                session["status"] = status
+            if state is not None:
+                session["footprint_bytes"] = estimate_state_bytes(state)
+            self._sessions.move_to_end(session_id)
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def pop(self, session_id: str, default=None):
+        with self._lock:
+            return self._sessions.pop(session_id, default)
+
+    def keys(self):
+        with self._lock:
+            return list(self._sessions.keys())
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def evict_idle(self) -> int:
+        """
+        Evict sessions idle for longer than idle_ttl.
+
+        Returns:
+            Number of sessions evicted
+        """
+        with self._lock:
+            evicted = self._collect_evictions(time.time())
+        self._evict(evicted)
+        return len(evicted)
+
+    def snapshot(self) -> dict:
+        """
+        Describe every live session and the total footprint.
+
+        Returns:
+            Dict with per-session details and aggregate counters
+        """
+        self.evict_idle()
+        now = time.time()
+        with self._lock:
+            sessions = [
+                {
+                    "session_id": session_id,
+                    "company_name": session["company_name"],
+                    "status": session["status"],
+                    "created_at": session["created_at"],
+                    "idle_seconds": round(now - session["last_access"], 1),
+                    "footprint_bytes": session["footprint_bytes"]
+                }
+                for session_id, session in self._sessions.items()
+            ]
+        return {
+            "count": len(sessions),
+            "max_size": self.max_size,
+            "idle_ttl": self.idle_ttl,
+            "evictions": self.evictions,
+            "total_footprint_bytes": sum(s["footprint_bytes"] for s in sessions),
+            "sessions": sessions
+        }
+
+    def _collect_evictions(self, now: float) -> list:
+        # Caller must hold the lock; oldest entries come first in the OrderedDict
+        evicted = []
+        for session_id, session in list(self._sessions.items()):
+            # A long run is not idle: its graph is still executing on these checkpoints
+            if now - session["last_access"] > self.idle_ttl and session["status"] not in _ACTIVE_STATUSES:
+                evicted.append(self._sessions.pop(session_id))
+        overflow = len(self._sessions) - self.max_size
+        if overflow > 0:
+            # Running sessions stay even if that leaves the registry over max_size
+            idle = [session_id for session_id, session in self._sessions.items()
+                    if session["status"] not in _ACTIVE_STATUSES]
+            for session_id in idle[:overflow]:
+                evicted.append(self._sessions.pop(session_id))
+        return evicted
+
+    def _evict(self, evicted: list) -> None:
+        self.evictions += len(evicted)
+        for session in evicted:
+            print(f"🧹 Evicting session for {session['company_name']}")
+            if self.on_evict is not None:
+                try:
+                    self.on_evict(session["config"])
+                except Exception as e:
+                    print(f"Session eviction callback failed: {e}")
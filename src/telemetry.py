@@ -0,0 +1,155 @@
+import threading
+from typing import Callable, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+# Research runs stream for tens of seconds, so buckets reach well past the defaults
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+HTTP_REQUESTS = Counter(
+    "stratify_http_requests_total",
+    "HTTP requests handled, by route, method and status code",
+    ["route", "method", "status"]
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "stratify_http_request_duration_seconds",
+    "Time from request start until the response (including streamed bodies) finished",
+    ["route", "method"],
+    buckets=_LATENCY_BUCKETS
+)
+
+GRAPH_NODE_DURATION = Histogram(
+    "stratify_graph_node_duration_seconds",
+    "Wall time of research graph node runs",
+    ["node"],
+    buckets=_LATENCY_BUCKETS
+)
+
+EXTERNAL_CALL_DURATION = Histogram(
+    "stratify_external_call_duration_seconds",
+    "Latency of Tavily and Gemini calls, including retries",
+    ["service"],
+    buckets=_LATENCY_BUCKETS
+)
+
+EXTERNAL_CALL_ERRORS = Counter(
+    "stratify_external_call_errors_total",
+    "Tavily and Gemini calls that failed after all retries",
+    ["service"]
+)
+
+EXTERNAL_CALL_RETRIES = Counter(
+    "stratify_external_call_retries_total",
+    "Tavily and Gemini call attempts repeated after a failure",
+    ["service"]
+)
+
+LLM_TOKENS = Counter(
+    "stratify_llm_tokens_total",
+    "Gemini tokens used, by direction (prompt or completion)",
+    ["direction"]
+)
+
+ACTIVE_SESSIONS = Gauge(
+    "stratify_active_sessions",
+    "Research sessions tracked by this process"
+)
+
+
+# ============================================================================
+# RECORDING
+# ============================================================================
+
+def observe_request(route: str, method: str, status: int, seconds: float) -> None:
+    HTTP_REQUESTS.labels(route, method, str(status)).inc()
+    HTTP_REQUEST_DURATION.labels(route, method).observe(seconds)
+
+
+def observe_node(node: str, seconds: float) -> None:
+    GRAPH_NODE_DURATION.labels(node).observe(seconds)
+
+
+def observe_external_call(service: str, seconds: float, error: bool = False, retries: int = 0,
+                          prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+    EXTERNAL_CALL_DURATION.labels(service).observe(seconds)
+    if error:
+        EXTERNAL_CALL_ERRORS.labels(service).inc()
+    if retries:
+        EXTERNAL_CALL_RETRIES.labels(service).inc(retries)
+    if prompt_tokens:
+        LLM_TOKENS.labels("prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels("completion").inc(completion_tokens)
+
+
+# ============================================================================
+# CACHE STATISTICS
+# ============================================================================
+
+class _CacheCollector:
+    """Reads hit/miss counters from registered caches at scrape time."""
+
+    def __init__(self):
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, stats: Callable[[], Optional[Tuple[int, int]]]) -> None:
+        with self._lock:
+            self._sources[name] = stats
+
+    def collect(self):
+        hits = CounterMetricFamily("stratify_cache_hits", "Cache lookups served from the cache", labels=["cache"])
+        misses = CounterMetricFamily("stratify_cache_misses", "Cache lookups that fell through", labels=["cache"])
+        ratio = GaugeMetricFamily("stratify_cache_hit_ratio", "Hits divided by lookups since process start", labels=["cache"])
+
+        with self._lock:
+            sources = list(self._sources.items())
+
+        for name, stats in sources:
+            try:
+                counts = stats()
+            except Exception:
+                counts = None
+            if counts is None:
+                continue
+            hit_count, miss_count = counts
+            hits.add_metric([name], hit_count)
+            misses.add_metric([name], miss_count)
+            lookups = hit_count + miss_count
+            ratio.add_metric([name], hit_count / lookups if lookups else 0.0)
+
+        yield hits
+        yield misses
+        yield ratio
+
+
+_cache_collector = _CacheCollector()
+REGISTRY.register(_cache_collector)
+
+
+def register_cache(name: str, stats: Callable[[], Optional[Tuple[int, int]]]) -> None:
+    """
+    Expose a cache's hit ratio on /metrics.
+
+    Args:
+        name: Value of the "cache" label
+        stats: Returns (hits, misses), or None while the cache is disabled
+    """
+    _cache_collector.register(name, stats)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render every registered metric in the Prometheus text format.
+
+    Returns:
+        (body, content type)
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,45 @@
+import threading
+import time
+
+from src import batch
+
+
+def test_closing_the_batch_cancels_pending_companies(monkeypatch):
+    release = threading.Event()
+    started = []
+
+    def fake_research_one(company_name, on_conflict="proceed", incremental=False):
+        started.append(company_name)
+        if company_name != "Acme":
+            release.wait(5)
+        return {"company_name": company_name, "status": "completed", "report": "", "error": None,
+                "conflict_question": "", "elapsed_seconds": 0.0}
+
+    monkeypatch.setattr(batch, "research_one", fake_research_one)
+    events = batch.run_batch(["Acme", "Globex", "Initech", "Umbrella"], max_parallel=1)
+
+    assert next(events)["company_name"] == "Acme"
+    closed_at = time.time()
+    events.close()
+    # Does not wait for the company still running
+    assert time.time() - closed_at < 1
+    release.set()
+
+    time.sleep(0.2)
+    assert "Initech" not in started and "Umbrella" not in started
+
+
+def test_summary_counts_results(monkeypatch):
+    def fake_research_one(company_name, on_conflict="proceed", incremental=False):
+        status = "failed" if company_name == "Globex" else "completed"
+        return {"company_name": company_name, "status": status, "report": "", "error": "boom" if status == "failed" else None,
+                "conflict_question": "", "elapsed_seconds": 1.0}
+
+    monkeypatch.setattr(batch, "research_one", fake_research_one)
+    events = list(batch.run_batch(["Acme", "Globex"], max_parallel=2))
+
+    summary = events[-1]
+    assert summary["type"] == "batch_summary"
+    assert summary["total"] == 2
+    assert summary["completed"] == 1
+    assert summary["failed"] == [{"company_name": "Globex", "error": "boom"}]
@@ -0,0 +1,47 @@
+import pytest
+
+from src.company_names import CompanyNameExtractor, canonicalize
+
+
+@pytest.fixture
+def extractor():
+    return CompanyNameExtractor(lambda text: "Stripe")
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Apple Inc.", "Apple"),
+    ("Acme, Inc.", "Acme"),
+    ("Siemens AG", "Siemens"),
+    ("Nestle S.A.", "Nestle"),
+    ("Tata Consultancy Services Limited", "Tata Consultancy Services"),
+    ("globex llc", "Globex"),
+])
+def test_legal_forms_are_stripped(raw, expected):
+    assert canonicalize(raw) == expected
+
+
+@pytest.mark.parametrize("name", ["Co-operative Group", "Volkswagen Group", "Ford Motor Company", "Inc Magazine"])
+def test_generic_words_stay_part_of_the_name(name):
+    assert canonicalize(name) == name
+
+
+@pytest.mark.parametrize("text", ["stripe vs adyen", "Stripe versus Adyen", "Acme/Globex", "Acme, Globex",
+                                  "Stripe and Adyen", "Research stripe vs adyen"])
+def test_several_companies_go_to_the_llm(extractor, text):
+    assert extractor.extract(text) == ("Stripe", "llm")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Co-operative Group", ("Co-operative Group", "heuristic")),
+    ("Acme, Inc.", ("Acme", "heuristic")),
+    ("AT&T", ("AT&T", "heuristic")),
+    ("msft", ("Microsoft", "alias")),
+    ("Research Microsoft", ("Microsoft", "regex")),
+])
+def test_cheap_tiers(extractor, text, expected):
+    assert extractor.extract(text) == expected
+
+
+def test_repeated_input_is_served_from_cache(extractor):
+    extractor.extract("Globex Corp")
+    assert extractor.extract("globex corp") == ("Globex", "cache")
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.dedup import canonical_url, deduplicate_findings, jaccard, shingles
+
+ARTICLE = " ".join(f"word{i}" for i in range(60))
+
+
+def finding(url, content, score=0.5, query="Acme news"):
+    return {"title": "Acme", "url": url, "content": content, "score": score, "query": query}
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.example.com/story",
+    "http://example.com/story/",
+    "https://m.example.com/story?utm_source=x&fbclid=1",
+    "https://EXAMPLE.com/story/amp#comments",
+    "https://example.com/story/index.html",
+])
+def test_canonical_url_variants_match(url):
+    assert canonical_url(url) == "https://example.com/story"
+
+
+def test_canonical_url_keeps_meaningful_query_sorted():
+    assert canonical_url("https://example.com/a?b=2&a=1&utm_medium=x") == "https://example.com/a?a=1&b=2"
+
+
+def test_same_page_under_different_urls_is_merged():
+    findings = [
+        finding("https://www.example.com/story", "First copy", score=0.4),
+        finding("https://example.com/story/?utm_source=feed", "Other text entirely", score=0.9),
+    ]
+    kept, removed = deduplicate_findings(findings)
+    assert removed == 1
+    assert kept[0]["content"] == "Other text entirely"
+    assert kept[0]["merged"][0]["url"] == "https://www.example.com/story"
+
+
+def test_findings_without_url_are_not_grouped_by_url():
+    findings = [finding("", "Acme opened a plant"), finding("", "Globex cut prices")]
+    kept, removed = deduplicate_findings(findings)
+    assert removed == 0
+    assert len(kept) == 2
+
+
+def test_near_duplicate_above_threshold_is_merged():
+    edited = ARTICLE.rsplit(" ", 1)[0] + " changed"
+    assert jaccard(shingles(ARTICLE), shingles(edited)) > 0.9
+
+    findings = [finding("https://a.example/1", ARTICLE), finding("https://b.example/2", edited)]
+    _, removed = deduplicate_findings(findings)
+    assert removed == 1
+
+    _, removed = deduplicate_findings(findings, threshold=1.0)
+    assert removed == 0
+
+
+def test_different_content_below_threshold_is_kept():
+    half = " ".join(ARTICLE.split()[:30] + [f"other{i}" for i in range(30)])
+    assert jaccard(shingles(ARTICLE), shingles(half)) < 0.7
+
+    findings = [finding("https://a.example/1", ARTICLE), finding("https://b.example/2", half)]
+    _, removed = deduplicate_findings(findings)
+    assert removed == 0
+
+
+def test_shingle_hashes_are_stable_across_processes():
+    code = "from src.dedup import shingles; print(sorted(shingles('acme opened a new plant'))[0])"
+    outputs = {
+        subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       env={"PYTHONHASHSEED": seed}).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
@@ -0,0 +1,73 @@
+import pytest
+
+from src.fact_check import extract_facts, find_conflicts
+
+
+def ceo_names(text):
+    return [fact["value"] for fact in extract_facts(text, "https://example.com") if fact["metric"] == "ceo"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("CEO Satya Nadella said cloud demand was strong.", ["nadella"]),
+    ("Tim Cook, the CEO of Apple, spoke at the event.", ["cook"]),
+    ("The chief executive officer, Jane Doe, joined in 2020.", ["doe"]),
+    ("CEO Jane Doe's plan worked.", ["doe"]),
+])
+def test_extracts_ceo_names(text, expected):
+    assert ceo_names(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Acme Corporation's CEO Jane Doe spoke.",
+    "Acme Corporation's chief executive, Jane Doe, said revenue rose.",
+])
+def test_possessive_employer_is_not_a_ceo_name(text):
+    assert ceo_names(text) == ["doe"]
+
+
+def test_former_ceo_is_ignored():
+    assert ceo_names("Former CEO John Smith left in 2019.") == []
+
+
+def test_revenue_is_normalized_with_currency_and_period():
+    facts = extract_facts("Acme reported revenue of $10.5 billion in 2023.", "https://a.example")
+    revenue = [fact for fact in facts if fact["metric"] == "revenue"]
+    assert len(revenue) == 1
+    assert revenue[0]["value"] == 10.5e9
+    assert revenue[0]["unit"] == "USD"
+    assert revenue[0]["period"] == "2023"
+
+
+def test_revenue_conflict_across_sources():
+    facts = (extract_facts("Revenue was $10B in 2023.", "https://a.example")
+             + extract_facts("Revenue was $14B in 2023.", "https://b.example"))
+    conflicts = find_conflicts(facts)
+    assert [conflict["metric"] for conflict in conflicts] == ["revenue"]
+
+
+def test_figures_within_tolerance_do_not_conflict():
+    facts = (extract_facts("Revenue was $10B in 2023.", "https://a.example")
+             + extract_facts("Revenue was $10.5B in 2023.", "https://b.example"))
+    assert find_conflicts(facts) == []
+
+
+@pytest.mark.parametrize("title", [
+    "Microsoft CEO Satya Nadella Says AI Will Reshape Work",
+    "Microsoft CEO Satya Nadella Announces New Copilot Features",
+    "Satya Nadella Is The CEO",
+])
+def test_headline_verbs_end_the_name(title):
+    assert ceo_names(title) == ["nadella"]
+
+
+def test_full_and_short_names_of_one_ceo_do_not_conflict():
+    facts = (extract_facts("Microsoft CEO Satya Nadella Says AI Will Reshape Work. Revenue grew.", "https://a.example")
+             + extract_facts("The company's CEO, Nadella, spoke on Monday.", "https://b.example")
+             + extract_facts("CEO Satya Nadella said demand was strong.", "https://c.example"))
+    assert find_conflicts(facts) == []
+
+
+def test_different_ceos_conflict():
+    facts = (extract_facts("CEO Satya Nadella said demand was strong.", "https://a.example")
+             + extract_facts("CEO Steve Ballmer said demand was strong.", "https://b.example"))
+    assert [conflict["metric"] for conflict in find_conflicts(facts)] == ["ceo"]
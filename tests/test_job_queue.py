@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+import backend_api
+from src.job_queue import JOB_DEFAULT_RETRY_AFTER, JobQueue, QueueFullError
+
+
+@pytest.fixture
+def blocked_queue():
+    """One worker stuck on its first job, with room for one more queued job."""
+    release = threading.Event()
+
+    def runner(job):
+        yield {"type": "progress", "message": "started"}
+        release.wait(5)
+        yield {"type": "complete", "report": "done"}
+
+    jobs = JobQueue(runner, workers=1, max_queued=1)
+    first = jobs.submit({"company_name": "Acme"})
+    deadline = time.time() + 5
+    while first.status != "running" and time.time() < deadline:
+        time.sleep(0.01)
+    jobs.submit({"company_name": "Globex"})
+    yield jobs
+    release.set()
+
+
+def test_full_queue_raises_with_default_retry_after(blocked_queue):
+    with pytest.raises(QueueFullError) as excinfo:
+        blocked_queue.submit({"company_name": "Initech"})
+    assert excinfo.value.retry_after == JOB_DEFAULT_RETRY_AFTER
+
+
+def test_retry_after_scales_with_queue_and_job_duration(blocked_queue):
+    blocked_queue._durations = [10.0, 20.0]
+    # One queued job, one worker, 15s average
+    assert blocked_queue.retry_after() == 15
+
+
+def test_api_returns_429_with_retry_after_header(blocked_queue, monkeypatch):
+    monkeypatch.setattr(backend_api, "research_jobs", blocked_queue)
+    response = backend_api.app.test_client().post("/api/jobs", json={"company_name": "Initech"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(JOB_DEFAULT_RETRY_AFTER)
+    assert response.get_json()["retry_after"] == JOB_DEFAULT_RETRY_AFTER
+
+
+def test_jobs_finish_with_status_from_last_event():
+    def runner(job):
+        yield {"type": "conflict" if job.payload["company_name"] == "Acme" else "complete"}
+
+    jobs = JobQueue(runner, workers=1, max_queued=4)
+    conflict = jobs.submit({"company_name": "Acme"})
+    complete = jobs.submit({"company_name": "Globex"})
+    deadline = time.time() + 5
+    while not (conflict.finished and complete.finished) and time.time() < deadline:
+        time.sleep(0.01)
+    assert conflict.status == "awaiting_resolution"
+    assert complete.status == "completed"
+
+
+def test_cancelled_queued_job_never_runs(blocked_queue):
+    queued = [job for job in blocked_queue._jobs.values() if job.status == "queued"][0]
+    assert blocked_queue.cancel(queued.id).status == "cancelled"
+    assert not queued.start()
+    assert queued.status == "cancelled"
+    assert queued.started_at is None
+
+
+def test_cancel_of_running_job_waits_for_the_runner():
+    release = threading.Event()
+    ran = []
+
+    def runner(job):
+        yield {"type": "progress", "message": "started"}
+        release.wait(5)
+        ran.append(job.id)
+        yield {"type": "complete"}
+
+    jobs = JobQueue(runner, workers=1, max_queued=1)
+    job = jobs.submit({"company_name": "Acme"})
+    deadline = time.time() + 5
+    while not job.events and time.time() < deadline:
+        time.sleep(0.01)
+
+    jobs.cancel(job.id)
+    # Still running until the runner reaches its next event
+    assert job.status == "running"
+    release.set()
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.status == "cancelled"
+    assert ran == [job.id]
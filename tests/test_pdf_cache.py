@@ -0,0 +1,90 @@
+import pytest
+
+import backend_api
+from src.pdf_cache import PDFCache, pdf_key
+
+REPORT = "# Account Plan: Acme\n\n## Executive Summary\nAcme makes anvils.\n"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client with an empty PDF cache and a fake renderer counting renders."""
+    renders = []
+
+    def fake_render(markdown, company_name):
+        renders.append(company_name)
+        return b"%PDF-" + markdown.encode("utf-8")
+
+    cache = PDFCache(max_bytes=1024 * 1024)
+    monkeypatch.setattr(backend_api, "render_pdf", fake_render)
+    monkeypatch.setattr(backend_api, "get_pdf_cache", lambda: cache)
+    client = backend_api.app.test_client()
+    client.renders = renders
+    return client
+
+
+def test_pdf_key_depends_on_every_part():
+    key = pdf_key(REPORT, "Acme", "1")
+    assert key == pdf_key(REPORT, "Acme", "1")
+    assert key != pdf_key(REPORT, "Globex", "1")
+    assert key != pdf_key(REPORT, "Acme", "2")
+    assert pdf_key("ab", "c", "1") != pdf_key("a", "bc", "1")
+
+
+def test_download_sets_etag_and_serves_repeats_from_cache(client):
+    body = {"content": REPORT, "company_name": "Acme"}
+    first = client.post("/api/download-pdf", json=body)
+    etag = pdf_key(REPORT, "Acme", backend_api.PDF_STYLE_VERSION)
+    assert first.status_code == 200
+    assert first.headers["ETag"] == f'"{etag}"'
+    assert first.headers["Content-Location"] == f"/api/pdf/{etag}"
+
+    second = client.post("/api/download-pdf", json=body)
+    assert second.data == first.data
+    assert client.renders == ["Acme"]
+
+
+def test_post_ignores_if_none_match(client):
+    body = {"content": REPORT, "company_name": "Acme"}
+    etag = client.post("/api/download-pdf", json=body).headers["ETag"]
+
+    response = client.post("/api/download-pdf", json=body, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF-")
+
+
+def test_matching_if_none_match_returns_304(client):
+    body = {"content": REPORT, "company_name": "Acme"}
+    first = client.post("/api/download-pdf", json=body)
+    url, etag = first.headers["Content-Location"], first.headers["ETag"]
+
+    fetched = client.get(url)
+    assert fetched.status_code == 200
+    assert fetched.data == first.data
+    assert fetched.headers["ETag"] == etag
+    assert "immutable" in fetched.headers["Cache-Control"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_get_of_unknown_pdf_is_404(client):
+    assert client.get(f"/api/pdf/{'0' * 64}").status_code == 404
+    assert client.get("/api/pdf/not-a-hash").status_code == 404
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = PDFCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a")
+    cache.put("c", b"12345")
+    assert cache.get("a") == b"12345"
+    assert cache.get("b") is None
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    PDFCache(directory=str(tmp_path)).put("key", b"%PDF-1")
+    assert PDFCache(directory=str(tmp_path)).get("key") == b"%PDF-1"
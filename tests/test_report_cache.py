@@ -0,0 +1,51 @@
+import sqlite3
+
+from src import report_cache
+from src.report_cache import ReportCache, is_cacheable_report
+
+REPORT = "# Account Plan: Acme\n\n## Executive Summary\nAnvils.\n\n## 📚 Research Sources\n1. https://example.com\n"
+RESEARCH = [{"title": "Acme", "url": "https://example.com", "content": "Anvils."}]
+
+
+def test_round_trip_by_company_key(tmp_path):
+    cache = ReportCache(str(tmp_path / "reports.sqlite3"))
+    cache.put("Acme Corp", REPORT, RESEARCH)
+    entry = cache.get("  acme   corp ")
+    assert entry["report"] == REPORT
+    assert entry["research_data"] == RESEARCH
+
+
+def test_stale_entries_only_returned_with_any_age(tmp_path):
+    cache = ReportCache(str(tmp_path / "reports.sqlite3"), max_age=0)
+    cache.put("Acme", REPORT, RESEARCH)
+    assert cache.get("Acme") is None
+    assert cache.get("Acme", max_age=-1)["report"] == REPORT
+
+
+def test_only_reports_with_sources_are_cacheable():
+    assert is_cacheable_report(REPORT, RESEARCH)
+    assert not is_cacheable_report("## Executive Summary\nAnvils.", RESEARCH)
+
+
+def test_connections_are_closed(tmp_path, monkeypatch):
+    opened = []
+    original_connect = sqlite3.connect
+
+    class TrackedConnection(sqlite3.Connection):
+        closed = False
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    def connect(*args, **kwargs):
+        conn = original_connect(*args, factory=TrackedConnection, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(report_cache.sqlite3, "connect", connect)
+    cache = ReportCache(str(tmp_path / "reports.sqlite3"))
+    cache.put("Acme", REPORT, RESEARCH)
+    cache.get("Acme")
+    assert len(opened) == 3
+    assert all(conn.closed for conn in opened)
@@ -0,0 +1,143 @@
+import pytest
+
+from src.report_editor import UnknownSectionError, edit_report, find_target_sections
+from src.report_sections import join_sections, section_key, split_sections
+
+REPORT = """# Account Plan: Acme
+
+Prepared for the sales team.
+
+## Executive Summary
+Acme makes anvils.
+
+## Key Financial & Operational Insights
+* **Annual Revenue (Latest):** $10B
+
+## SWOT Analysis (For Sales Strategy)
+| Strengths | Weaknesses |
+
+## Conversation Starters for Sales Team
+1. How is the anvil market?
+
+## 📚 Research Sources
+1. https://example.com
+"""
+
+
+@pytest.fixture
+def sections():
+    return split_sections(REPORT)[1]
+
+
+def test_split_sections_keeps_preamble_and_order():
+    preamble, sections = split_sections(REPORT)
+    assert preamble == "# Account Plan: Acme\n\nPrepared for the sales team."
+    assert [section.title for section in sections] == [
+        "Executive Summary",
+        "Key Financial & Operational Insights",
+        "SWOT Analysis (For Sales Strategy)",
+        "Conversation Starters for Sales Team",
+        "📚 Research Sources",
+    ]
+    assert sections[0].markdown == "## Executive Summary\nAcme makes anvils."
+
+
+def test_split_and_join_round_trip():
+    preamble, sections = split_sections(REPORT)
+    assert split_sections(join_sections(preamble, sections)) == (preamble, sections)
+
+
+def test_report_without_headings_is_all_preamble():
+    assert split_sections("Just text\n") == ("Just text", [])
+
+
+def test_section_key_drops_emoji_and_punctuation():
+    assert section_key("📚 Research Sources") == "research sources"
+    assert section_key("Key Financial & Operational Insights") == "key financial operational insights"
+
+
+@pytest.mark.parametrize("instructions, expected", [
+    ("Make the executive summary shorter", [0]),
+    ("Rewrite the Conversation Starters for Sales Team", [3]),
+    ("Add more detail on the threats", [2]),
+    ("Update the revenue figure", [1]),
+    ("Update the Executive Summary and the threats", [0, 2]),
+])
+def test_targets_sections_by_heading_and_keyword(sections, instructions, expected):
+    assert find_target_sections(instructions, sections) == expected
+
+
+def test_generic_words_only_count_when_nothing_specific_matches(sections):
+    assert find_target_sections("Make the summary shorter", sections) == [0]
+    # "summary" is generic, "threats" points at the SWOT table
+    assert find_target_sections("Add a summary of risks to the threats", sections) == [2]
+
+
+def test_keywords_match_whole_words_only(sections):
+    # "Introduce" must not hit the "intro" keyword of the executive summary
+    assert find_target_sections("Introduce more detail on the CEO", sections) == [1]
+
+
+def test_whole_report_and_new_section_instructions(sections):
+    assert find_target_sections("Make the whole report more formal", sections) is None
+    assert find_target_sections("Add a next steps section", sections) == []
+    assert find_target_sections("Make it better", sections) is None
+
+
+def test_unknown_section_titles_raise():
+    with pytest.raises(UnknownSectionError):
+        edit_report(REPORT, "Shorten it", "Acme", section_titles=["Pricing"])
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Queue of answers returned by the editing model, in call order."""
+    answers = []
+    monkeypatch.setattr("src.report_editor.get_llm", lambda: None)
+    monkeypatch.setattr("src.report_editor.invoke_llm", lambda llm, messages: FakeResponse(answers.pop(0)))
+    return answers
+
+
+def titles(report):
+    return [section.title for section in split_sections(report)[1]]
+
+
+def test_reworded_heading_replaces_its_section(gemini):
+    gemini.append("## SWOT Analysis (Updated)\n| Strengths | Weaknesses | Threats |")
+    result = edit_report(REPORT, "Add more detail on the threats", "Acme")
+
+    assert result["mode"] == "sections"
+    assert titles(result["updated_report"]) == titles(REPORT)
+    assert "## SWOT Analysis (For Sales Strategy)\n| Strengths | Weaknesses | Threats |" in result["updated_report"]
+
+
+def test_reworded_headings_are_matched_by_position(gemini):
+    gemini.append("## Summary\nShorter.\n\n## Sales Conversation Starters\n1. New question?")
+    result = edit_report(REPORT, "Update the Executive Summary and the conversation starters", "Acme")
+
+    assert result["mode"] == "sections"
+    assert titles(result["updated_report"]) == titles(REPORT)
+    assert "## Executive Summary\nShorter." in result["updated_report"]
+    assert "## Conversation Starters for Sales Team\n1. New question?" in result["updated_report"]
+
+
+def test_unexpected_extra_section_falls_back_to_full_edit(gemini):
+    gemini.append("## SWOT Analysis (For Sales Strategy)\n| S | W |\n\n## Pricing\nCheap.")
+    gemini.append(REPORT)
+    result = edit_report(REPORT, "Add more detail on the threats", "Acme")
+
+    assert result["mode"] == "full"
+    assert gemini == []
+
+
+def test_requested_new_section_is_added_before_sources(gemini):
+    gemini.append("## Next Steps\n1. Book a call.")
+    result = edit_report(REPORT, "Add a next steps section", "Acme")
+
+    assert result["mode"] == "sections"
+    assert titles(result["updated_report"])[-2:] == ["Next Steps", "📚 Research Sources"]
@@ -0,0 +1,82 @@
+import pytest
+
+from src.research_diff import diff_research, finding_topics, has_changes, needs_full_rewrite, query_topic
+
+
+def finding(url, content, query):
+    return {"title": "Acme", "url": url, "content": content, "query": query}
+
+
+@pytest.mark.parametrize("query, topic", [
+    ("Acme company overview and business model", "overview"),
+    ("Acme recent news and developments", "news"),
+    ("Acme products and services", "products"),
+    ("Acme market position and competitors", "market"),
+    ("Acme latest news and announcements", "news"),
+    ("Acme annual report", None),
+])
+def test_query_topic(query, topic):
+    assert query_topic(query, "Acme") == topic
+
+
+def test_query_topic_ignores_company_name():
+    # The company name itself must not decide the topic
+    assert query_topic("News Corp products and services", "News Corp") == "products"
+    assert query_topic("News Corp products and services") == "news"
+
+
+def test_finding_topics_include_merged_duplicates():
+    item = finding("https://a.example", "x", "Acme recent news and developments")
+    item["merged"] = [{"url": "https://b.example", "query": "Acme products and services", "score": 0.1}]
+    assert finding_topics(item, "Acme") == {"news", "products"}
+
+
+def test_human_input_has_unknown_topic():
+    assert finding_topics(finding("human-input", "x", ""), "Acme") == {None}
+
+
+PREVIOUS = [
+    finding("https://a.example/overview", "Acme makes anvils.", "Acme company overview and business model"),
+    finding("https://a.example/news", "Acme opened a plant.", "Acme recent news and developments"),
+    finding("https://a.example/products", "Anvils and rockets.", "Acme products and services"),
+    finding("https://a.example/market", "Acme leads anvils.", "Acme market position and competitors"),
+]
+
+
+def test_unchanged_research_has_no_changes():
+    # Same pages under URL variants and whitespace differences are not changes
+    current = [dict(item, url=item["url"].replace("https://", "https://www."), content=item["content"] + "  ")
+               for item in PREVIOUS]
+    changes = diff_research(PREVIOUS, current, "Acme")
+    assert not has_changes(changes)
+    assert changes["unchanged"] == 4
+
+
+def test_changed_news_maps_to_its_sections():
+    current = [dict(item) for item in PREVIOUS]
+    current[1]["content"] = "Acme opened a second plant."
+    changes = diff_research(PREVIOUS, current, "Acme")
+    assert [item["url"] for item in changes["changed"]] == ["https://a.example/news"]
+    assert changes["topics"] == ["news"]
+    assert changes["sections"] == ["conversation starters", "key financial"]
+    assert not needs_full_rewrite(changes)
+
+
+def test_added_and_removed_findings_are_reported():
+    current = PREVIOUS[:3] + [finding("https://b.example/rival", "Globex gains.", "Acme market position and competitors")]
+    changes = diff_research(PREVIOUS, current, "Acme")
+    assert [item["url"] for item in changes["added"]] == ["https://b.example/rival"]
+    assert [item["url"] for item in changes["removed"]] == ["https://a.example/market"]
+    assert changes["sections"] == ["swot"]
+
+
+def test_unknown_topic_forces_full_rewrite():
+    current = PREVIOUS + [finding("human-input", "Use the 2024 figures.", "")]
+    changes = diff_research(PREVIOUS, current, "Acme")
+    assert changes["topics"] == ["other"]
+    assert needs_full_rewrite(changes)
+
+
+def test_mostly_changed_research_forces_full_rewrite():
+    current = [dict(item, content=item["content"] + " Updated.") for item in PREVIOUS]
+    assert needs_full_rewrite(diff_research(PREVIOUS, current, "Acme"))
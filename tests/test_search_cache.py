@@ -0,0 +1,47 @@
+import sqlite3
+
+from src import search_cache
+from src.search_cache import SearchCache
+
+
+def tracked_connections(monkeypatch):
+    """Record every sqlite3 connection the cache opens and whether it was closed."""
+    opened = []
+    original_connect = sqlite3.connect
+
+    class TrackedConnection(sqlite3.Connection):
+        closed = False
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    def connect(*args, **kwargs):
+        conn = original_connect(*args, factory=TrackedConnection, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(search_cache.sqlite3, "connect", connect)
+    return opened
+
+
+def test_round_trip_with_normalized_query(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite3"))
+    cache.put("Acme  News", "basic", 5, {"results": [1]})
+    assert cache.get("acme news", "basic", 5) == {"results": [1]}
+    assert cache.get("acme news", "advanced", 5) is None
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite3"), ttl=-1)
+    cache.put("acme", "basic", 5, {"results": []})
+    assert cache.get("acme", "basic", 5) is None
+
+
+def test_connections_are_closed(tmp_path, monkeypatch):
+    opened = tracked_connections(monkeypatch)
+    cache = SearchCache(str(tmp_path / "search.sqlite3"))
+    cache.put("acme", "basic", 5, {"results": []})
+    cache.get("acme", "basic", 5)
+    assert len(opened) == 3
+    assert all(conn.closed for conn in opened)
@@ -0,0 +1,93 @@
+from src.session_store import SessionRegistry
+
+
+def config(session_id):
+    return {"configurable": {"thread_id": session_id}}
+
+
+def make_registry(**kwargs):
+    released = []
+    registry = SessionRegistry(on_evict=lambda cfg: released.append(cfg["configurable"]["thread_id"]), **kwargs)
+    return registry, released
+
+
+def test_idle_sessions_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.session_store.time.time", lambda: now[0])
+    registry, released = make_registry(idle_ttl=60)
+    registry.add("old", "Acme", config("old"))
+    registry.update("old", status="awaiting_resolution")
+    now[0] += 30
+    registry.add("new", "Globex", config("new"))
+    registry.update("new", status="awaiting_resolution")
+
+    now[0] += 31
+    assert registry.evict_idle() == 1
+    assert registry.keys() == ["new"]
+    assert released == ["old"]
+
+
+def test_update_refreshes_idle_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.session_store.time.time", lambda: now[0])
+    registry, _ = make_registry(idle_ttl=60)
+    registry.add("a", "Acme", config("a"))
+    now[0] += 50
+    registry.update("a", status="awaiting_resolution")
+    now[0] += 50
+    assert registry.evict_idle() == 0
+    assert "a" in registry
+
+
+def test_size_eviction_takes_oldest_idle_session():
+    registry, released = make_registry(max_size=2, idle_ttl=3600)
+    registry.add("a", "Acme", config("a"))
+    registry.update("a", status="awaiting_resolution")
+    registry.add("b", "Globex", config("b"))
+    registry.update("b", status="awaiting_resolution")
+    registry.add("c", "Initech", config("c"))
+
+    assert registry.keys() == ["b", "c"]
+    assert released == ["a"]
+    assert registry.evictions == 1
+
+
+def test_size_eviction_never_takes_running_sessions():
+    registry, released = make_registry(max_size=2, idle_ttl=3600)
+    registry.add("running", "Acme", config("running"))
+    registry.add("paused", "Globex", config("paused"))
+    registry.update("paused", status="awaiting_resolution")
+    registry.add("new", "Initech", config("new"))
+
+    assert registry.keys() == ["running", "new"]
+    assert released == ["paused"]
+
+    # Only running sessions left: the registry goes over max_size instead
+    registry.add("another", "Umbrella", config("another"))
+    assert len(registry) == 3
+    assert released == ["paused"]
+
+
+def test_idle_ttl_never_takes_running_sessions(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.session_store.time.time", lambda: now[0])
+    registry, released = make_registry(idle_ttl=60)
+    registry.add("running", "Acme", config("running"))
+    registry.add("resuming", "Globex", config("resuming"))
+    registry.update("resuming", status="resuming")
+    registry.add("paused", "Initech", config("paused"))
+    registry.update("paused", status="awaiting_resolution")
+
+    now[0] += 61
+    assert registry.evict_idle() == 1
+    assert registry.keys() == ["running", "resuming"]
+    assert released == ["paused"]
+
+
+def test_snapshot_reports_footprint():
+    registry, _ = make_registry()
+    registry.add("a", "Acme", config("a"))
+    registry.update("a", state={"company_name": "Acme", "research_data": ["x" * 100]})
+    snapshot = registry.snapshot()
+    assert snapshot["count"] == 1
+    assert snapshot["total_footprint_bytes"] > 100